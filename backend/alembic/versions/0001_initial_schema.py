@@ -0,0 +1,98 @@
+"""initial schema
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-18
+"""
+
+revision = "0001_initial_schema"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scan_batches",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+    )
+    op.create_table(
+        "scan_runs",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("region_scope", sa.JSON(), nullable=False),
+        sa.Column("caller_identity", sa.JSON(), nullable=True),
+        sa.Column("minimal_permissions", sa.JSON(), nullable=True),
+        sa.Column("batch_id", UUID(as_uuid=True), sa.ForeignKey("scan_batches.id"), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), nullable=True),
+        sa.Column("archive_path", sa.String(), nullable=True),
+    )
+    op.create_table(
+        "scan_regions",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("scan_id", UUID(as_uuid=True), sa.ForeignKey("scan_runs.id"), nullable=False),
+        sa.Column("region", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+    )
+    op.create_table(
+        "evidence_blobs",
+        sa.Column("hash", sa.String(64), primary_key=True),
+        sa.Column("content", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "llm_advice",
+        sa.Column("signature", sa.String(), primary_key=True),
+        sa.Column("rule_id", sa.String(), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("content_md", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "findings",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("scan_id", UUID(as_uuid=True), sa.ForeignKey("scan_runs.id"), nullable=False),
+        sa.Column("service", sa.String(), nullable=False),
+        sa.Column("rule_id", sa.String(), nullable=False),
+        sa.Column("severity", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("evidence_hash", sa.String(64), sa.ForeignKey("evidence_blobs.hash"), nullable=False),
+        sa.Column("region", sa.String(), nullable=True),
+        sa.Column("resource_hash", sa.String(), nullable=True),
+        sa.Column("advice_signature", sa.String(), sa.ForeignKey("llm_advice.signature"), nullable=True),
+        sa.Column("advice_status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_findings_scan_rule_resource", "findings", ["scan_id", "rule_id", "resource_hash"])
+    op.create_index("ix_findings_evidence_hash", "findings", ["evidence_hash"])
+    op.create_table(
+        "rule_catalog",
+        sa.Column("rule_id", sa.String(), primary_key=True),
+        sa.Column("service", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("severity_default", sa.String(), nullable=False),
+        sa.Column("cis_map", sa.JSON(), nullable=True),
+        sa.Column("docs", sa.JSON(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rule_catalog")
+    op.drop_index("ix_findings_evidence_hash", table_name="findings")
+    op.drop_index("ix_findings_scan_rule_resource", table_name="findings")
+    op.drop_table("findings")
+    op.drop_table("llm_advice")
+    op.drop_table("evidence_blobs")
+    op.drop_table("scan_regions")
+    op.drop_table("scan_runs")
+    op.drop_table("scan_batches")
@@ -0,0 +1,132 @@
+"""partition findings by scan month
+
+Revision ID: 0002_partition_findings
+Revises: 0001_initial_schema
+Create Date: 2026-10-18
+"""
+
+revision = "0002_partition_findings"
+down_revision = "0001_initial_schema"
+branch_labels = None
+depends_on = None
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+FINDING_COLUMNS = [
+    "id",
+    "scan_id",
+    "service",
+    "rule_id",
+    "severity",
+    "status",
+    "evidence_hash",
+    "region",
+    "resource_hash",
+    "advice_signature",
+    "advice_status",
+    "created_at",
+]
+MONTHS_AHEAD = 2
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _finding_columns() -> list:
+    return [
+        sa.Column("id", UUID(as_uuid=True), nullable=False),
+        sa.Column("scan_created_at", sa.DateTime(), nullable=False),
+        sa.Column("scan_id", UUID(as_uuid=True), sa.ForeignKey("scan_runs.id"), nullable=False),
+        sa.Column("service", sa.String(), nullable=False),
+        sa.Column("rule_id", sa.String(), nullable=False),
+        sa.Column("severity", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("evidence_hash", sa.String(64), sa.ForeignKey("evidence_blobs.hash"), nullable=False),
+        sa.Column("region", sa.String(), nullable=True),
+        sa.Column("resource_hash", sa.String(), nullable=True),
+        sa.Column("advice_signature", sa.String(), sa.ForeignKey("llm_advice.signature"), nullable=True),
+        sa.Column("advice_status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    ]
+
+
+def _rename_findings(suffix: str) -> None:
+    op.execute(f"ALTER TABLE findings RENAME TO findings_{suffix}")
+    op.execute(f"ALTER INDEX findings_pkey RENAME TO findings_{suffix}_pkey")
+    op.execute(f"ALTER INDEX ix_findings_scan_rule_resource RENAME TO ix_findings_{suffix}_scan_rule_resource")
+    op.execute(f"ALTER INDEX ix_findings_evidence_hash RENAME TO ix_findings_{suffix}_evidence_hash")
+
+
+def _create_indexes() -> None:
+    op.create_index("ix_findings_scan_rule_resource", "findings", ["scan_id", "rule_id", "resource_hash"])
+    op.create_index("ix_findings_evidence_hash", "findings", ["evidence_hash"])
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        with op.batch_alter_table("findings") as batch:
+            batch.add_column(sa.Column("scan_created_at", sa.DateTime(), nullable=True))
+        op.execute(
+            "UPDATE findings SET scan_created_at = "
+            "(SELECT created_at FROM scan_runs WHERE scan_runs.id = findings.scan_id)"
+        )
+        with op.batch_alter_table("findings") as batch:
+            batch.alter_column("scan_created_at", existing_type=sa.DateTime(), nullable=False)
+        return
+
+    _rename_findings("legacy")
+    op.create_table(
+        "findings",
+        *_finding_columns(),
+        sa.PrimaryKeyConstraint("id", "scan_created_at", name="findings_pkey"),
+        postgresql_partition_by="RANGE (scan_created_at)",
+    )
+    op.execute("CREATE TABLE findings_default PARTITION OF findings DEFAULT")
+
+    now = datetime.utcnow()
+    first = bind.execute(sa.text("SELECT min(created_at) FROM scan_runs")).scalar()
+    month = _month_start(first or now)
+    last = _add_months(_month_start(now), MONTHS_AHEAD)
+    while month <= last:
+        end = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE findings_y{month.year:04d}m{month.month:02d} PARTITION OF findings "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        )
+        month = end
+
+    columns = ", ".join(FINDING_COLUMNS)
+    source = ", ".join(f"f.{column}" for column in FINDING_COLUMNS)
+    op.execute(
+        f"INSERT INTO findings ({columns}, scan_created_at) "
+        f"SELECT {source}, s.created_at FROM findings_legacy f JOIN scan_runs s ON s.id = f.scan_id"
+    )
+    op.drop_table("findings_legacy")
+    _create_indexes()
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        with op.batch_alter_table("findings") as batch:
+            batch.drop_column("scan_created_at")
+        return
+
+    _rename_findings("partitioned")
+    columns = [column for column in _finding_columns() if column.name != "scan_created_at"]
+    op.create_table("findings", *columns, sa.PrimaryKeyConstraint("id", name="findings_pkey"))
+    names = ", ".join(FINDING_COLUMNS)
+    op.execute(f"INSERT INTO findings ({names}) SELECT {names} FROM findings_partitioned")
+    op.execute("DROP TABLE findings_partitioned CASCADE")
+    _create_indexes()
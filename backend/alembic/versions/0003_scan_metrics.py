@@ -0,0 +1,23 @@
+"""per-scan telemetry rollups
+
+Revision ID: 0003_scan_metrics
+Revises: 0002_partition_findings
+Create Date: 2026-10-18
+"""
+
+revision = "0003_scan_metrics"
+down_revision = "0002_partition_findings"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.add_column("scan_runs", sa.Column("metrics", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("scan_runs") as batch:
+        batch.drop_column("metrics")
@@ -0,0 +1,23 @@
+"""per-region rule profiling stats
+
+Revision ID: 0004_rule_stats
+Revises: 0003_scan_metrics
+Create Date: 2026-10-18
+"""
+
+revision = "0004_rule_stats"
+down_revision = "0003_scan_metrics"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.add_column("scan_regions", sa.Column("rule_stats", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("scan_regions") as batch:
+        batch.drop_column("rule_stats")
@@ -0,0 +1,35 @@
+"""inventory snapshots for change-only collection
+
+Revision ID: 0005_inventory_snapshots
+Revises: 0004_rule_stats
+Create Date: 2026-10-18
+"""
+
+revision = "0005_inventory_snapshots"
+down_revision = "0004_rule_stats"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.create_table(
+        "inventory_snapshots",
+        sa.Column("account", sa.String(), primary_key=True),
+        sa.Column("region", sa.String(), primary_key=True),
+        sa.Column("collector", sa.String(), primary_key=True),
+        sa.Column("fingerprint", sa.String(64), nullable=False),
+        sa.Column("resource_count", sa.Integer(), nullable=False),
+        sa.Column("entries", sa.JSON(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.add_column("scan_regions", sa.Column("inventory_stats", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("scan_regions") as batch:
+        batch.drop_column("inventory_stats")
+    op.drop_table("inventory_snapshots")
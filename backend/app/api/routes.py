@@ -1,39 +1,78 @@
 from __future__ import annotations
 
+import asyncio
 import uuid
-from typing import Any, List, Optional
+from datetime import datetime, timedelta
+from typing import Any, List, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
-from app.db.session import get_db
-from app.models.scan import Finding, LLMAdvice, ScanRegion, ScanRun
+from app.core.credentials import VaultUnavailableError, vault
+from app.db.session import get_async_db, get_db
+from app.models.scan import LLMAdvice
+from app.services.archive import ScanArchivedError
 from app.services.scan_orchestrator import ScanOrchestrator
-from app.services.schemas import ScanRequest, ScanStatusResponse
+from app.services.schemas import (
+    BatchScanRequest,
+    BatchStatusResponse,
+    ScanDiffResponse,
+    ScanRequest,
+    ScanStatusResponse,
+)
 
 settings = get_settings()
 
 api_router = APIRouter()
 
 
+@api_router.get("/health")
+async def health() -> dict[str, Any]:
+    return {"status": "ok", "vault": await asyncio.to_thread(vault.health)}
+
+
 @api_router.post("/scans/start", response_model=dict)
 async def start_scan(scan_request: ScanRequest, db: Session = Depends(get_db)) -> dict[str, Any]:
     orchestrator = ScanOrchestrator(db=db)
-    scan_id = await orchestrator.start_scan(scan_request)
+    try:
+        scan_id = await orchestrator.start_scan(scan_request)
+    except VaultUnavailableError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
     return {"scanId": str(scan_id)}
 
 
-@api_router.get("/scans/{scan_id}/status", response_model=ScanStatusResponse)
-async def scan_status(scan_id: uuid.UUID, db: Session = Depends(get_db)) -> ScanStatusResponse:
+@api_router.post("/scans/batch", response_model=dict)
+async def start_batch(batch_request: BatchScanRequest, db: Session = Depends(get_db)) -> dict[str, Any]:
     orchestrator = ScanOrchestrator(db=db)
+    try:
+        return await orchestrator.start_batch(batch_request)
+    except VaultUnavailableError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@api_router.get("/scans/batches/{batch_id}", response_model=BatchStatusResponse)
+async def batch_status(batch_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)) -> BatchStatusResponse:
+    orchestrator = ScanOrchestrator(async_db=db)
+    try:
+        return await orchestrator.get_batch_status(batch_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@api_router.get("/scans/{scan_id}/status", response_model=ScanStatusResponse)
+async def scan_status(scan_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)) -> ScanStatusResponse:
+    orchestrator = ScanOrchestrator(async_db=db)
     return await orchestrator.get_status(scan_id)
 
 
 @api_router.get("/scans/{scan_id}/summary")
-async def scan_summary(scan_id: uuid.UUID, db: Session = Depends(get_db)) -> dict[str, Any]:
-    orchestrator = ScanOrchestrator(db=db)
+async def scan_summary(scan_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)) -> dict[str, Any]:
+    orchestrator = ScanOrchestrator(async_db=db)
     return await orchestrator.get_summary(scan_id)
 
 
@@ -42,46 +81,63 @@ async def list_findings(
     scan_id: uuid.UUID,
     service: Optional[str] = None,
     severity: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict[str, Any]:
-    query = db.query(Finding).filter(Finding.scan_id == scan_id)
-    if service:
-        query = query.filter(Finding.service == service)
-    if severity:
-        query = query.filter(Finding.severity == severity)
-    findings = query.all()
-    return {
-        "items": [
-            {
-                "id": str(f.id),
-                "ruleId": f.rule_id,
-                "service": f.service,
-                "severity": f.severity,
-                "status": f.status,
-                "evidence": f.evidence,
-                "region": f.region,
-            }
-            for f in findings
-        ]
-    }
+    orchestrator = ScanOrchestrator(async_db=db)
+    return {"items": await orchestrator.list_findings(scan_id, service=service, severity=severity)}
+
+
+@api_router.get("/scans/{base_id}/diff/{target_id}", response_model=ScanDiffResponse)
+async def diff_scans(
+    base_id: uuid.UUID,
+    target_id: uuid.UUID,
+    kind: Literal["new", "resolved", "unchanged"] = "new",
+    cursor: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db),
+) -> ScanDiffResponse:
+    orchestrator = ScanOrchestrator(async_db=db)
+    try:
+        return await orchestrator.diff_scans(base_id, target_id, kind=kind, cursor=cursor, limit=limit)
+    except ScanArchivedError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except ValueError as exc:
+        status_code = 404 if str(exc) == "Scan not found" else 400
+        raise HTTPException(status_code=status_code, detail=str(exc)) from exc
 
 
 @api_router.get("/scans/{scan_id}/export.json")
-async def export_scan_json(scan_id: uuid.UUID, db: Session = Depends(get_db)) -> JSONResponse:
-    orchestrator = ScanOrchestrator(db=db)
+async def export_scan_json(scan_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)) -> JSONResponse:
+    orchestrator = ScanOrchestrator(async_db=db)
     export = await orchestrator.export_scan(scan_id, format="json")
     return JSONResponse(content=export)
 
 
 @api_router.get("/scans/{scan_id}/export.md")
-async def export_scan_md(scan_id: uuid.UUID, db: Session = Depends(get_db)) -> JSONResponse:
-    orchestrator = ScanOrchestrator(db=db)
+async def export_scan_md(scan_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)) -> JSONResponse:
+    orchestrator = ScanOrchestrator(async_db=db)
     export = await orchestrator.export_scan(scan_id, format="md")
     return JSONResponse(content={"content": export})
 
 
+@api_router.get("/advice/{signature}")
+async def get_advice(signature: str, db: AsyncSession = Depends(get_async_db)) -> dict[str, Any]:
+    advice = await db.get(LLMAdvice, signature)
+    if not advice:
+        raise HTTPException(status_code=404, detail="Advice not found")
+    return {"signature": advice.signature, "ruleId": advice.rule_id, "model": advice.model, "contentMd": advice.content_md}
+
+
 @api_router.get("/catalog/rules")
-async def list_rules(service: Optional[str] = Query(None)) -> dict[str, Any]:
-    orchestrator = ScanOrchestrator()
+async def list_rules(
+    service: Optional[str] = Query(None),
+    stats: bool = Query(False),
+    days: int = Query(7, ge=1, le=90),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict[str, Any]:
+    orchestrator = ScanOrchestrator(async_db=db)
     rules = orchestrator.rule_engine.load_rules(service)
-    return {"items": [rule.dict() for rule in rules]}
+    if not stats:
+        return {"items": [rule.dict() for rule in rules]}
+    totals = await orchestrator.rule_stats(datetime.utcnow() - timedelta(days=days))
+    return {"items": [{**rule.dict(), "stats": totals.get(rule.id)} for rule in rules]}
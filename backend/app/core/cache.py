@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from enum import Enum
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import get_settings
+
+if TYPE_CHECKING:
+    import redis
+
+logger = logging.getLogger(__name__)
+
+
+class RedisHealth(str, Enum):
+    unknown = "UNKNOWN"
+    healthy = "HEALTHY"
+    unavailable = "UNAVAILABLE"
+
+
+class RedisConnection:
+    def __init__(self, url: str, retry_seconds: float = 30.0, client: Optional["redis.Redis"] = None) -> None:
+        self.url = url
+        self.retry_seconds = retry_seconds
+        self.state = RedisHealth.unknown
+        self.last_error: Optional[str] = None
+        self._client = client
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def client(self) -> Optional["redis.Redis"]:
+        if self.state == RedisHealth.healthy:
+            return self._client
+        if self.state == RedisHealth.unavailable and time.monotonic() - self._checked_at < self.retry_seconds:
+            return None
+        with self._lock:
+            if self.state != RedisHealth.healthy:
+                self._check()
+        return self._client if self.state == RedisHealth.healthy else None
+
+    def mark_unavailable(self, exc: Exception) -> None:
+        self.state = RedisHealth.unavailable
+        self.last_error = str(exc)
+        self._checked_at = time.monotonic()
+
+    def _get_client(self) -> "redis.Redis":
+        if self._client is None:
+            import redis
+
+            pool = redis.ConnectionPool.from_url(self.url, decode_responses=False, health_check_interval=30)
+            self._client = redis.Redis(connection_pool=pool)
+        return self._client
+
+    def _check(self) -> None:
+        import redis
+
+        try:
+            self._get_client().ping()
+        except redis.RedisError as exc:
+            if self.state != RedisHealth.unavailable:
+                logger.warning("Redis unavailable at %s: %s", self.url, exc)
+            self.mark_unavailable(exc)
+            return
+        self.state = RedisHealth.healthy
+        self.last_error = None
+        self._checked_at = time.monotonic()
+
+
+@lru_cache()
+def get_redis_connection() -> RedisConnection:
+    return RedisConnection(get_settings().redis_url)
+
+
+def get_redis() -> Optional["redis.Redis"]:
+    return get_redis_connection().client()
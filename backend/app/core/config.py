@@ -14,10 +14,44 @@ class Settings(BaseSettings):
     redis_url: str = Field(..., env="REDIS_URL")
     llm_endpoint: Optional[str] = Field(None, env="LLM_ENDPOINT")
     llm_model_path: Optional[str] = Field(None, env="LLM_MODEL_PATH")
+    llm_provider: str = Field(default="auto", env="LLM_PROVIDER")
+    llm_request_timeout_seconds: float = Field(default=120.0, env="LLM_REQUEST_TIMEOUT_SECONDS")
+    llm_server_concurrency: int = Field(default=4, env="LLM_SERVER_CONCURRENCY")
+    llm_server_max_retries: int = Field(default=3, env="LLM_SERVER_MAX_RETRIES")
+    llm_server_backoff_seconds: float = Field(default=0.5, env="LLM_SERVER_BACKOFF_SECONDS")
+    llm_queue_workers: int = Field(default=1, env="LLM_QUEUE_WORKERS")
+    llm_context_tokens: int = Field(default=4096, env="LLM_CONTEXT_TOKENS")
+    llm_tokens_per_advice: int = Field(default=256, env="LLM_TOKENS_PER_ADVICE")
+    llm_advice_enabled: bool = Field(default=True, env="LLM_ADVICE_ENABLED")
     celery_broker_url: Optional[str] = Field(None, env="CELERY_BROKER_URL")
     celery_result_backend: Optional[str] = Field(None, env="CELERY_RESULT_BACKEND")
     feature_flags: List[str] = Field(default_factory=list, env="FEATURE_FLAGS")
     enforce_https: bool = Field(default=True, env="ENFORCE_HTTPS")
+    scan_coalesce_window_seconds: int = Field(default=600, env="SCAN_COALESCE_WINDOW_SECONDS")
+    batch_global_concurrency: int = Field(default=16, env="BATCH_GLOBAL_CONCURRENCY")
+    batch_per_account_concurrency: int = Field(default=2, env="BATCH_PER_ACCOUNT_CONCURRENCY")
+    assume_role_duration_seconds: int = Field(default=3600, env="ASSUME_ROLE_DURATION_SECONDS")
+    assume_role_cache_idle_seconds: int = Field(default=1800, env="ASSUME_ROLE_CACHE_IDLE_SECONDS")
+    assume_role_session_name: str = Field(default="aws-securescope", env="ASSUME_ROLE_SESSION_NAME")
+    credential_vault_allow_memory: bool = Field(default=False, env="CREDENTIAL_VAULT_ALLOW_MEMORY")
+    credential_validation_cache_seconds: int = Field(default=300, env="CREDENTIAL_VALIDATION_CACHE_SECONDS")
+    default_probe_region: str = Field(default="us-east-1", env="DEFAULT_PROBE_REGION")
+    scan_archive_dir: str = Field(default="/var/lib/securescope/archive", env="SCAN_ARCHIVE_DIR")
+    scan_archive_after_days: int = Field(default=30, env="SCAN_ARCHIVE_AFTER_DAYS")
+    scan_archive_pending_advice_hours: int = Field(default=24, env="SCAN_ARCHIVE_PENDING_ADVICE_HOURS")
+    findings_retention_months: int = Field(default=0, env="FINDINGS_RETENTION_MONTHS")
+    compact_resources: bool = Field(default=True, env="COMPACT_RESOURCES")
+    inventory_cache_enabled: bool = Field(default=False, env="INVENTORY_CACHE_ENABLED")
+    inventory_full_refresh_hours: float = Field(default=24.0, env="INVENTORY_FULL_REFRESH_HOURS")
+    resource_store_backend: str = Field(default="auto", env="RESOURCE_STORE_BACKEND")
+    resource_store_memory_limit_mb: int = Field(default=256, env="RESOURCE_STORE_MEMORY_LIMIT_MB")
+    resource_store_dir: str = Field(default="", env="RESOURCE_STORE_DIR")
+    vectorized_rules_enabled: bool = Field(default=True, env="VECTORIZED_RULES_ENABLED")
+    rule_profiling_enabled: bool = Field(default=False, env="RULE_PROFILING_ENABLED")
+    rule_time_budget_seconds: float = Field(default=0.0, env="RULE_TIME_BUDGET_SECONDS")
+    rule_budget_action: str = Field(default="flag", env="RULE_BUDGET_ACTION")
+    telemetry_enabled: bool = Field(default=False, env="TELEMETRY_ENABLED")
+    worker_metrics_port: int = Field(default=0, env="WORKER_METRICS_PORT")
 
     class Config:
         env_file = ".env"
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
-import os
+import json
 import secrets
 import time
-from dataclasses import dataclass
-from typing import Dict, Optional
-
-import redis
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
 
+from app.core.cache import RedisConnection, get_redis_connection
 from app.core.config import get_settings
 
+if TYPE_CHECKING:
+    import redis
+
+KEY_PREFIX = "vault:"
+
+
+class VaultUnavailableError(RuntimeError):
+    pass
+
 
 @dataclass
 class EphemeralCredential:
@@ -22,62 +30,100 @@ class EphemeralCredential:
 
 
 class CredentialVault:
-    def __init__(self) -> None:
-        self.settings = get_settings()
-        self._redis: Optional[redis.Redis] = None
-        try:
-            self._redis = redis.Redis.from_url(self.settings.redis_url, decode_responses=False)
-            self._redis.ping()
-        except Exception:
-            self._redis = None
+    def __init__(self, connection: Optional[RedisConnection] = None, allow_memory: Optional[bool] = None) -> None:
+        self._connection = connection
+        self._allow_memory = allow_memory
         self._memory: Dict[str, EphemeralCredential] = {}
 
+    @property
+    def connection(self) -> RedisConnection:
+        if self._connection is None:
+            self._connection = get_redis_connection()
+        return self._connection
+
+    @property
+    def allow_memory(self) -> bool:
+        if self._allow_memory is None:
+            return get_settings().credential_vault_allow_memory
+        return self._allow_memory
+
+    def health(self) -> Dict[str, Any]:
+        client = self.connection.client()
+        backend = "redis" if client is not None else ("memory" if self.allow_memory else "unavailable")
+        return {"backend": backend, "state": self.connection.state.value, "error": self.connection.last_error}
+
     def store(self, cred: EphemeralCredential, ttl: int = 900) -> str:
         key = secrets.token_urlsafe(16)
         cred.expires_at = time.time() + ttl
-        if self._redis:
-            payload = {
-                "access_key_id": cred.access_key_id,
-                "secret_access_key": cred.secret_access_key,
-            }
-            if cred.session_token:
-                payload["session_token"] = cred.session_token
-            if cred.role_arn:
-                payload["role_arn"] = cred.role_arn
-            if cred.external_id:
-                payload["external_id"] = cred.external_id
-            self._redis.hset(key, mapping=payload)
-            self._redis.expire(key, ttl)
-        else:
+        client = self._client()
+        if client is None:
             self._memory[key] = cred
+            return key
+        payload = {name: value for name, value in asdict(cred).items() if value and name != "expires_at"}
+        self._call(client.set, KEY_PREFIX + key, json.dumps(payload), ex=ttl)
         return key
 
     def retrieve(self, key: str) -> Optional[EphemeralCredential]:
-        if self._redis:
-            values = self._redis.hgetall(key)
-            if not values:
-                return None
-            data = {k.decode(): v.decode() for k, v in values.items()}
-            return EphemeralCredential(
-                access_key_id=data["access_key_id"],
-                secret_access_key=data["secret_access_key"],
-                session_token=data.get("session_token"),
-                role_arn=data.get("role_arn"),
-                external_id=data.get("external_id"),
-                expires_at=time.time(),
-            )
-        cred = self._memory.get(key)
+        client = self._client()
+        if client is None:
+            return self._memory_get(key, consume=False)
+        return self._decode(self._call(client.get, KEY_PREFIX + key))
+
+    def consume(self, key: str) -> Optional[EphemeralCredential]:
+        client = self._client()
+        if client is None:
+            return self._memory_get(key, consume=True)
+        return self._decode(self._call(client.getdel, KEY_PREFIX + key))
+
+    def revoke(self, key: str) -> None:
+        self.revoke_many([key])
+
+    def revoke_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        client = self._client()
+        if client is None:
+            for key in keys:
+                self._memory.pop(key, None)
+            return
+        self._call(client.delete, *[KEY_PREFIX + key for key in keys])
+
+    def _client(self) -> Optional["redis.Redis"]:
+        client = self.connection.client()
+        if client is None and not self.allow_memory:
+            raise VaultUnavailableError(f"Credential vault unavailable: {self.connection.last_error or 'Redis not reachable'}")
+        return client
+
+    def _call(self, command, *args, **kwargs):
+        import redis
+
+        try:
+            return command(*args, **kwargs)
+        except redis.RedisError as exc:
+            self.connection.mark_unavailable(exc)
+            raise VaultUnavailableError(f"Credential vault unavailable: {exc}") from exc
+
+    def _memory_get(self, key: str, consume: bool) -> Optional[EphemeralCredential]:
+        cred = self._memory.pop(key, None) if consume else self._memory.get(key)
         if cred and cred.expires_at >= time.time():
             return cred
-        if cred:
-            del self._memory[key]
+        self._memory.pop(key, None)
         return None
 
-    def revoke(self, key: str) -> None:
-        if self._redis:
-            self._redis.delete(key)
-        else:
-            self._memory.pop(key, None)
+    @staticmethod
+    def _decode(raw: Optional[bytes]) -> Optional[EphemeralCredential]:
+        if not raw:
+            return None
+        data = json.loads(raw)
+        return EphemeralCredential(
+            access_key_id=data["access_key_id"],
+            secret_access_key=data["secret_access_key"],
+            session_token=data.get("session_token"),
+            role_arn=data.get("role_arn"),
+            external_id=data.get("external_id"),
+            expires_at=time.time(),
+        )
 
 
 vault = CredentialVault()
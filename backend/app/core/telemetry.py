@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "SlowDown",
+}
+_CONTEXT_KEY = "securescope_telemetry"
+_NULL_SPAN = contextlib.nullcontext()
+
+_sqlalchemy_telemetry: Optional["Telemetry"] = None
+_current_rollup: contextvars.ContextVar[Optional["ScanRollup"]] = contextvars.ContextVar(
+    "securescope_scan_rollup", default=None
+)
+
+
+class ScanRollup:
+    def __init__(self) -> None:
+        self._stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, target: str, seconds: float, **counters: int) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(name, {}).setdefault(target, {"count": 0, "seconds": 0.0, "maxSeconds": 0.0})
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            stats["maxSeconds"] = max(stats["maxSeconds"], seconds)
+            for key, value in counters.items():
+                stats[key] = stats.get(key, 0) + value
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        with self._lock:
+            return {
+                name: {
+                    target: {key: round(value, 6) if isinstance(value, float) else value for key, value in stats.items()}
+                    for target, stats in targets.items()
+                }
+                for name, targets in self._stats.items()
+            }
+
+
+class _Metrics:
+    def __init__(self) -> None:
+        from prometheus_client import Counter, Gauge, Histogram
+
+        self.operation_seconds = Histogram(
+            "securescope_operation_seconds",
+            "Duration of instrumented scan operations",
+            ["operation", "target"],
+        )
+        self.aws_call_seconds = Histogram(
+            "securescope_aws_call_seconds",
+            "Duration of AWS API calls including retries",
+            ["service", "operation", "region"],
+        )
+        self.aws_retries = Counter(
+            "securescope_aws_retries_total",
+            "AWS API retry attempts",
+            ["service", "operation", "region"],
+        )
+        self.aws_throttles = Counter(
+            "securescope_aws_throttles_total",
+            "Throttled AWS API responses",
+            ["service", "operation", "region"],
+        )
+        self.llm_queue_depth = Gauge(
+            "securescope_llm_queue_depth",
+            "LLM generation jobs waiting for a model worker",
+            multiprocess_mode="livesum",
+        )
+        self.llm_in_flight = Gauge(
+            "securescope_llm_in_flight",
+            "LLM generation jobs currently running",
+            multiprocess_mode="livesum",
+        )
+        self.llm_wait_seconds = Histogram(
+            "securescope_llm_queue_wait_seconds",
+            "Time LLM generation jobs spend queued before a worker picks them up",
+        )
+        self.llm_latency_seconds = Histogram(
+            "securescope_llm_latency_seconds",
+            "End-to-end LLM generation latency including queue wait",
+            ["outcome"],
+        )
+
+
+class Telemetry:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._metrics: Optional[_Metrics] = None
+        self._tracer: Any = None
+        self._rollups: Dict[str, ScanRollup] = {}
+        self._lock = threading.Lock()
+        if enabled:
+            self._metrics = _load_metrics()
+            self._tracer = _load_tracer()
+
+    def span(self, name: str, target: str = "", **attributes: Any):
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, target, attributes)
+
+    @contextlib.contextmanager
+    def _span(self, name: str, target: str, attributes: Dict[str, Any]) -> Iterator[None]:
+        started = time.perf_counter()
+        tracer_span = (
+            self._tracer.start_as_current_span(name, attributes={"target": target, **attributes})
+            if self._tracer is not None
+            else _NULL_SPAN
+        )
+        with tracer_span:
+            try:
+                yield
+            finally:
+                self.record(name, target, time.perf_counter() - started)
+
+    def record(self, name: str, target: str, seconds: float, **counters: int) -> None:
+        if not self.enabled:
+            return
+        if self._metrics is not None:
+            self._metrics.operation_seconds.labels(name, target).observe(seconds)
+        rollup = _current_rollup.get()
+        if rollup is not None:
+            rollup.add(name, target, seconds, **counters)
+
+    def llm_queue(self, depth: int, in_flight: int) -> None:
+        if self._metrics is not None:
+            self._metrics.llm_queue_depth.set(depth)
+            self._metrics.llm_in_flight.set(in_flight)
+
+    def llm_job(self, wait_seconds: float, latency_seconds: float, outcome: str) -> None:
+        if self._metrics is not None:
+            self._metrics.llm_wait_seconds.observe(wait_seconds)
+            self._metrics.llm_latency_seconds.labels(outcome).observe(latency_seconds)
+
+    def rollup(self, scan_id: Any) -> Optional[ScanRollup]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._rollups.setdefault(str(scan_id), ScanRollup())
+
+    def release(self, scan_id: Any) -> None:
+        with self._lock:
+            self._rollups.pop(str(scan_id), None)
+
+    @contextlib.contextmanager
+    def scan(self, scan_id: Any) -> Iterator[Optional[ScanRollup]]:
+        rollup = self.rollup(scan_id)
+        token = _current_rollup.set(rollup)
+        try:
+            yield rollup
+        finally:
+            _current_rollup.reset(token)
+
+    def instrument_session(self, session: Any) -> Any:
+        if not self.enabled:
+            return session
+        events = session.events
+        events.register("before-parameter-build", self._before_aws_call, unique_id="securescope-before-call")
+        events.register("needs-retry", self._on_aws_retry, unique_id="securescope-needs-retry")
+        events.register("after-call", self._after_aws_call, unique_id="securescope-after-call")
+        events.register("after-call-error", self._after_aws_call, unique_id="securescope-after-call-error")
+        return session
+
+    def instrument_sqlalchemy(self) -> None:
+        if not self.enabled:
+            return
+        from sqlalchemy import event
+        from sqlalchemy.orm import Session
+
+        global _sqlalchemy_telemetry
+        _sqlalchemy_telemetry = self
+        if event.contains(Session, "before_flush", _before_flush):
+            return
+        event.listen(Session, "before_flush", _before_flush)
+        event.listen(Session, "after_flush_postexec", _after_flush)
+        event.listen(Session, "before_commit", _before_commit)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_rollback", _after_rollback)
+
+    def render_metrics(self) -> Tuple[bytes, str]:
+        from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+
+        return generate_latest(_registry() or REGISTRY), CONTENT_TYPE_LATEST
+
+    def start_metrics_server(self, port: int) -> None:
+        if not self.enabled or not port:
+            return
+        from prometheus_client import REGISTRY, start_http_server
+
+        start_http_server(port, registry=_registry() or REGISTRY)
+        logger.info("Serving worker metrics on port %d", port)
+
+    def _before_aws_call(self, model: Any, context: Dict[str, Any], **_: Any) -> None:
+        context[_CONTEXT_KEY] = {
+            "service": model.service_model.service_name,
+            "operation": model.name,
+            "region": context.get("client_region") or "global",
+            "started": time.perf_counter(),
+            "throttles": 0,
+            "span": self._tracer.start_span(f"aws.{model.service_model.service_name}.{model.name}") if self._tracer else None,
+        }
+
+    def _on_aws_retry(self, request_dict: Dict[str, Any], response: Any = None, **_: Any) -> None:
+        call = (request_dict.get("context") or {}).get(_CONTEXT_KEY)
+        if call is None or not response:
+            return
+        code = (response[1] or {}).get("Error", {}).get("Code")
+        if code in THROTTLE_CODES:
+            call["throttles"] += 1
+
+    def _after_aws_call(self, context: Dict[str, Any], parsed: Any = None, exception: Any = None, **_: Any) -> None:
+        call = context.pop(_CONTEXT_KEY, None)
+        if call is None:
+            return
+        seconds = time.perf_counter() - call["started"]
+        metadata = (parsed or {}).get("ResponseMetadata", {}) if isinstance(parsed, dict) else {}
+        retries = int(metadata.get("RetryAttempts", 0))
+        if exception is not None:
+            retries = int((getattr(exception, "response", None) or {}).get("ResponseMetadata", {}).get("RetryAttempts", 0))
+        labels = (call["service"], call["operation"], call["region"])
+        if self._metrics is not None:
+            self._metrics.aws_call_seconds.labels(*labels).observe(seconds)
+            if retries:
+                self._metrics.aws_retries.labels(*labels).inc(retries)
+            if call["throttles"]:
+                self._metrics.aws_throttles.labels(*labels).inc(call["throttles"])
+        if call["span"] is not None:
+            call["span"].set_attributes(
+                {"aws.region": call["region"], "aws.retries": retries, "aws.throttles": call["throttles"]}
+            )
+            call["span"].end()
+        rollup = _current_rollup.get()
+        if rollup is not None:
+            rollup.add(
+                "aws.call",
+                f"{call['service']}.{call['operation']}",
+                seconds,
+                retries=retries,
+                throttles=call["throttles"],
+            )
+
+
+@lru_cache()
+def _load_metrics() -> Optional[_Metrics]:
+    try:
+        return _Metrics()
+    except ImportError:
+        logger.warning("prometheus_client not installed; metrics export disabled")
+        return None
+
+
+def _load_tracer() -> Any:
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return None
+    return trace.get_tracer("securescope")
+
+
+def _registry() -> Any:
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        return None
+    os.makedirs(path, exist_ok=True)
+    from prometheus_client import CollectorRegistry, multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def _before_flush(session: Any, flush_context: Any, instances: Any) -> None:
+    session.info["telemetry_flush"] = (time.perf_counter(), len(session.new) + len(session.dirty) + len(session.deleted))
+
+
+def _after_flush(session: Any, flush_context: Any) -> None:
+    started = session.info.pop("telemetry_flush", None)
+    if started and _sqlalchemy_telemetry is not None:
+        _sqlalchemy_telemetry.record("db.flush", "", time.perf_counter() - started[0], rows=started[1])
+
+
+def _before_commit(session: Any) -> None:
+    session.info["telemetry_commit"] = time.perf_counter()
+
+
+def _after_commit(session: Any) -> None:
+    started = session.info.pop("telemetry_commit", None)
+    if started and _sqlalchemy_telemetry is not None:
+        _sqlalchemy_telemetry.record("db.commit", "", time.perf_counter() - started)
+
+
+def _after_rollback(session: Any) -> None:
+    session.info.pop("telemetry_commit", None)
+    session.info.pop("telemetry_flush", None)
+
+
+@lru_cache()
+def get_telemetry() -> Telemetry:
+    telemetry = Telemetry(enabled=get_settings().telemetry_enabled)
+    telemetry.instrument_sqlalchemy()
+    return telemetry
@@ -1,14 +1,55 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import get_settings
 
-settings = get_settings()
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(database_url: str) -> str:
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+@lru_cache()
+def get_engine() -> Engine:
+    return create_engine(get_settings().database_url, pool_pre_ping=True, future=True)
+
+
+@lru_cache()
+def get_async_engine() -> AsyncEngine:
+    return create_async_engine(async_database_url(get_settings().database_url), pool_pre_ping=True)
+
+
+@lru_cache()
+def _session_factory() -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine(), future=True)
 
-engine = create_engine(settings.database_url, pool_pre_ping=True, future=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+
+@lru_cache()
+def _async_session_factory() -> async_sessionmaker:
+    return async_sessionmaker(get_async_engine(), class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+def SessionLocal(**kwargs) -> Session:
+    return _session_factory()(**kwargs)
+
+
+def AsyncSessionLocal(**kwargs) -> AsyncSession:
+    return _async_session_factory()(**kwargs)
 
 
 def get_db():
@@ -17,3 +58,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
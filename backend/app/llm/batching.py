@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ASSISTANT_PROMPT = (
+    "You are AWS SecureScope, a security assistant. "
+    "Create concise Markdown with sections: Why it matters, Remediation steps (CLI + Console), "
+    "Blast radius, and Regression tests."
+)
+SYSTEM_PROMPT = ASSISTANT_PROMPT + (
+    "\nEach finding below starts with a header line such as '### F1'. "
+    "Answer every finding in order, starting each answer with its header line exactly as given.\n"
+)
+BATCH_MARGIN_TOKENS = 16
+TRUNCATION_MARK = "...[truncated]"
+SECTION_PATTERN = re.compile(r"^###\s*(F\d+)\s*$", re.MULTILINE)
+
+
+@dataclass
+class PromptBatch:
+    keys: List[str] = field(default_factory=list)
+    sections: List[str] = field(default_factory=list)
+    prompt_tokens: int = 0
+
+    @property
+    def labels(self) -> List[str]:
+        return [f"F{index + 1}" for index in range(len(self.keys))]
+
+    def render(self, system_prompt: str = SYSTEM_PROMPT) -> str:
+        body = "".join(f"### {label}\n{section}\n" for label, section in zip(self.labels, self.sections))
+        return system_prompt + body
+
+
+class PromptBatchPlanner:
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int],
+        context_tokens: int,
+        tokens_per_item: int,
+        system_prompt: str = SYSTEM_PROMPT,
+    ) -> None:
+        self.count_tokens = count_tokens
+        self.context_tokens = context_tokens
+        self.tokens_per_item = tokens_per_item
+        self.system_prompt = system_prompt
+        self.system_tokens = 0
+
+    def max_tokens(self, batch: PromptBatch) -> int:
+        return self.tokens_per_item * len(batch.keys)
+
+    def sizing_texts(self, items: Dict[str, Dict[str, Any]]) -> List[str]:
+        return [self.system_prompt] + [_sizing_text(render_section(item)) for item in items.values()]
+
+    def plan(self, items: Dict[str, Dict[str, Any]]) -> List[PromptBatch]:
+        self.system_tokens = self.count_tokens(self.system_prompt)
+        sized = []
+        for key, item in items.items():
+            fitted = self._fit_section(render_section(item))
+            if fitted is None:
+                logger.warning("Finding %s does not fit the LLM context and was skipped", key)
+                continue
+            sized.append((fitted[0], key, fitted[1]))
+        sized.sort(key=lambda entry: (-entry[0], entry[1]))
+
+        batches: List[PromptBatch] = []
+        for tokens, key, section in sized:
+            target = next((batch for batch in batches if self._fits(batch, tokens)), None)
+            if target is None:
+                target = PromptBatch(prompt_tokens=self.system_tokens)
+                batches.append(target)
+            target.keys.append(key)
+            target.sections.append(section)
+            target.prompt_tokens += tokens
+        return batches
+
+    def _fit_section(self, section: str) -> Optional[Tuple[int, str]]:
+        # A single section must leave room for the system prompt and its own answer.
+        limit = self.context_tokens - self.system_tokens - self.tokens_per_item - BATCH_MARGIN_TOKENS
+        text = section
+        while True:
+            tokens = self.count_tokens(_sizing_text(text))
+            if tokens <= limit:
+                return tokens, text
+            kept = len(text) - len(TRUNCATION_MARK) if text.endswith(TRUNCATION_MARK) else len(text)
+            if kept <= 0:
+                return None
+            kept = min(kept - 1, kept * max(limit, 0) // tokens)
+            text = section[:kept] + TRUNCATION_MARK
+
+    def _fits(self, batch: PromptBatch, tokens: int) -> bool:
+        needed = batch.prompt_tokens + tokens + self.tokens_per_item * (len(batch.keys) + 1)
+        return needed + BATCH_MARGIN_TOKENS <= self.context_tokens
+
+
+def _sizing_text(section: str) -> str:
+    return f"### F00\n{section}\n"
+
+
+def render_section(item: Dict[str, Any]) -> str:
+    payload = {
+        "rule_id": item["rule_id"],
+        "severity": item["severity"],
+        "evidence": item.get("evidence", {}),
+    }
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def split_sections(text: str, batch: PromptBatch) -> Dict[str, Optional[str]]:
+    labels = dict(zip(batch.labels, batch.keys))
+    results: Dict[str, Optional[str]] = {key: None for key in batch.keys}
+    if len(batch.keys) == 1 and not SECTION_PATTERN.search(text):
+        results[batch.keys[0]] = text.strip() or None
+        return results
+    matches = list(SECTION_PATTERN.finditer(text))
+    for index, match in enumerate(matches):
+        key = labels.get(match.group(1))
+        if key is None or results[key] is not None:
+            continue
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(text)
+        results[key] = text[match.end() : end].strip() or None
+    return results
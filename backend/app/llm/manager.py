@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.core.telemetry import get_telemetry
+from app.llm.batching import PromptBatch, PromptBatchPlanner, split_sections
+from app.llm.providers.base import LLMProvider
+
+logger = logging.getLogger(__name__)
+
+ProviderFactory = Callable[[], LLMProvider]
+
+
+def _default_provider_factory() -> LLMProvider:
+    settings = get_settings()
+    provider = settings.llm_provider.lower()
+    if provider == "server" or (provider == "auto" and settings.llm_endpoint):
+        from app.llm.providers.llama_server import LlamaServerProvider
+
+        return LlamaServerProvider()
+    from app.llm.providers.mistral_local import LocalMistralProvider
+
+    return LocalMistralProvider()
+
+
+@dataclass
+class _Job:
+    run: Callable[[LLMProvider], Awaitable[str]]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class _LoopQueue:
+    queue: asyncio.Queue
+    workers: List[asyncio.Task]
+
+
+@dataclass
+class QueueMetrics:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    total_wait_ms: float = 0.0
+    total_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+
+
+class ModelManager:
+    def __init__(self, provider_factory: Optional[ProviderFactory] = None, workers: Optional[int] = None) -> None:
+        settings = get_settings()
+        self.workers = max(1, workers or settings.llm_queue_workers)
+        self._provider_factory = provider_factory or _default_provider_factory
+        self._provider: Optional[LLMProvider] = None
+        self._load_error: Optional[Exception] = None
+        self._load_lock = threading.Lock()
+        self._queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopQueue]" = weakref.WeakKeyDictionary()
+        self._metrics = QueueMetrics()
+
+    def get_provider(self) -> Optional[LLMProvider]:
+        if self._provider is not None or self._load_error is not None:
+            return self._provider
+        with self._load_lock:
+            if self._provider is None and self._load_error is None:
+                try:
+                    self._provider = self._provider_factory()
+                except Exception as exc:
+                    logger.warning("LLM provider unavailable: %s", exc)
+                    self._load_error = exc
+        return self._provider
+
+    async def generate(self, findings: List[Dict[str, Any]]) -> Optional[str]:
+        provider = await asyncio.to_thread(self.get_provider)
+        if provider is None:
+            return None
+        return await self._submit(lambda p: p.generate(findings))
+
+    async def generate_grouped(self, items: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        results: Dict[str, Optional[str]] = {key: None for key in items}
+        provider = await asyncio.to_thread(self.get_provider)
+        if provider is None or not items:
+            return results
+        settings = get_settings()
+        planner = PromptBatchPlanner(
+            provider.count_tokens,
+            context_tokens=settings.llm_context_tokens,
+            tokens_per_item=settings.llm_tokens_per_advice,
+        )
+        await provider.warm_token_counts(planner.sizing_texts(items))
+        batches = await asyncio.to_thread(planner.plan, items)
+
+        async def run_batch(batch: PromptBatch) -> None:
+            prompt = batch.render(planner.system_prompt)
+            max_tokens = planner.max_tokens(batch)
+            try:
+                text = await self._submit(lambda p: p.complete(prompt, max_tokens))
+            except Exception as exc:
+                logger.warning("LLM batch of %d findings failed: %s", len(batch.keys), exc)
+                return
+            results.update(split_sections(text, batch))
+
+        await asyncio.gather(*[run_batch(batch) for batch in batches])
+        return results
+
+    async def _submit(self, run: Callable[[LLMProvider], Awaitable[str]]) -> str:
+        loop = asyncio.get_running_loop()
+        job = _Job(run=run, future=loop.create_future())
+        await self._queue_for(loop).queue.put(job)
+        self._metrics.submitted += 1
+        self._publish_queue()
+        return await job.future
+
+    def metrics(self) -> Dict[str, Any]:
+        m = self._metrics
+        finished = m.completed + m.failed
+        return {
+            "loaded": self._provider is not None,
+            "workers": self.workers,
+            "queueDepth": self._queue_depth(),
+            "inFlight": m.in_flight,
+            "submitted": m.submitted,
+            "completed": m.completed,
+            "failed": m.failed,
+            "avgWaitMs": round(m.total_wait_ms / finished, 2) if finished else 0.0,
+            "avgLatencyMs": round(m.total_latency_ms / finished, 2) if finished else 0.0,
+            "maxLatencyMs": round(m.max_latency_ms, 2),
+        }
+
+    def _queue_depth(self) -> int:
+        return sum(entry.queue.qsize() for entry in list(self._queues.values()))
+
+    def _publish_queue(self) -> None:
+        get_telemetry().llm_queue(self._queue_depth(), self._metrics.in_flight)
+
+    def _queue_for(self, loop: asyncio.AbstractEventLoop) -> _LoopQueue:
+        entry = self._queues.get(loop)
+        if entry is None:
+            queue: asyncio.Queue = asyncio.Queue()
+            workers = [loop.create_task(self._worker(queue)) for _ in range(self.workers)]
+            entry = _LoopQueue(queue=queue, workers=workers)
+            self._queues[loop] = entry
+        return entry
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            job: _Job = await queue.get()
+            started = time.perf_counter()
+            self._metrics.in_flight += 1
+            self._publish_queue()
+            outcome = "failed"
+            try:
+                with get_telemetry().span("llm.generate", type(self._provider).__name__):
+                    result = await job.run(self._provider)  # type: ignore[arg-type]
+            except Exception as exc:
+                self._metrics.failed += 1
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            else:
+                self._metrics.completed += 1
+                outcome = "completed"
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                finished = time.perf_counter()
+                self._metrics.in_flight -= 1
+                self._metrics.total_wait_ms += (started - job.enqueued_at) * 1000
+                latency_ms = (finished - job.enqueued_at) * 1000
+                self._metrics.total_latency_ms += latency_ms
+                self._metrics.max_latency_ms = max(self._metrics.max_latency_ms, latency_ms)
+                get_telemetry().llm_job(started - job.enqueued_at, finished - job.enqueued_at, outcome)
+                self._publish_queue()
+                queue.task_done()
+
+
+@lru_cache()
+def get_model_manager() -> ModelManager:
+    return ModelManager()
@@ -8,3 +8,13 @@ class LLMProvider(ABC):
     @abstractmethod
     async def generate(self, findings: List[Dict[str, Any]]) -> str:
         raise NotImplementedError
+
+    @abstractmethod
+    async def complete(self, prompt: str, max_tokens: int) -> str:
+        raise NotImplementedError
+
+    def count_tokens(self, text: str) -> int:
+        return max(1, len(text) // 4)
+
+    async def warm_token_counts(self, texts: List[str]) -> None:
+        return None
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import secrets
+import weakref
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.core.config import get_settings
+from app.llm.batching import ASSISTANT_PROMPT
+from app.llm.providers.base import LLMProvider
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 502, 503, 504}
+TOKEN_CACHE_SIZE = 4096
+_jitter = secrets.SystemRandom()
+
+
+class LLMOverloadedError(RuntimeError):
+    pass
+
+
+@dataclass
+class _LoopClient:
+    client: httpx.AsyncClient
+    semaphore: asyncio.Semaphore
+    closer: asyncio.Task
+
+
+class LlamaServerProvider(LLMProvider):
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        max_tokens: int = 512,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        settings = get_settings()
+        self.endpoint = (endpoint or settings.llm_endpoint or "").rstrip("/")
+        if not self.endpoint:
+            raise RuntimeError("LLM endpoint must be configured via LLM_ENDPOINT")
+        self.max_tokens = max_tokens
+        self.concurrency = max(1, settings.llm_server_concurrency)
+        self.max_retries = settings.llm_server_max_retries
+        self.backoff_seconds = settings.llm_server_backoff_seconds
+        self.timeout = httpx.Timeout(settings.llm_request_timeout_seconds, connect=5.0)
+        self.limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        self._transport = transport
+        self._token_counts: Dict[str, int] = {}
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopClient]" = weakref.WeakKeyDictionary()
+
+    async def __aenter__(self) -> "LlamaServerProvider":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        entry = self._clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            entry.closer.cancel()
+            await asyncio.gather(entry.closer, return_exceptions=True)
+
+    async def generate(self, findings: List[Dict[str, Any]]) -> str:
+        payload = {
+            "risk_summary": [
+                {
+                    "rule_id": f["rule_id"],
+                    "severity": f["severity"],
+                    "risk_category": f["evidence"].get("message") or f["rule_id"],
+                }
+                for f in findings
+            ]
+        }
+        return await self.complete(f"{ASSISTANT_PROMPT}\nContext: {json.dumps(payload)}", self.max_tokens)
+
+    async def complete(self, prompt: str, max_tokens: int) -> str:
+        parts = [token async for token in self.stream(prompt, max_tokens)]
+        return "".join(parts).strip()
+
+    async def stream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        entry = self._client()
+        body = {
+            "prompt": prompt,
+            "n_predict": max_tokens,
+            "temperature": 0.2,
+            "top_p": 0.9,
+            "stop": ["</s>"],
+            "stream": True,
+            "cache_prompt": True,
+        }
+        for attempt in range(self.max_retries + 1):
+            async with entry.semaphore:
+                async with entry.client.stream("POST", "/completion", json=body) as response:
+                    if response.status_code not in RETRYABLE_STATUS:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            chunk = json.loads(line[5:].strip())
+                            if chunk.get("content"):
+                                yield chunk["content"]
+                            if chunk.get("stop"):
+                                break
+                        return
+                    await response.aread()
+            if attempt == self.max_retries:
+                raise LLMOverloadedError(f"LLM server overloaded (HTTP {response.status_code})")
+            # The slot is released while backing off so other requests can use it.
+            delay = self.backoff_seconds * (2**attempt) * (1 + _jitter.random())
+            logger.info("LLM server returned %s, retrying in %.2fs", response.status_code, delay)
+            await asyncio.sleep(delay)
+
+    def count_tokens(self, text: str) -> int:
+        cached = self._token_counts.get(text)
+        return cached if cached is not None else super().count_tokens(text)
+
+    async def warm_token_counts(self, texts: List[str]) -> None:
+        client = self._client().client
+
+        async def tokenize(text: str) -> None:
+            try:
+                response = await client.post("/tokenize", json={"content": text})
+                response.raise_for_status()
+                self._token_counts[text] = len(response.json()["tokens"])
+            except (httpx.HTTPError, KeyError, ValueError):
+                return
+
+        missing = list(dict.fromkeys(text for text in texts if text not in self._token_counts))
+        await asyncio.gather(*[tokenize(text) for text in missing])
+        while len(self._token_counts) > TOKEN_CACHE_SIZE:
+            del self._token_counts[next(iter(self._token_counts))]
+
+    def _client(self) -> _LoopClient:
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is None:
+            client = httpx.AsyncClient(
+                base_url=self.endpoint,
+                timeout=self.timeout,
+                limits=self.limits,
+                transport=self._transport,
+            )
+            entry = _LoopClient(client, asyncio.Semaphore(self.concurrency), loop.create_task(_close_on_shutdown(client)))
+            self._clients[loop] = entry
+        return entry
+
+
+async def _close_on_shutdown(client: httpx.AsyncClient) -> None:
+    # asyncio.run cancels pending tasks before closing its loop, which closes the client with it.
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await client.aclose()
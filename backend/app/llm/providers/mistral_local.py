@@ -2,14 +2,17 @@ from __future__ import annotations
 
 import asyncio
 import json
+import threading
 from typing import Any, Dict, List, Optional
 
 try:
-    from llama_cpp import Llama
+    from llama_cpp import Llama, LlamaRAMCache
 except ImportError:  # pragma: no cover - optional dependency
     Llama = None  # type: ignore[assignment]
+    LlamaRAMCache = None  # type: ignore[assignment]
 
 from app.core.config import get_settings
+from app.llm.batching import ASSISTANT_PROMPT
 from app.llm.providers.base import LLMProvider
 
 
@@ -21,8 +24,11 @@ class LocalMistralProvider(LLMProvider):
             raise RuntimeError("llama-cpp-python is not installed; disable LLM or install the dependency")
         if not self.model_path:
             raise RuntimeError("LLM model path must be configured via LLM_MODEL_PATH")
-        self._llama = Llama(model_path=self.model_path, n_gpu_layers=0, n_ctx=4096)
+        self._llama = Llama(model_path=self.model_path, n_gpu_layers=0, n_ctx=settings.llm_context_tokens)
+        if LlamaRAMCache is not None:
+            self._llama.set_cache(LlamaRAMCache())
         self.max_tokens = max_tokens
+        self._lock = threading.Lock()
 
     async def generate(self, findings: List[Dict[str, Any]]) -> str:
         payload = {
@@ -35,22 +41,23 @@ class LocalMistralProvider(LLMProvider):
                 for f in findings
             ]
         }
-        prompt = (
-            "You are AWS SecureScope, a security assistant. "
-            "Create concise Markdown with sections: Why it matters, Remediation steps (CLI + Console), "
-            "Blast radius, and Regression tests."
-        )
-        combined = f"{prompt}\nContext: {json.dumps(payload)}"
+        combined = f"{ASSISTANT_PROMPT}\nContext: {json.dumps(payload)}"
+        return await self.complete(combined, self.max_tokens)
 
+    async def complete(self, prompt: str, max_tokens: int) -> str:
         loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            lambda: self._llama(
-                combined,
-                max_tokens=self.max_tokens,
+        result = await loop.run_in_executor(None, lambda: self._complete(prompt, max_tokens))
+        return result["choices"][0]["text"].strip()
+
+    def count_tokens(self, text: str) -> int:
+        return len(self._llama.tokenize(text.encode("utf-8"), add_bos=False))
+
+    def _complete(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        with self._lock:
+            return self._llama(
+                prompt,
+                max_tokens=max_tokens,
                 temperature=0.2,
                 top_p=0.9,
                 stop=["</s>"]
-            ),
-        )
-        return result["choices"][0]["text"].strip()
+            )
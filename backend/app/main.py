@@ -3,10 +3,11 @@ from __future__ import annotations
 import logging
 from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from app.api import routes
 from app.core.config import get_settings
+from app.core.telemetry import get_telemetry
 
 settings = get_settings()
 
@@ -17,6 +18,14 @@ def create_app() -> FastAPI:
     application = FastAPI(title=settings.app_name)
 
     application.include_router(routes.api_router, prefix=settings.api_prefix)
+    telemetry = get_telemetry()
+
+    @application.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        if not telemetry.enabled:
+            raise HTTPException(status_code=404, detail="Telemetry disabled")
+        body, content_type = telemetry.render_metrics()
+        return Response(content=body, media_type=content_type)
 
     application.add_middleware(
         CORSMiddleware,
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import uuid
 from datetime import datetime
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Set
 from uuid import uuid4
 
-from sqlalchemy import JSON, Column, DateTime, ForeignKey, String, Text
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Insert, Integer, String, Text, event, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 
 from app.models.base import Base
 
@@ -20,16 +24,38 @@ class ScanStatusEnum(str, Enum):
     partial = "PARTIAL"
 
 
+class AdviceStatusEnum(str, Enum):
+    pending = "PENDING"
+    ready = "READY"
+    failed = "FAILED"
+    skipped = "SKIPPED"
+
+
+class ScanBatch(Base):
+    __tablename__ = "scan_batches"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    status: Mapped[str] = mapped_column(String, default=ScanStatusEnum.pending.value, nullable=False)
+
+    scans: Mapped[List["ScanRun"]] = relationship("ScanRun", back_populates="batch")
+
+
 class ScanRun(Base):
     __tablename__ = "scan_runs"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     status = Column(String, default=ScanStatusEnum.pending.value, nullable=False)
     region_scope = Column(JSON, nullable=False, default=list)
-    caller_identity = Column(JSON, nullable=True)
+    caller_identity: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
     minimal_permissions = Column(JSON, nullable=True)
+    batch_id = Column(UUID(as_uuid=True), ForeignKey("scan_batches.id"), nullable=True)
+    archived_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    archive_path: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    metrics: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
 
+    batch = relationship("ScanBatch", back_populates="scans")
     regions = relationship("ScanRegion", back_populates="scan", cascade="all, delete-orphan")
     findings = relationship("Finding", back_populates="scan", cascade="all, delete-orphan")
 
@@ -44,39 +70,90 @@ class ScanRegion(Base):
     started_at = Column(DateTime, nullable=True)
     finished_at = Column(DateTime, nullable=True)
     error = Column(Text, nullable=True)
+    rule_stats: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    inventory_stats: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
 
     scan = relationship("ScanRun", back_populates="regions")
 
 
+class InventorySnapshot(Base):
+    __tablename__ = "inventory_snapshots"
+
+    account: Mapped[str] = mapped_column(String, primary_key=True)
+    region: Mapped[str] = mapped_column(String, primary_key=True)
+    collector: Mapped[str] = mapped_column(String, primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    resource_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    entries: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+EVIDENCE_LOOKUP_CHUNK = 500
+
+
+def evidence_hash(evidence: Any) -> str:
+    canonical = json.dumps(evidence, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class EvidenceBlob(Base):
+    __tablename__ = "evidence_blobs"
+
+    hash = Column(String(64), primary_key=True)
+    content = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class Finding(Base):
     __tablename__ = "findings"
+    __table_args__ = (
+        Index("ix_findings_scan_rule_resource", "scan_id", "rule_id", "resource_hash"),
+        {"postgresql_partition_by": "RANGE (scan_created_at)"},
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    scan_created_at = Column(DateTime, primary_key=True)
     scan_id = Column(UUID(as_uuid=True), ForeignKey("scan_runs.id"), nullable=False)
     service = Column(String, nullable=False)
-    rule_id = Column(String, nullable=False)
-    severity = Column(String, nullable=False)
+    rule_id: Mapped[str] = mapped_column(String, nullable=False)
+    severity: Mapped[str] = mapped_column(String, nullable=False)
     status = Column(String, nullable=False)
-    evidence = Column(JSON, nullable=False)
+    evidence_hash: Mapped[str] = mapped_column(String(64), ForeignKey("evidence_blobs.hash"), nullable=False, index=True)
     region = Column(String, nullable=True)
     resource_hash = Column(String, nullable=True)
+    advice_signature: Mapped[Optional[str]] = mapped_column(String, ForeignKey("llm_advice.signature"), nullable=True)
+    advice_status: Mapped[str] = mapped_column(String, default=AdviceStatusEnum.skipped.value, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     scan = relationship("ScanRun", back_populates="findings")
-    llm_advice = relationship("LLMAdvice", back_populates="finding", uselist=False)
+    llm_advice = relationship("LLMAdvice", back_populates="findings")
+    evidence_blob = relationship("EvidenceBlob", lazy="selectin")
+
+    _pending_evidence = None
+
+    @property
+    def evidence(self) -> Optional[Dict[str, Any]]:
+        if self._pending_evidence is not None:
+            return self._pending_evidence
+        return self.evidence_blob.content if self.evidence_blob is not None else None
+
+    @evidence.setter
+    def evidence(self, value: Dict[str, Any]) -> None:
+        self.evidence_hash = evidence_hash(value)
+        self._pending_evidence = value
 
 
 class LLMAdvice(Base):
     __tablename__ = "llm_advice"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    finding_id = Column(UUID(as_uuid=True), ForeignKey("findings.id"), nullable=False)
+    signature = Column(String, primary_key=True)
+    rule_id = Column(String, nullable=False)
     model = Column(String, nullable=False)
-    prompt_hash = Column(String, nullable=False)
     content_md = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    finding = relationship("Finding", back_populates="llm_advice")
+    findings = relationship("Finding", back_populates="llm_advice")
 
 
 class RuleCatalog(Base):
@@ -88,3 +165,56 @@ class RuleCatalog(Base):
     severity_default = Column(String, nullable=False)
     cis_map = Column(JSON, nullable=True)
     docs = Column(JSON, nullable=True)
+
+
+def store_evidence(session: Session, blobs: Dict[str, Any]) -> int:
+    hashes = list(blobs)
+    existing: Set[str] = set()
+    for start in range(0, len(hashes), EVIDENCE_LOOKUP_CHUNK):
+        chunk = hashes[start : start + EVIDENCE_LOOKUP_CHUNK]
+        # FOR SHARE keeps prune_orphan_evidence from deleting a blob until the findings using it commit.
+        lookup = select(EvidenceBlob.hash).where(EvidenceBlob.hash.in_(chunk)).with_for_update(read=True)
+        existing.update(session.scalars(lookup))
+    now = datetime.utcnow()
+    missing = [{"hash": key, "content": blobs[key], "created_at": now} for key in hashes if key not in existing]
+    if missing:
+        dialect = session.get_bind().dialect.name
+        stmt: Insert
+        if dialect == "postgresql":
+            stmt = postgresql.insert(EvidenceBlob).on_conflict_do_nothing(index_elements=["hash"])
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(EvidenceBlob).on_conflict_do_nothing(index_elements=["hash"])
+        else:
+            stmt = insert(EvidenceBlob)
+        session.execute(stmt, missing)
+    return len(missing)
+
+
+def _fill_scan_created_at(session: Session, findings: List[Finding]) -> None:
+    missing = {f.scan_id for f in findings if f.scan_created_at is None}
+    if not missing:
+        return
+    created: Dict[Any, datetime] = {}
+    for obj in session.new:
+        if isinstance(obj, ScanRun) and obj.id in missing:
+            if obj.created_at is None:
+                obj.created_at = datetime.utcnow()
+            created[obj.id] = obj.created_at
+    lookup = missing - set(created)
+    if lookup:
+        created.update(session.execute(select(ScanRun.id, ScanRun.created_at).where(ScanRun.id.in_(lookup))).tuples().all())
+    for finding in findings:
+        if finding.scan_created_at is None:
+            finding.scan_created_at = created.get(finding.scan_id)
+
+
+@event.listens_for(Session, "before_flush")
+def _prepare_findings(session: Session, flush_context: Any, instances: Any) -> None:
+    new_findings = [obj for obj in session.new if isinstance(obj, Finding)]
+    _fill_scan_created_at(session, new_findings)
+    blobs: Dict[str, Any] = {}
+    for obj in new_findings + [obj for obj in session.dirty if isinstance(obj, Finding)]:
+        if obj._pending_evidence is not None:
+            blobs.setdefault(obj.evidence_hash, obj._pending_evidence)
+    if blobs:
+        store_evidence(session, blobs)
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.scan import EVIDENCE_LOOKUP_CHUNK, AdviceStatusEnum, EvidenceBlob, Finding, ScanRun, ScanStatusEnum
+
+if TYPE_CHECKING:
+    import pyarrow as pa  # type: ignore[import-untyped]
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIX = ".arrow"
+ARCHIVE_BATCH_ROWS = 10_000
+
+
+class ScanArchivedError(RuntimeError):
+    pass
+
+
+@lru_cache()
+def archive_schema() -> "pa.Schema":
+    import pyarrow as pa  # type: ignore[import-untyped]
+
+    category = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("id", pa.string()),
+            ("rule_id", category),
+            ("service", category),
+            ("severity", category),
+            ("status", category),
+            ("region", category),
+            ("resource_hash", pa.string()),
+            ("advice_status", category),
+            ("advice_signature", pa.string()),
+            ("evidence", pa.string()),
+            ("created_at", pa.timestamp("us")),
+        ]
+    )
+
+
+def _encode_batch(
+    schema: "pa.Schema", columns: Dict[str, List[Any]], categories: Dict[str, Dict[str, int]]
+) -> "pa.RecordBatch":
+    import pyarrow as pa  # type: ignore[import-untyped]
+
+    arrays = []
+    for field in schema:
+        values = columns[field.name]
+        lookup = categories.get(field.name)
+        if lookup is None:
+            arrays.append(pa.array(values, type=field.type))
+            continue
+        indices = [None if value is None else lookup.setdefault(value, len(lookup)) for value in values]
+        arrays.append(
+            pa.DictionaryArray.from_arrays(
+                pa.array(indices, type=field.type.index_type), pa.array(list(lookup), type=field.type.value_type)
+            )
+        )
+    return pa.record_batch(arrays, schema=schema)
+
+
+class ScanArchive:
+    def __init__(self, root: Optional[str] = None) -> None:
+        self.root = Path(root or get_settings().scan_archive_dir)
+
+    def path_for(self, scan_id: uuid.UUID) -> Path:
+        return self.root / f"{scan_id}{ARCHIVE_SUFFIX}"
+
+    def write(self, scan_id: uuid.UUID, findings: Iterable[Finding]) -> str:
+        import pyarrow as pa  # type: ignore[import-untyped]
+        import pyarrow.ipc as ipc  # type: ignore[import-untyped]
+
+        schema = archive_schema()
+        # Category dictionaries only grow, so each batch after the first is written as a dictionary delta.
+        categories: Dict[str, Dict[str, int]] = {
+            field.name: {} for field in schema if pa.types.is_dictionary(field.type)
+        }
+        columns: Dict[str, List[Any]] = {name: [] for name in schema.names}
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(scan_id)
+        tmp_path = path.with_suffix(".tmp")
+        options = ipc.IpcWriteOptions(compression="zstd", emit_dictionary_deltas=True)
+        try:
+            with pa.OSFile(str(tmp_path), "wb") as sink, ipc.new_file(sink, schema, options=options) as writer:
+                for finding in findings:
+                    columns["id"].append(str(finding.id))
+                    columns["rule_id"].append(finding.rule_id)
+                    columns["service"].append(finding.service)
+                    columns["severity"].append(finding.severity)
+                    columns["status"].append(finding.status)
+                    columns["region"].append(finding.region)
+                    columns["resource_hash"].append(finding.resource_hash)
+                    columns["advice_status"].append(finding.advice_status)
+                    columns["advice_signature"].append(finding.advice_signature)
+                    columns["evidence"].append(
+                        json.dumps(finding.evidence, sort_keys=True, separators=(",", ":"), default=str)
+                    )
+                    columns["created_at"].append(finding.created_at)
+                    if len(columns["id"]) >= ARCHIVE_BATCH_ROWS:
+                        writer.write_batch(_encode_batch(schema, columns, categories))
+                        columns = {name: [] for name in schema.names}
+                if columns["id"]:
+                    writer.write_batch(_encode_batch(schema, columns, categories))
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, path)
+        return str(path)
+
+    def load(self, path: str) -> "pa.Table":
+        import pyarrow as pa  # type: ignore[import-untyped]
+
+        return pa.Table.from_batches(list(self.batches(path)), schema=archive_schema())
+
+    def batches(self, path: str) -> Iterator["pa.RecordBatch"]:
+        import pyarrow as pa  # type: ignore[import-untyped]
+        import pyarrow.ipc as ipc  # type: ignore[import-untyped]
+
+        # Batches are zstd-compressed, so they are decoded one at a time instead of memory-mapped.
+        with pa.OSFile(path, "rb") as source:
+            reader = ipc.open_file(source)
+            for index in range(reader.num_record_batches):
+                yield reader.get_batch(index)
+
+    def summary(self, path: str) -> Dict[str, Any]:
+        import pyarrow as pa  # type: ignore[import-untyped]
+
+        severities: Dict[str, int] = defaultdict(int)
+        services: Dict[str, int] = defaultdict(int)
+        advice: Dict[str, int] = defaultdict(int)
+        total = 0
+        for batch in self.batches(path):
+            grouped = pa.Table.from_batches([batch]).group_by(["severity", "service", "advice_status"])
+            for row in grouped.aggregate([([], "count_all")]).to_pylist():
+                severities[row["severity"]] += row["count_all"]
+                services[row["service"]] += row["count_all"]
+                advice[row["advice_status"]] += row["count_all"]
+            total += batch.num_rows
+        return {
+            "severityTotals": dict(severities),
+            "serviceTotals": dict(services),
+            "adviceTotals": dict(advice),
+            "totalFindings": total,
+        }
+
+    def findings(self, path: str, service: Optional[str] = None, severity: Optional[str] = None) -> List[Dict[str, Any]]:
+        import pyarrow.compute as pc  # type: ignore[import-untyped]
+
+        rows: List[Dict[str, Any]] = []
+        for batch in self.batches(path):
+            if service:
+                batch = batch.filter(pc.equal(batch["service"], service))
+            if severity:
+                batch = batch.filter(pc.equal(batch["severity"], severity))
+            for row in batch.to_pylist():
+                row["evidence"] = json.loads(row["evidence"])
+                rows.append(row)
+        return rows
+
+    def remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def archive_scan(db: Session, scan_id: uuid.UUID, archive: Optional[ScanArchive] = None) -> Optional[str]:
+    scan = db.get(ScanRun, scan_id)
+    if not scan or scan.archived_at is not None:
+        return None
+    if scan.status not in (ScanStatusEnum.completed.value, ScanStatusEnum.failed.value):
+        return None
+    pending_cutoff = datetime.utcnow() - timedelta(hours=get_settings().scan_archive_pending_advice_hours)
+    pending = db.scalar(
+        select(Finding.id)
+        .where(
+            Finding.scan_id == scan_id,
+            Finding.advice_status == AdviceStatusEnum.pending.value,
+            Finding.created_at >= pending_cutoff,
+        )
+        .limit(1)
+    )
+    if pending is not None:
+        return None
+
+    archive = archive or ScanArchive()
+    already_loaded = set(db.identity_map.keys())
+    path: Optional[str] = None
+    try:
+        db.execute(
+            update(Finding)
+            .where(Finding.scan_id == scan_id, Finding.advice_status == AdviceStatusEnum.pending.value)
+            .values(advice_status=AdviceStatusEnum.failed.value)
+        )
+        findings = db.scalars(select(Finding).where(Finding.scan_id == scan_id).order_by(Finding.created_at)).all()
+        path = archive.write(scan_id, findings)
+        db.execute(delete(Finding).where(Finding.scan_id == scan_id))
+        db.execute(update(ScanRun).where(ScanRun.id == scan_id).values(archived_at=datetime.utcnow(), archive_path=path))
+        db.commit()
+    except Exception:
+        db.rollback()
+        if path is not None:
+            archive.remove(path)
+        raise
+    # Drop only what this function loaded; the caller's objects stay attached.
+    for key in set(db.identity_map.keys()) - already_loaded:
+        obj = db.identity_map.get(key)
+        if obj is not None:
+            db.expunge(obj)
+    return path
+
+
+def archive_completed_scans(db: Session, older_than_days: Optional[int] = None, limit: int = 100) -> int:
+    days = get_settings().scan_archive_after_days if older_than_days is None else older_than_days
+    if days <= 0:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    scan_ids = db.scalars(
+        select(ScanRun.id)
+        .where(
+            ScanRun.archived_at.is_(None),
+            ScanRun.created_at < cutoff,
+            ScanRun.status.in_([ScanStatusEnum.completed.value, ScanStatusEnum.failed.value]),
+        )
+        .order_by(ScanRun.created_at)
+        .limit(limit)
+    ).all()
+    archive = ScanArchive()
+    archived = 0
+    for scan_id in scan_ids:
+        try:
+            if archive_scan(db, scan_id, archive):
+                archived += 1
+        except Exception:
+            logger.exception("Failed to archive scan %s", scan_id)
+    if archived:
+        prune_orphan_evidence(db, older_than=cutoff)
+    return archived
+
+
+def prune_orphan_evidence(db: Session, older_than: Optional[datetime] = None) -> int:
+    referenced = select(Finding.id).where(Finding.evidence_hash == EvidenceBlob.hash).exists()
+    candidates = select(EvidenceBlob.hash).where(~referenced)
+    if older_than is not None:
+        candidates = candidates.where(EvidenceBlob.created_at < older_than)
+    deleted = 0
+    try:
+        # Blobs share-locked by store_evidence are skipped; the delete re-checks references after locking.
+        hashes = db.scalars(candidates.with_for_update(skip_locked=True)).all()
+        for start in range(0, len(hashes), EVIDENCE_LOOKUP_CHUNK):
+            chunk = hashes[start : start + EVIDENCE_LOOKUP_CHUNK]
+            result = db.execute(delete(EvidenceBlob).where(EvidenceBlob.hash.in_(chunk), ~referenced))
+            deleted += result.rowcount or 0
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to prune orphaned evidence")
+        return 0
+    return deleted
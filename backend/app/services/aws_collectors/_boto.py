@@ -1,13 +1,24 @@
 from __future__ import annotations
 
-try:
-    import boto3  # type: ignore
-except ImportError:  # pragma: no cover
-    class _MissingBoto3:
-        class Session:  # type: ignore[no-redef]
-            def __init__(self, *args, **kwargs) -> None:
-                raise RuntimeError("boto3 is required for AWS collectors; install it via backend/requirements.txt")
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+
+class _LazyBoto3:
+    _module: Any = None
 
-    boto3 = _MissingBoto3()  # type: ignore[assignment]
+    def __getattr__(self, name: str) -> Any:
+        if self._module is None:
+            try:
+                type(self)._module = import_module("boto3")
+            except ImportError as exc:  # pragma: no cover
+                raise RuntimeError("boto3 is required for AWS collectors; install it via backend/requirements.txt") from exc
+        return getattr(self._module, name)
+
+
+if TYPE_CHECKING:
+    import boto3  # type: ignore
+else:
+    boto3 = _LazyBoto3()
 
 __all__ = ["boto3"]
@@ -1,33 +1,63 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
 
 from app.services.aws_collectors._boto import boto3
 
+if TYPE_CHECKING:
+    from app.services.inventory import CollectorCache
+    from app.services.resources import CompactResource, ResourceCompactor
+
+
+def change_signal(*parts: Any) -> str:
+    payload = json.dumps(parts, default=str, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
 
 @dataclass
 class CollectorResult:
     resource_id: str
-    configuration: Dict[str, Any]
+    configuration: Union[Dict[str, Any], "CompactResource"]
 
 
 class BaseCollector:
     service: str
+    # Collectors that route describes through _enrich get an inventory snapshot; the rest are left alone.
+    uses_inventory_cache = False
 
     def __init__(self, session: boto3.Session, region: str) -> None:
         self.session = session
         self.region = region
+        self.cache: Optional["CollectorCache"] = None
+        self.compactor: Optional["ResourceCompactor"] = None
 
     async def collect(self) -> List[CollectorResult]:
         raise NotImplementedError
 
+    def _result(self, resource_id: str, configuration: Dict[str, Any]) -> CollectorResult:
+        # Compacting per resource keeps the full dict form of the inventory from ever being held at once.
+        if self.compactor is not None:
+            return CollectorResult(resource_id=resource_id, configuration=self.compactor.compact(configuration))
+        return CollectorResult(resource_id=resource_id, configuration=configuration)
+
+    async def _enrich(self, resource_id: str, signal: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        if self.cache is not None:
+            cached = self.cache.lookup(resource_id, signal)
+            if cached is not None:
+                return cached
+        value = await fetch()
+        if self.cache is not None:
+            self.cache.store(resource_id, signal, value)
+        return value
+
     async def _paginate(self, func, result_key: str, **kwargs) -> Iterable[Dict[str, Any]]:
         client = func.__self__  # type: ignore[attr-defined]
         paginator = client.get_paginator(func.__name__)
-        loop = asyncio.get_event_loop()
-        pages = await loop.run_in_executor(None, lambda: paginator.paginate(**kwargs))
+        pages = await asyncio.to_thread(lambda: paginator.paginate(**kwargs))
         for page in pages:
             for item in page.get(result_key, []):
                 yield item
@@ -1,41 +1,54 @@
 from __future__ import annotations
 
 import asyncio
-from typing import List
+from functools import partial
+from typing import Any, Dict, List
 
 from app.services.aws_collectors._boto import boto3
-from app.services.aws_collectors.base import BaseCollector, CollectorResult
+from app.services.aws_collectors.base import BaseCollector, CollectorResult, change_signal
 
 
 class GlobalServiceCollector(BaseCollector):
     service = "COMMON"
+    uses_inventory_cache = True
 
     async def collect(self) -> List[CollectorResult]:
         region = None if self.region.upper() == "GLOBAL" else self.region
         s3_client = self.session.client("s3", region_name=region)
-        loop = asyncio.get_event_loop()
-        buckets_resp = await loop.run_in_executor(None, s3_client.list_buckets)
+        buckets_resp = await asyncio.to_thread(s3_client.list_buckets)
         buckets = buckets_resp.get("Buckets", [])
         results: List[CollectorResult] = []
         for bucket in buckets:
             name = bucket["Name"]
-            location = await loop.run_in_executor(None, lambda: s3_client.get_bucket_location(Bucket=name))
-            region = location.get("LocationConstraint") or "us-east-1"
-            try:
-                encryption = await loop.run_in_executor(None, lambda: s3_client.get_bucket_encryption(Bucket=name))
-                rules = encryption.get("ServerSideEncryptionConfiguration", {}).get("Rules", [])
-                encryption_enabled = bool(rules)
-            except Exception:
-                encryption_enabled = False
+            # Encryption can change without touching the listing; INVENTORY_FULL_REFRESH_HOURS bounds its staleness.
+            details = await self._enrich(
+                name,
+                change_signal(bucket.get("CreationDate")),
+                partial(self._describe_bucket, s3_client, name),
+            )
             results.append(
-                CollectorResult(
+                self._result(
                     resource_id=name,
                     configuration={
                         "id": name,
                         "type": "s3_bucket",
-                        "region": region,
-                        "encryption_enabled": encryption_enabled,
+                        "region": details["region"],
+                        "encryption_enabled": details["encryption_enabled"],
                     },
                 )
             )
         return results
+
+    async def _describe_bucket(self, s3_client, name: str) -> Dict[str, Any]:
+        location = await asyncio.to_thread(lambda: s3_client.get_bucket_location(Bucket=name))
+        return {
+            "region": location.get("LocationConstraint") or "us-east-1",
+            "encryption_enabled": await self._encryption_enabled(s3_client, name),
+        }
+
+    async def _encryption_enabled(self, s3_client, name: str) -> bool:
+        try:
+            encryption = await asyncio.to_thread(lambda: s3_client.get_bucket_encryption(Bucket=name))
+        except Exception:
+            return False
+        return bool(encryption.get("ServerSideEncryptionConfiguration", {}).get("Rules", []))
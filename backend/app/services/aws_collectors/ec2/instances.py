@@ -1,20 +1,21 @@
 from __future__ import annotations
 
 import asyncio
+from functools import partial
 from datetime import datetime, timezone
-from typing import List
+from typing import Any, Dict, List
 
 from app.services.aws_collectors._boto import boto3
-from app.services.aws_collectors.base import BaseCollector, CollectorResult
+from app.services.aws_collectors.base import BaseCollector, CollectorResult, change_signal
 
 
 class InstanceCollector(BaseCollector):
     service = "EC2"
+    uses_inventory_cache = True
 
     async def collect(self) -> List[CollectorResult]:
         client = self.session.client("ec2", region_name=self.region)
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: client.describe_instances())
+        response = await asyncio.to_thread(lambda: client.describe_instances())
         results: List[CollectorResult] = []
         for reservation in response.get("Reservations", []):
             for instance in reservation.get("Instances", []):
@@ -25,19 +26,14 @@ class InstanceCollector(BaseCollector):
                 age_days = None
                 if isinstance(launch_time, datetime):
                     age_days = (datetime.now(timezone.utc) - launch_time).days
-                disable_api_termination = await loop.run_in_executor(
-                    None,
-                    lambda: client.describe_instance_attribute(
-                        InstanceId=instance_id, Attribute="disableApiTermination"
-                    ),
-                )
-                termination_protection = (
-                    disable_api_termination
-                    .get("DisableApiTermination", {})
-                    .get("Value", False)
+                attributes = await self._enrich(
+                    instance_id,
+                    change_signal(launch_time, instance.get("State", {}).get("Name"), instance.get("Tags", [])),
+                    partial(self._describe_attributes, client, instance_id),
                 )
+                termination_protection = attributes["termination_protection"]
                 results.append(
-                    CollectorResult(
+                    self._result(
                         resource_id=instance_id,
                         configuration={
                             "id": instance_id,
@@ -59,3 +55,11 @@ class InstanceCollector(BaseCollector):
                     )
                 )
         return results
+
+    async def _describe_attributes(self, client, instance_id: str) -> Dict[str, Any]:
+        disable_api_termination = await asyncio.to_thread(
+            lambda: client.describe_instance_attribute(InstanceId=instance_id, Attribute="disableApiTermination"),
+        )
+        return {
+            "termination_protection": disable_api_termination.get("DisableApiTermination", {}).get("Value", False),
+        }
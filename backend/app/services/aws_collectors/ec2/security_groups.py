@@ -12,12 +12,11 @@ class SecurityGroupCollector(BaseCollector):
 
     async def collect(self) -> List[CollectorResult]:
         client = self.session.client("ec2", region_name=self.region)
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: client.describe_security_groups())
+        response = await asyncio.to_thread(lambda: client.describe_security_groups())
         results: List[CollectorResult] = []
         for sg in response.get("SecurityGroups", []):
             results.append(
-                CollectorResult(
+                self._result(
                     resource_id=sg["GroupId"],
                     configuration={
                         "id": sg["GroupId"],
@@ -12,12 +12,11 @@ class EBSVolumeCollector(BaseCollector):
 
     async def collect(self) -> List[CollectorResult]:
         client = self.session.client("ec2", region_name=self.region)
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: client.describe_volumes())
+        response = await asyncio.to_thread(lambda: client.describe_volumes())
         results: List[CollectorResult] = []
         for volume in response.get("Volumes", []):
             results.append(
-                CollectorResult(
+                self._result(
                     resource_id=volume["VolumeId"],
                     configuration={
                         "id": volume["VolumeId"],
@@ -38,15 +37,13 @@ class SnapshotCollector(BaseCollector):
 
     async def collect(self) -> List[CollectorResult]:
         client = self.session.client("ec2", region_name=self.region)
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
+        response = await asyncio.to_thread(
             lambda: client.describe_snapshots(OwnerIds=["self"]),
         )
         results: List[CollectorResult] = []
         for snapshot in response.get("Snapshots", []):
             results.append(
-                CollectorResult(
+                self._result(
                     resource_id=snapshot["SnapshotId"],
                     configuration={
                         "id": snapshot["SnapshotId"],
@@ -54,6 +51,7 @@ class SnapshotCollector(BaseCollector):
                         "encrypted": snapshot.get("Encrypted"),
                         "region": self.region,
                         "kms_key_id": snapshot.get("KmsKeyId"),
+                        "volume_id": snapshot.get("VolumeId"),
                         "shared_accounts": snapshot.get("SharedAccounts", []),
                     },
                 )
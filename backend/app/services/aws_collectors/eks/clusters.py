@@ -1,40 +1,34 @@
 from __future__ import annotations
 
 import asyncio
-from typing import List
+from functools import partial
+from typing import Any, Dict, List
 
 from app.services.aws_collectors._boto import boto3
-from app.services.aws_collectors.base import BaseCollector, CollectorResult
+from app.services.aws_collectors.base import BaseCollector, CollectorResult, change_signal
 
 
 class EKSClusterCollector(BaseCollector):
     service = "EKS"
+    uses_inventory_cache = True
 
     async def collect(self) -> List[CollectorResult]:
         client = self.session.client("eks", region_name=self.region)
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: client.list_clusters())
+        response = await asyncio.to_thread(lambda: client.list_clusters())
         clusters = response.get("clusters", [])
         results: List[CollectorResult] = []
         for name in clusters:
-            describe = await loop.run_in_executor(None, lambda: client.describe_cluster(name=name))
+            describe = await asyncio.to_thread(lambda: client.describe_cluster(name=name))
             cluster = describe.get("cluster", {})
-            nodegroups = await loop.run_in_executor(None, lambda: client.list_nodegroups(clusterName=name))
-            ng_details = []
-            for nodegroup in nodegroups.get("nodegroups", []):
-                detail = await loop.run_in_executor(None, lambda ng=nodegroup: client.describe_nodegroup(clusterName=name, nodegroupName=ng))
-                ng = detail.get("nodegroup", {})
-                ng_details.append(
-                    {
-                        "name": ng.get("nodegroupName"),
-                        "version": ng.get("version"),
-                        "ami_type": ng.get("amiType"),
-                        "release_version": ng.get("releaseVersion"),
-                        "status": ng.get("status"),
-                    }
-                )
+            nodegroups = await asyncio.to_thread(lambda: client.list_nodegroups(clusterName=name))
+            names = sorted(nodegroups.get("nodegroups", []))
+            ng_details = await self._enrich(
+                cluster.get("arn", name),
+                change_signal(cluster.get("version"), cluster.get("platformVersion"), cluster.get("tags", {}), names),
+                partial(self._describe_nodegroups, client, name, names),
+            )
             results.append(
-                CollectorResult(
+                self._result(
                     resource_id=cluster.get("arn", name),
                     configuration={
                         "id": cluster.get("arn", name),
@@ -51,3 +45,19 @@ class EKSClusterCollector(BaseCollector):
                 )
             )
         return results
+
+    async def _describe_nodegroups(self, client, name: str, nodegroups: List[str]) -> List[Dict[str, Any]]:
+        ng_details = []
+        for nodegroup in nodegroups:
+            detail = await asyncio.to_thread(client.describe_nodegroup, clusterName=name, nodegroupName=nodegroup)
+            ng = detail.get("nodegroup", {})
+            ng_details.append(
+                {
+                    "name": ng.get("nodegroupName"),
+                    "version": ng.get("version"),
+                    "ami_type": ng.get("amiType"),
+                    "release_version": ng.get("releaseVersion"),
+                    "status": ng.get("status"),
+                }
+            )
+        return ng_details
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.credentials import EphemeralCredential
+from app.core.telemetry import get_telemetry
+from app.services.aws_collectors._boto import boto3
+
+StsClientFactory = Callable[[Any], Any]
+
+
+@dataclass
+class _CachedSession:
+    session: Any
+    last_used: float
+
+
+class AssumedSessionCache:
+    def __init__(self, sts_client_factory: Optional[StsClientFactory] = None) -> None:
+        settings = get_settings()
+        self.duration_seconds = settings.assume_role_duration_seconds
+        self.idle_ttl = settings.assume_role_cache_idle_seconds
+        self.session_name = settings.assume_role_session_name
+        self._sts_client_factory = sts_client_factory or (lambda base: base.client("sts"))
+        self._sessions: Dict[Tuple[str, str, str], _CachedSession] = {}
+        self._pending: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, cred: EphemeralCredential):
+        base = get_telemetry().instrument_session(
+            boto3.Session(
+                aws_access_key_id=cred.access_key_id,
+                aws_secret_access_key=cred.secret_access_key,
+                aws_session_token=cred.session_token,
+            )
+        )
+        if not cred.role_arn:
+            return base
+        key = (
+            cred.role_arn,
+            cred.external_id or "",
+            hashlib.sha256(f"{cred.access_key_id}:{cred.secret_access_key}".encode()).hexdigest(),
+        )
+        with self._lock:
+            self._evict_idle(time.time())
+            session = self._cached(key)
+            if session is not None:
+                return session
+            key_lock = self._pending.setdefault(key, threading.Lock())
+        # AssumeRole runs outside the shared lock; the per-key lock stops duplicate assumes.
+        with key_lock:
+            with self._lock:
+                session = self._cached(key)
+            if session is not None:
+                return session
+            try:
+                session = self._assumed_session(base, cred.role_arn, cred.external_id)
+                with self._lock:
+                    self._sessions[key] = _CachedSession(session=session, last_used=time.time())
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+        return session
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+    def _cached(self, key: Tuple[str, str, str]) -> Optional[Any]:
+        cached = self._sessions.get(key)
+        if cached is None:
+            return None
+        cached.last_used = time.time()
+        return cached.session
+
+    def _evict_idle(self, now: float) -> None:
+        expired = [key for key, cached in self._sessions.items() if now - cached.last_used > self.idle_ttl]
+        for key in expired:
+            del self._sessions[key]
+
+    def _assumed_session(self, base, role_arn: str, external_id: Optional[str]):
+        sts = self._sts_client_factory(base)
+
+        def refresh() -> Dict[str, str]:
+            params: Dict[str, Any] = {
+                "RoleArn": role_arn,
+                "RoleSessionName": self.session_name,
+                "DurationSeconds": self.duration_seconds,
+            }
+            if external_id:
+                params["ExternalId"] = external_id
+            creds = sts.assume_role(**params)["Credentials"]
+            return {
+                "access_key": creds["AccessKeyId"],
+                "secret_key": creds["SecretAccessKey"],
+                "token": creds["SessionToken"],
+                "expiry_time": creds["Expiration"].isoformat(),
+            }
+
+        from botocore.credentials import (  # type: ignore[import-untyped]
+            CredentialProvider,
+            CredentialResolver,
+            RefreshableCredentials,
+        )
+        from botocore.session import get_session  # type: ignore[import-untyped]
+
+        class AssumedRoleProvider(CredentialProvider):
+            METHOD = "sts-assume-role"
+            CANONICAL_NAME = "securescope-assume-role"
+
+            def __init__(self, credentials: Any) -> None:
+                super().__init__()
+                self.credentials = credentials
+
+            def load(self) -> Any:
+                return self.credentials
+
+        refreshable = RefreshableCredentials.create_from_metadata(
+            metadata=refresh(),
+            refresh_using=refresh,
+            method=AssumedRoleProvider.METHOD,
+        )
+        botocore_session = get_session()
+        botocore_session.register_component("credential_provider", CredentialResolver([AssumedRoleProvider(refreshable)]))
+        return get_telemetry().instrument_session(boto3.Session(botocore_session=botocore_session))
+
+
+assumed_sessions = AssumedSessionCache()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.core.cache import get_redis
+from app.core.config import get_settings
+
+KEY_PREFIX = "scan-coalesce:"
+
+
+def coalesce_key(account_id: str, region_scope: Optional[Iterable[str]], catalog_version: str) -> str:
+    regions = sorted({region.lower() for region in region_scope or ["all"]})
+    raw = "|".join([account_id, ",".join(regions), catalog_version])
+    return KEY_PREFIX + hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ScanCoalescer:
+    def __init__(self, client=None, window_seconds: Optional[int] = None) -> None:
+        settings = get_settings()
+        self.window_seconds = (
+            settings.scan_coalesce_window_seconds if window_seconds is None else window_seconds
+        )
+        self._client = client
+        self._memory: Dict[str, Tuple[uuid.UUID, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_seconds > 0
+
+    def _redis(self):
+        return self._client if self._client is not None else get_redis()
+
+    def claim(self, key: str, scan_id: uuid.UUID) -> Optional[uuid.UUID]:
+        redis = self._redis()
+        if redis:
+            if redis.set(key, str(scan_id), nx=True, ex=self.window_seconds):
+                return None
+            existing = redis.get(key)
+            if existing is None:
+                return self.claim(key, scan_id)
+            return uuid.UUID(existing.decode() if isinstance(existing, bytes) else existing)
+        now = time.time()
+        with self._lock:
+            current = self._memory.get(key)
+            if current and current[1] > now:
+                return current[0]
+            self._memory[key] = (scan_id, now + self.window_seconds)
+        return None
+
+    def replace(self, key: str, scan_id: uuid.UUID) -> None:
+        redis = self._redis()
+        if redis:
+            redis.set(key, str(scan_id), ex=self.window_seconds)
+            return
+        with self._lock:
+            self._memory[key] = (scan_id, time.time() + self.window_seconds)
+
+    def release(self, key: str, scan_id: uuid.UUID) -> None:
+        redis = self._redis()
+        if redis:
+            existing = redis.get(key)
+            if existing is not None and (existing.decode() if isinstance(existing, bytes) else existing) == str(scan_id):
+                redis.delete(key)
+            return
+        with self._lock:
+            current = self._memory.get(key)
+            if current and current[0] == scan_id:
+                del self._memory[key]
+
+
+@lru_cache()
+def get_scan_coalescer() -> ScanCoalescer:
+    return ScanCoalescer()
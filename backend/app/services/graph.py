@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+WORLD_CIDRS = ("0.0.0.0/0", "::/0")
+
+EdgeExtractor = Callable[[Mapping[str, Any]], Iterable[str]]
+
+
+def _security_groups(resource: Mapping[str, Any]) -> Iterable[str]:
+    return [sg.get("GroupId") for sg in resource.get("security_groups") or () if sg.get("GroupId")]
+
+
+def _attached_instances(resource: Mapping[str, Any]) -> Iterable[str]:
+    return [att.get("InstanceId") for att in resource.get("attachments") or () if att.get("InstanceId")]
+
+
+def _source_volume(resource: Mapping[str, Any]) -> Iterable[str]:
+    volume_id = resource.get("volume_id")
+    return [volume_id] if volume_id else []
+
+
+EDGES: Dict[str, List[Tuple[str, EdgeExtractor]]] = {
+    "instance": [("security_group", _security_groups)],
+    "ebs_volume": [("attached_to", _attached_instances)],
+    "snapshot": [("source_volume", _source_volume)],
+}
+GRAPH_FIELDS: Dict[str, FrozenSet[str]] = {
+    "security_group": frozenset({"security_groups.GroupId"}),
+    "attached_to": frozenset({"attachments.InstanceId"}),
+    "source_volume": frozenset({"volume_id"}),
+    "cluster": frozenset({"nodegroups.name"}),
+}
+WORLD_RANGES = (("IpRanges", "CidrIp"), ("Ipv6Ranges", "CidrIpv6"))
+
+
+def nodegroup_id(cluster_id: str, name: str) -> str:
+    return f"{cluster_id}::{name}"
+
+
+class ResourceGraph:
+    def __init__(self, lookup: Optional[Callable[[str], Optional[Any]]] = None) -> None:
+        self._lookup = lookup
+        self._nodes: Dict[str, Any] = {}
+        self._out: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+        self._in: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+        self.edge_count = 0
+
+    @classmethod
+    def build(
+        cls,
+        resources: Iterable[Mapping[str, Any]],
+        lookup: Optional[Callable[[str], Optional[Any]]] = None,
+    ) -> "ResourceGraph":
+        graph = cls(lookup)
+        for resource in resources:
+            graph.add(resource)
+        return graph
+
+    def add(self, resource: Mapping[str, Any]) -> None:
+        resource_id = resource.get("id")
+        if not resource_id:
+            return
+        if self._lookup is None:
+            self._nodes[resource_id] = resource
+        for relation, extract in EDGES.get(resource.get("type") or "", ()):
+            for target in extract(resource):
+                self._link(relation, resource_id, target)
+        if resource.get("type") == "eks_cluster":
+            for nodegroup in resource.get("nodegroups") or ():
+                if nodegroup.get("name"):
+                    node = nodegroup_id(resource_id, nodegroup.get("name"))
+                    self._nodes[node] = nodegroup
+                    self._link("cluster", node, resource_id)
+
+    def get(self, resource_id: str) -> Optional[Any]:
+        node = self._nodes.get(resource_id)
+        if node is None and self._lookup is not None:
+            node = self._lookup(resource_id)
+        return node
+
+    def neighbors(self, resource_id: str, relation: str) -> List[Any]:
+        return self._resolve(self._out[relation].get(resource_id, ()))
+
+    def referrers(self, resource_id: str, relation: str) -> List[Any]:
+        return self._resolve(self._in[relation].get(resource_id, ()))
+
+    def edges(self, relation: str) -> Iterator[Tuple[Any, Any]]:
+        for source_id, targets in self._out[relation].items():
+            source = self.get(source_id)
+            if source is None:
+                continue
+            for target in self._resolve(targets):
+                yield source, target
+
+    def _resolve(self, resource_ids: Iterable[str]) -> List[Any]:
+        nodes = (self.get(resource_id) for resource_id in resource_ids)
+        return [node for node in nodes if node is not None]
+
+    def _link(self, relation: str, source: str, target: str) -> None:
+        self._out[relation][source].append(target)
+        self._in[relation][target].append(source)
+        self.edge_count += 1
+
+
+def world_open_ports(security_group: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    exposures: List[Dict[str, Any]] = []
+    for perm in security_group.get("ip_permissions") or ():
+        for ranges, key in WORLD_RANGES:
+            for rng in perm.get(ranges) or ():
+                if rng.get(key) in WORLD_CIDRS:
+                    exposures.append(
+                        {
+                            "protocol": perm.get("IpProtocol"),
+                            "from_port": perm.get("FromPort"),
+                            "to_port": perm.get("ToPort"),
+                            "cidr": rng.get(key),
+                        }
+                    )
+    return exposures
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.scan import InventorySnapshot
+from app.services.aws_collectors.base import change_signal
+
+
+SNAPSHOT_KEY = ["account", "region", "collector"]
+
+
+def _excluded(stmt: Any) -> Dict[str, Any]:
+    return {column.name: column for column in stmt.excluded if column.name not in SNAPSHOT_KEY}
+
+
+class CollectorCache:
+    def __init__(self, name: str, snapshot: Optional[InventorySnapshot], full_refresh: bool) -> None:
+        self.name = name
+        self.snapshot = snapshot
+        self.full_refresh = full_refresh
+        self.previous: Dict[str, Dict[str, Any]] = dict(snapshot.entries or {}) if snapshot else {}
+        self.previous_fingerprint = snapshot.fingerprint if snapshot else None
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, resource_id: str, signal: str) -> Optional[Any]:
+        entry = self.previous.get(resource_id)
+        if self.full_refresh or entry is None or entry.get("signal") != signal:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries[resource_id] = entry
+        return entry["value"]
+
+    def store(self, resource_id: str, signal: str, value: Any) -> None:
+        self.entries[resource_id] = {"signal": signal, "value": value}
+
+    def fingerprint(self) -> str:
+        return change_signal(sorted((resource_id, entry["signal"]) for resource_id, entry in self.entries.items()))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else None,
+            "resources": len(self.entries),
+            "fullRefresh": self.full_refresh,
+            "changed": self.previous_fingerprint != self.fingerprint(),
+        }
+
+
+class InventoryCache:
+    def __init__(
+        self,
+        account: str,
+        region: str,
+        snapshots: Dict[str, InventorySnapshot],
+        refresh_interval: timedelta,
+    ) -> None:
+        self.account = account
+        self.region = region
+        self.snapshots = snapshots
+        self.refresh_interval = refresh_interval
+        self.collectors: Dict[str, CollectorCache] = {}
+
+    @classmethod
+    def load(cls, db: Session, account: str, region: str) -> "InventoryCache":
+        rows = (
+            db.query(InventorySnapshot)
+            .filter(InventorySnapshot.account == account, InventorySnapshot.region == region)
+            .all()
+        )
+        hours = get_settings().inventory_full_refresh_hours
+        return cls(account, region, {row.collector: row for row in rows}, timedelta(hours=hours))
+
+    def for_collector(self, name: str) -> CollectorCache:
+        if name not in self.collectors:
+            snapshot = self.snapshots.get(name)
+            stale = snapshot is None or datetime.utcnow() - snapshot.refreshed_at >= self.refresh_interval
+            self.collectors[name] = CollectorCache(name, snapshot, full_refresh=stale)
+        return self.collectors[name]
+
+    def save(self, db: Session) -> None:
+        now = datetime.utcnow()
+        rows: List[Dict[str, Any]] = []
+        for name, cache in self.collectors.items():
+            snapshot = cache.snapshot
+            rows.append(
+                {
+                    "account": self.account,
+                    "region": self.region,
+                    "collector": name,
+                    "fingerprint": cache.fingerprint(),
+                    "resource_count": len(cache.entries),
+                    "entries": cache.entries,
+                    "refreshed_at": now if snapshot is None or cache.full_refresh else snapshot.refreshed_at,
+                    "updated_at": now,
+                }
+            )
+        if not rows:
+            return
+        # Regions of concurrent scans of one account can save the same snapshot; the last writer wins.
+        dialect = db.get_bind().dialect.name
+        stmt: Insert
+        if dialect == "postgresql":
+            stmt = postgresql.insert(InventorySnapshot)
+            stmt = stmt.on_conflict_do_update(index_elements=SNAPSHOT_KEY, set_=_excluded(stmt))
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(InventorySnapshot)
+            stmt = stmt.on_conflict_do_update(index_elements=SNAPSHOT_KEY, set_=_excluded(stmt))
+        else:
+            for row in rows:
+                db.merge(InventorySnapshot(**row))
+            return
+        db.execute(stmt, rows)
+        for cache in self.collectors.values():
+            if cache.snapshot is not None:
+                db.expire(cache.snapshot)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: cache.stats() for name, cache in self.collectors.items()}
+
+
+def merge_inventory_stats(
+    target: Dict[str, Dict[str, Any]],
+    source: Optional[Dict[str, Dict[str, Any]]],
+) -> Dict[str, Dict[str, Any]]:
+    for name, stats in (source or {}).items():
+        current = target.setdefault(name, {"hits": 0, "misses": 0, "resources": 0, "fullRefresh": 0, "changed": 0})
+        current["hits"] += stats.get("hits", 0)
+        current["misses"] += stats.get("misses", 0)
+        current["resources"] += stats.get("resources", 0)
+        current["fullRefresh"] += int(bool(stats.get("fullRefresh")))
+        current["changed"] += int(bool(stats.get("changed")))
+        lookups = current["hits"] + current["misses"]
+        current["hitRate"] = round(current["hits"] / lookups, 4) if lookups else None
+    return target
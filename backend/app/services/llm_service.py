@@ -1,43 +1,121 @@
 from __future__ import annotations
 
-import asyncio
 import hashlib
-from typing import Dict, List, Optional
+import json
+import uuid
+from typing import Any, Dict, List, Optional
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.llm.providers.mistral_local import LocalMistralProvider
-from app.models.scan import Finding, LLMAdvice
+from app.db.session import SessionLocal
+from app.llm.manager import ModelManager, get_model_manager
+from app.models.scan import AdviceStatusEnum, Finding, LLMAdvice
+
+ADVICE_MODEL = "mistral-7b-instruct"
+REDACTED = "<redacted>"
+IDENTIFYING_EVIDENCE_KEYS = {
+    "resource_id",
+    "security_group",
+    "description",
+    "public_ip",
+    "security_groups",
+    "attachments",
+    "kms_key_id",
+    "shared_accounts",
+    "instance_profile",
+    "cidrs",
+    "nodegroup",
+}
+VOLATILE_EVIDENCE_KEYS = {"age_days"}
+LOOKUP_CHUNK = 500
+
+
+def normalize_evidence(evidence: Dict[str, Any]) -> Dict[str, Any]:
+    normalized: Dict[str, Any] = {}
+    for key, value in sorted(evidence.items()):
+        if key in VOLATILE_EVIDENCE_KEYS:
+            continue
+        if key in IDENTIFYING_EVIDENCE_KEYS and not isinstance(value, bool):
+            normalized[key] = REDACTED if value else value
+        elif isinstance(value, list):
+            normalized[key] = sorted(value, key=lambda item: json.dumps(item, sort_keys=True, default=str))
+        else:
+            normalized[key] = value
+    return normalized
+
+
+def advice_signature(model: str, rule_id: str, evidence: Dict[str, Any]) -> str:
+    raw = json.dumps([model, rule_id, evidence], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
 
 
 class LLMService:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: Session, manager: Optional[ModelManager] = None) -> None:
         self.db = db
-        try:
-            self.provider = LocalMistralProvider()
-        except Exception:
-            self.provider = None
+        self.manager = manager or get_model_manager()
 
     async def enrich_findings(self, findings: List[Finding]) -> None:
-        if not findings or not self.provider:
+        if not findings:
             return
-        payload = [
-            {
-                "rule_id": f.rule_id,
-                "severity": f.severity,
-                "evidence": {k: v for k, v in f.evidence.items() if k != "resource_id"},
-            }
-            for f in findings
-        ]
-        prompt_hash = hashlib.sha256(str(payload).encode()).hexdigest()
-        advice_md = await self.provider.generate(payload)
+        groups: Dict[str, List[Finding]] = {}
+        payloads: Dict[str, Dict[str, Any]] = {}
         for finding in findings:
-            self.db.add(
-                LLMAdvice(
-                    finding_id=finding.id,
-                    model="mistral-7b-instruct",
-                    prompt_hash=prompt_hash,
-                    content_md=advice_md,
-                )
+            evidence = normalize_evidence(finding.evidence or {})
+            signature = advice_signature(ADVICE_MODEL, finding.rule_id, evidence)
+            groups.setdefault(signature, []).append(finding)
+            payloads.setdefault(
+                signature,
+                {"rule_id": finding.rule_id, "severity": finding.severity, "evidence": evidence},
             )
+
+        available = self._existing_signatures(list(groups))
+        missing = {signature: payloads[signature] for signature in groups if signature not in available}
+        generated = await self.manager.generate_grouped(missing) if missing else {}
+        for signature, advice_md in generated.items():
+            if advice_md is None:
+                continue
+            try:
+                with self.db.begin_nested():
+                    self.db.add(
+                        LLMAdvice(
+                            signature=signature,
+                            rule_id=payloads[signature]["rule_id"],
+                            model=ADVICE_MODEL,
+                            content_md=advice_md,
+                        )
+                    )
+            except IntegrityError:
+                pass
+            available.add(signature)
+
+        for signature, members in groups.items():
+            for finding in members:
+                if signature in available:
+                    finding.advice_signature = signature
+                    finding.advice_status = AdviceStatusEnum.ready.value
+                else:
+                    finding.advice_status = AdviceStatusEnum.failed.value
         self.db.commit()
+
+    def _existing_signatures(self, signatures: List[str]) -> set[str]:
+        found: set[str] = set()
+        for start in range(0, len(signatures), LOOKUP_CHUNK):
+            chunk = signatures[start : start + LOOKUP_CHUNK]
+            found.update(
+                row[0] for row in self.db.query(LLMAdvice.signature).filter(LLMAdvice.signature.in_(chunk))
+            )
+        return found
+
+
+async def enrich_pending_findings(finding_ids: List[uuid.UUID]) -> None:
+    db = SessionLocal()
+    try:
+        findings = (
+            db.query(Finding)
+            .filter(Finding.id.in_(finding_ids), Finding.advice_status == AdviceStatusEnum.pending.value)
+            .all()
+        )
+        await LLMService(db).enrich_findings(findings)
+    finally:
+        db.close()
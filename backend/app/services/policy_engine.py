@@ -1,11 +1,29 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
 from importlib import import_module
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.telemetry import get_telemetry
+from app.services.graph import GRAPH_FIELDS, ResourceGraph
+from app.services.predicates import CompiledRule, PredicateError, evaluate_fused
+from app.services.resources import ResourceCompactor
+from app.services.vectorized import ColumnarResources
+
+logger = logging.getLogger(__name__)
 
 RULES_DIR = Path(__file__).resolve().parent.parent / "rules"
+BUDGET_ACTIONS = ("flag", "skip")
+
+
+class RuleBudgetExceeded(RuntimeError):
+    pass
 
 
 @dataclass
@@ -18,6 +36,7 @@ class Rule:
     evaluation: Dict[str, Any]
     references: List[Dict[str, str]]
     auto_remediation_possible: bool
+    predicate: Optional[CompiledRule] = field(default=None, repr=False, compare=False)
 
     def dict(self) -> Dict[str, Any]:
         return {
@@ -32,10 +51,100 @@ class Rule:
         }
 
 
+@dataclass
+class RuleStats:
+    service: str
+    runs: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    resources: int = 0
+    findings: int = 0
+    over_budget: int = 0
+    skipped: int = 0
+
+    def dict(self) -> Dict[str, Any]:
+        return {
+            "service": self.service,
+            "runs": self.runs,
+            "seconds": round(self.seconds, 6),
+            "maxSeconds": round(self.max_seconds, 6),
+            "resources": self.resources,
+            "findings": self.findings,
+            "overBudget": self.over_budget,
+            "skipped": self.skipped,
+        }
+
+
+def merge_rule_stats(
+    target: Dict[str, Dict[str, Any]],
+    source: Optional[Dict[str, Dict[str, Any]]],
+) -> Dict[str, Dict[str, Any]]:
+    for rule_id, stats in (source or {}).items():
+        current = target.get(rule_id)
+        if current is None:
+            target[rule_id] = dict(stats)
+            continue
+        for key in ("runs", "resources", "findings", "overBudget", "skipped"):
+            current[key] = current.get(key, 0) + stats.get(key, 0)
+        current["seconds"] = round(current.get("seconds", 0.0) + stats.get("seconds", 0.0), 6)
+        current["maxSeconds"] = max(current.get("maxSeconds", 0.0), stats.get("maxSeconds", 0.0))
+    return target
+
+
+class _ExaminedResources:
+    def __init__(self, resources: Iterable[Dict[str, Any]], deadline: Optional[float], enforce: bool) -> None:
+        self.resources = resources
+        self.deadline = deadline
+        self.enforce = enforce
+        self.over_budget = False
+        self.examined = 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # Evaluators may iterate more than once, so the longest pass is the number of distinct resources.
+        # The budget is checked between resources on the evaluator's own thread.
+        position = 0
+        for resource in self.resources:
+            if self.deadline is not None and not self.over_budget and time.perf_counter() > self.deadline:
+                self.over_budget = True
+            if self.over_budget and self.enforce:
+                raise RuleBudgetExceeded()
+            position += 1
+            self.examined = max(self.examined, position)
+            yield resource
+
+
 class PolicyEngine:
-    def __init__(self, rules_dir: Optional[Path] = None) -> None:
+    def __init__(
+        self,
+        rules_dir: Optional[Path] = None,
+        profile: Optional[bool] = None,
+        rule_budget_seconds: Optional[float] = None,
+        budget_action: Optional[str] = None,
+        compact: Optional[bool] = None,
+        vectorized: Optional[bool] = None,
+    ) -> None:
+        settings = get_settings()
         self.rules_dir = rules_dir or RULES_DIR
+        self.vectorized = settings.vectorized_rules_enabled if vectorized is None else vectorized
+        self.compact_resources = settings.compact_resources if compact is None else compact
+        self.profile = settings.rule_profiling_enabled if profile is None else profile
+        budget = settings.rule_time_budget_seconds if rule_budget_seconds is None else rule_budget_seconds
+        self.rule_budget_seconds = budget if budget and budget > 0 else None
+        self.budget_action = (budget_action or settings.rule_budget_action).lower()
+        if self.budget_action not in BUDGET_ACTIONS:
+            raise ValueError(f"Unsupported rule budget action: {self.budget_action}")
         self._rules_cache: Dict[str, List[Rule]] = {}
+        self._compactors: Dict[str, Optional[ResourceCompactor]] = {}
+        self._catalog_version: Optional[str] = None
+
+    def catalog_version(self) -> str:
+        if self._catalog_version is None:
+            digest = hashlib.sha256()
+            for path in sorted(self.rules_dir.glob("*.yaml")):
+                digest.update(path.name.encode())
+                digest.update(path.read_bytes())
+            self._catalog_version = digest.hexdigest()[:16]
+        return self._catalog_version
 
     def load_rules(self, service: Optional[str] = None) -> List[Rule]:
         if service:
@@ -55,6 +164,13 @@ class PolicyEngine:
         data = _load_rules(path.read_text())
         rules: List[Rule] = []
         for item in data:
+            evaluation = item.get("evaluation", {})
+            predicate = None
+            if evaluation.get("predicate") is not None and not evaluation.get("evaluator"):
+                try:
+                    predicate = CompiledRule(evaluation)
+                except PredicateError as exc:
+                    raise ValueError(f"Rule {item['id']}: {exc}") from None
             rules.append(
                 Rule(
                     id=item["id"],
@@ -62,25 +178,158 @@ class PolicyEngine:
                     title=item["title"],
                     severity=item["severity"],
                     rationale=item["rationale"],
-                    evaluation=item.get("evaluation", {}),
+                    evaluation=evaluation,
                     references=item.get("references", []),
                     auto_remediation_possible=item.get("autoRemediationPossible", False),
+                    predicate=predicate,
                 )
             )
         return rules
 
-    def evaluate(self, service: str, resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def required_fields(self, service: str) -> Optional[FrozenSet[str]]:
+        fields: set[str] = set()
+        for rule in self.load_rules(service):
+            func = _rule_evaluator(rule)
+            if func is None:
+                continue
+            declared = getattr(func, "fields", None)
+            if declared is None:
+                return None
+            fields.update(declared)
+            fields.update(rule.evaluation.get("fields") or [])
+            for relation in getattr(func, "relations", ()):
+                fields.update(GRAPH_FIELDS[relation])
+            vectorized = _vector_spec(rule)
+            if isinstance(vectorized, dict) and vectorized.get("field"):
+                fields.add(vectorized["field"])
+        return frozenset(fields) if fields else None
+
+    def compactor(self, service: str) -> Optional[ResourceCompactor]:
+        if not self.compact_resources:
+            return None
+        key = service.lower()
+        if key not in self._compactors:
+            fields = self.required_fields(service)
+            self._compactors[key] = ResourceCompactor(fields) if fields else None
+        return self._compactors[key]
+
+    def compact(self, service: str, configurations: Iterable[Dict[str, Any]]) -> List[Any]:
+        compactor = self.compactor(service)
+        if compactor is None:
+            return list(configurations)
+        return compactor.compact_all(configurations)
+
+    def evaluate(
+        self,
+        service: str,
+        resources: Iterable[Dict[str, Any]],
+        stats: Optional[Dict[str, RuleStats]] = None,
+        graph: Optional[ResourceGraph] = None,
+    ) -> List[Dict[str, Any]]:
         rules = self.load_rules(service)
-        findings: List[Dict[str, Any]] = []
+        telemetry = get_telemetry()
+        chunks: List[List[Dict[str, Any]]] = []
+        fused: List[Tuple[Rule, CompiledRule, List[Dict[str, Any]]]] = []
+        columns: Optional[ColumnarResources] = None
+        fast = stats is None and self.rule_budget_seconds is None
         for rule in rules:
-            evaluator = rule.evaluation.get("evaluator")
-            if not evaluator:
+            func = _rule_evaluator(rule)
+            if func is None:
                 continue
-            module_name, func_name = evaluator.rsplit(".", 1)
-            module = import_module(f"app.services.rules.{module_name}")
-            func = getattr(module, func_name)
-            findings.extend(func(rule=rule, resources=resources))
-        return findings
+            extra: Dict[str, Any] = {}
+            if getattr(func, "uses_graph", False):
+                if graph is None:
+                    resources = list(resources)
+                    graph = ResourceGraph.build(resources)
+                extra["graph"] = graph
+            candidates = resources
+            spec = _vector_spec(rule)
+            if spec and self.vectorized and isinstance(resources, (list, tuple)):
+                if columns is None:
+                    columns = ColumnarResources(resources, (vector for vector in map(_vector_spec, rules) if vector))
+                selected = columns.select(spec, rule.evaluation)
+                if selected is not None:
+                    candidates = selected
+            if fast and rule.predicate is not None and candidates is resources:
+                chunk: List[Dict[str, Any]] = []
+                fused.append((rule, rule.predicate, chunk))
+                chunks.append(chunk)
+                continue
+            with telemetry.span("rule.evaluate", rule.id, service=service):
+                if fast:
+                    chunks.append(func(rule=rule, resources=candidates, **extra))
+                else:
+                    chunks.append(self._evaluate_rule(rule, func, candidates, stats, extra))
+        if fused:
+            # Fused rules share one pass over the resources, so their per-rule time is summed inside it.
+            timings = {rule.id: 0.0 for rule, _, _ in fused} if telemetry.enabled else None
+            with telemetry.span("rule.fused", service, rules=len(fused)):
+                evaluate_fused(fused, resources, timings)
+            for rule_id, seconds in (timings or {}).items():
+                telemetry.record("rule.evaluate", rule_id, seconds)
+        return [finding for chunk in chunks for finding in chunk]
+
+    def _evaluate_rule(
+        self,
+        rule: Rule,
+        func: Any,
+        resources: Iterable[Dict[str, Any]],
+        stats: Optional[Dict[str, RuleStats]],
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        started = time.perf_counter()
+        deadline = started + self.rule_budget_seconds if self.rule_budget_seconds is not None else None
+        examined = _ExaminedResources(resources, deadline, enforce=self.budget_action == "skip")
+        skipped = False
+        try:
+            results = list(func(rule=rule, resources=examined, **(extra or {})))
+        except RuleBudgetExceeded:
+            results = []
+            skipped = True
+        elapsed = time.perf_counter() - started
+        over_budget = examined.over_budget or (
+            self.rule_budget_seconds is not None and elapsed > self.rule_budget_seconds
+        )
+        if over_budget:
+            logger.warning(
+                "Rule %s %s its %.3fs budget after %d resources (%.3fs)",
+                rule.id,
+                "skipped at" if skipped else "exceeded",
+                self.rule_budget_seconds,
+                examined.examined,
+                elapsed,
+            )
+        if stats is not None:
+            entry = stats.setdefault(rule.id, RuleStats(service=rule.service))
+            entry.runs += 1
+            entry.seconds += elapsed
+            entry.max_seconds = max(entry.max_seconds, elapsed)
+            entry.resources += examined.examined
+            entry.findings += len(results)
+            entry.over_budget += int(over_budget)
+            entry.skipped += int(skipped)
+        return results
+
+
+def _rule_evaluator(rule: Rule) -> Optional[Callable[..., List[Dict[str, Any]]]]:
+    if rule.predicate is not None:
+        return rule.predicate
+    evaluator = rule.evaluation.get("evaluator")
+    return _resolve_evaluator(evaluator) if evaluator else None
+
+
+def _vector_spec(rule: Rule) -> Optional[Dict[str, Any]]:
+    spec = rule.evaluation.get("vectorized")
+    if spec is None and rule.predicate is not None:
+        return rule.predicate.vector
+    return spec
+
+
+@lru_cache(maxsize=None)
+def _resolve_evaluator(evaluator: str) -> Callable[..., List[Dict[str, Any]]]:
+    module_name, func_name = evaluator.rsplit(".", 1)
+    module = import_module(f"app.services.rules.{module_name}")
+    return getattr(module, func_name)
 
 
 def _load_rules(text: str) -> List[Dict[str, Any]]:
@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import ast
+import ipaddress
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.services.graph import WORLD_CIDRS
+from app.services.resources import CompactResource
+from app.services.rules import utils
+
+PARAMS = "params"
+
+Scope = Any
+Params = Dict[str, Any]
+Compiled = Callable[[Scope, Params], Any]
+
+
+class PredicateError(ValueError):
+    pass
+
+
+def _lookup(value: Any, parts: Tuple[str, ...]) -> Any:
+    for part in parts:
+        if value is None:
+            return None
+        getter = getattr(value, "get", None)
+        if getter is None:
+            return None
+        value = getter(part)
+    return value
+
+
+def _ordered(op: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    def compare(left: Any, right: Any) -> bool:
+        if left is None or right is None:
+            return False
+        try:
+            return op(left, right)
+        except TypeError:
+            return False
+
+    return compare
+
+
+def _contains(left: Any, right: Any) -> bool:
+    if right is None:
+        return False
+    try:
+        return left in right
+    except TypeError:
+        return False
+
+
+COMPARISONS: Dict[type, Callable[[Any, Any], bool]] = {
+    ast.Eq: lambda left, right: left == right,
+    ast.NotEq: lambda left, right: left != right,
+    ast.Lt: _ordered(lambda left, right: left < right),
+    ast.LtE: _ordered(lambda left, right: left <= right),
+    ast.Gt: _ordered(lambda left, right: left > right),
+    ast.GtE: _ordered(lambda left, right: left >= right),
+    ast.In: _contains,
+    ast.NotIn: lambda left, right: not _contains(left, right),
+}
+
+
+def world_open(cidr: Any) -> bool:
+    return cidr in WORLD_CIDRS
+
+
+def cidr_in(cidr: Any, network: Any) -> bool:
+    try:
+        inner = ipaddress.ip_network(cidr, strict=False)
+        outer = ipaddress.ip_network(network, strict=False)
+    except (TypeError, ValueError):
+        return False
+    return inner.version == outer.version and inner.subnet_of(outer)  # type: ignore[arg-type]
+
+
+def port_in(from_port: Any, to_port: Any, ports: Any) -> bool:
+    if from_port is None and to_port is None:
+        return True
+    low = from_port if from_port is not None else to_port
+    high = to_port if to_port is not None else from_port
+    if low == -1:
+        return True
+    candidates = ports if isinstance(ports, (list, tuple, set, frozenset)) else (ports,)
+    return any(low <= port <= high for port in candidates if isinstance(port, int))
+
+
+HELPERS: Dict[str, Callable[..., Any]] = {
+    "len": lambda value: len(value) if value is not None else 0,
+    "bool": bool,
+    "exists": lambda value: value is not None,
+    "lower": lambda value: value.lower() if isinstance(value, str) else value,
+    "world_open": world_open,
+    "cidr_in": cidr_in,
+    "port_in": port_in,
+}
+ITERATORS = ("any", "all", "map")
+VECTOR_COMPARISONS = {
+    ast.Eq: "eq",
+    ast.NotEq: "ne",
+    ast.Gt: "gt",
+    ast.GtE: "ge",
+    ast.Lt: "lt",
+    ast.LtE: "le",
+}
+
+
+class _Compiler:
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.fields: set[str] = set()
+
+    def error(self, node: ast.AST, message: str) -> PredicateError:
+        return PredicateError(f"{message} at column {getattr(node, 'col_offset', 0) + 1} in {self.source!r}")
+
+    def compile(self, node: ast.AST, prefix: str = "") -> Compiled:
+        if isinstance(node, ast.Expression):
+            return self.compile(node.body, prefix)
+        if isinstance(node, ast.Constant):
+            value = node.value
+            return lambda scope, params: value
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            items = [self.compile(item, prefix) for item in node.elts]
+            return lambda scope, params: tuple(item(scope, params) for item in items)
+        if isinstance(node, (ast.Name, ast.Attribute)):
+            return self._path(node, prefix)
+        if isinstance(node, ast.BoolOp):
+            return self._bool(node, prefix)
+        if isinstance(node, ast.UnaryOp):
+            operand = self.compile(node.operand, prefix)
+            if isinstance(node.op, ast.Not):
+                return lambda scope, params: not operand(scope, params)
+            if isinstance(node.op, ast.USub):
+                return lambda scope, params: -operand(scope, params)
+            raise self.error(node, "Unsupported operator")
+        if isinstance(node, ast.Compare):
+            return self._compare(node, prefix)
+        if isinstance(node, ast.Call):
+            return self._call(node, prefix)
+        raise self.error(node, f"Unsupported syntax {type(node).__name__}")
+
+    def path_of(self, node: ast.AST) -> Tuple[str, ...]:
+        parts: List[str] = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            raise self.error(node, "Expected a field path")
+        parts.append(node.id)
+        return tuple(reversed(parts))
+
+    def _path(self, node: ast.AST, prefix: str) -> Compiled:
+        parts = self.path_of(node)
+        if parts[0] == PARAMS:
+            keys = parts[1:]
+            return lambda scope, params: _lookup(params, keys)
+        self.fields.add(prefix + ".".join(parts))
+        if len(parts) == 1:
+            key = parts[0]
+
+            def field(scope: Scope, params: Params) -> Any:
+                try:
+                    return scope.get(key)
+                except AttributeError:
+                    return None
+
+            return field
+        return lambda scope, params: _lookup(scope, parts)
+
+    def _bool(self, node: ast.BoolOp, prefix: str) -> Compiled:
+        operands = [self.compile(value, prefix) for value in node.values]
+        if isinstance(node.op, ast.And):
+            def conjunction(scope: Scope, params: Params) -> Any:
+                value: Any = True
+                for operand in operands:
+                    value = operand(scope, params)
+                    if not value:
+                        return value
+                return value
+
+            return conjunction
+
+        def disjunction(scope: Scope, params: Params) -> Any:
+            value: Any = False
+            for operand in operands:
+                value = operand(scope, params)
+                if value:
+                    return value
+            return value
+
+        return disjunction
+
+    def _compare(self, node: ast.Compare, prefix: str) -> Compiled:
+        left = self.compile(node.left, prefix)
+        steps = []
+        for op, comparator in zip(node.ops, node.comparators):
+            compare = COMPARISONS.get(type(op))
+            if compare is None:
+                raise self.error(node, f"Unsupported comparison {type(op).__name__}")
+            steps.append((compare, self.compile(comparator, prefix)))
+        if len(steps) == 1:
+            compare, right = steps[0]
+            return lambda scope, params: compare(left(scope, params), right(scope, params))
+
+        def chained(scope: Scope, params: Params) -> bool:
+            current = left(scope, params)
+            for compare, right in steps:
+                value = right(scope, params)
+                if not compare(current, value):
+                    return False
+                current = value
+            return True
+
+        return chained
+
+    def _call(self, node: ast.Call, prefix: str) -> Compiled:
+        if not isinstance(node.func, ast.Name) or node.keywords:
+            raise self.error(node, "Only plain helper calls are supported")
+        name = node.func.id
+        if name in ITERATORS:
+            if len(node.args) != 2:
+                raise self.error(node, f"{name}() takes a field path and an expression")
+            parts = self.path_of(node.args[0])
+            collection = self._path(node.args[0], prefix)
+            inner = self.compile(node.args[1], prefix + ".".join(parts) + ".")
+            return self._iterate(name, collection, inner)
+        helper = HELPERS.get(name)
+        if helper is None:
+            raise self.error(node, f"Unknown function {name}()")
+        args = [self.compile(arg, prefix) for arg in node.args]
+        return lambda scope, params: helper(*(arg(scope, params) for arg in args))
+
+    @staticmethod
+    def _iterate(name: str, collection: Compiled, inner: Compiled) -> Compiled:
+        if name == "any":
+            return lambda scope, params: any(inner(item, params) for item in collection(scope, params) or ())
+        if name == "all":
+            return lambda scope, params: all(inner(item, params) for item in collection(scope, params) or ())
+        return lambda scope, params: [inner(item, params) for item in collection(scope, params) or ()]
+
+
+class Expression(NamedTuple):
+    evaluate: Compiled
+    fields: FrozenSet[str]
+    vector: Optional[Dict[str, Any]]
+
+
+def _field_path(node: ast.AST) -> Optional[str]:
+    parts: List[str] = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name) or node.id == PARAMS:
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _vector_spec(node: ast.AST) -> Optional[Dict[str, Any]]:
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not) and _field_path(node.operand):
+        return {"field": _field_path(node.operand), "op": "falsy"}
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "bool" and len(node.args) == 1:
+        node = node.args[0]
+    if _field_path(node):
+        return {"field": _field_path(node), "op": "truthy"}
+    if not isinstance(node, ast.Compare) or len(node.ops) != 1 or not _field_path(node.left):
+        return None
+    op = VECTOR_COMPARISONS.get(type(node.ops[0]))
+    right = node.comparators[0]
+    if op is None:
+        return None
+    spec: Dict[str, Any] = {"field": _field_path(node.left), "op": op}
+    if isinstance(right, ast.Constant) and isinstance(right.value, (str, int, float)):
+        spec["value"] = right.value
+        return spec
+    if (
+        isinstance(right, ast.Attribute)
+        and isinstance(right.value, ast.Name)
+        and right.value.id == PARAMS
+        and op not in ("eq", "ne")
+    ):
+        spec["param"] = right.attr
+        return spec
+    return None
+
+
+@lru_cache(maxsize=None)
+def compile_expression(source: str) -> Expression:
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise PredicateError(f"Invalid expression {source!r}: {exc.msg}") from None
+    compiler = _Compiler(source)
+    return Expression(compiler.compile(tree), frozenset(compiler.fields), _vector_spec(tree.body))
+
+
+class CompiledRule:
+    uses_graph = False
+
+    def __init__(self, evaluation: Dict[str, Any]) -> None:
+        self.resource_type = evaluation.get("resource")
+        if not self.resource_type:
+            raise PredicateError("Predicate rules need evaluation.resource")
+        self.status = evaluation.get("status", "FAIL")
+        self.params = evaluation
+        expression = compile_expression(str(evaluation["predicate"]))
+        self.matches = expression.evaluate
+        self.vector = {"type": self.resource_type, **expression.vector} if expression.vector else None
+        self.evidence: List[Tuple[str, Compiled]] = []
+        self.constants: Dict[str, Any] = {}
+        all_fields = set(expression.fields)
+        for key, source in (evaluation.get("evidence") or {}).items():
+            if isinstance(source, str):
+                compiled, evidence_fields, _ = compile_expression(source)
+                all_fields.update(evidence_fields)
+                self.evidence.append((key, compiled))
+            else:
+                self.constants[key] = source
+        self.fields = frozenset((*utils.FINDING_FIELDS, "type", *all_fields))
+
+    def match(self, resource: Any) -> bool:
+        return bool(self.matches(resource, self.params))
+
+    def finding(self, rule: Any, resource: Any) -> Dict[str, Any]:
+        evidence = dict(self.constants)
+        for key, compiled in self.evidence:
+            evidence[key] = _plain(compiled(resource, self.params))
+        return utils.build_finding(rule, resource, self.status, evidence)
+
+    def __call__(self, rule: Any, resources: Iterable[Any]) -> List[Dict[str, Any]]:
+        matches, params, finding, resource_type = self.matches, self.params, self.finding, self.resource_type
+        return [
+            finding(rule, resource)
+            for resource in resources
+            if resource.get("type") == resource_type and matches(resource, params)
+        ]
+
+
+def _plain(value: Any) -> Any:
+    # Evidence is stored as JSON, so compact records and the tuples they hold become dicts and lists.
+    if isinstance(value, CompactResource):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def evaluate_fused(
+    checks: Iterable[Tuple[Any, CompiledRule, List[Dict[str, Any]]]],
+    resources: Iterable[Any],
+    timings: Optional[Dict[str, float]] = None,
+) -> None:
+    by_type: Dict[Optional[str], List[Tuple[Any, CompiledRule, List[Dict[str, Any]]]]] = {}
+    for check in checks:
+        by_type.setdefault(check[1].resource_type, []).append(check)
+    clock = time.perf_counter
+    for resource in resources:
+        group = by_type.get(resource.get("type"))
+        if group is None:
+            continue
+        for rule, compiled, findings in group:
+            started = clock() if timings is not None else 0.0
+            if compiled.matches(resource, compiled.params):
+                findings.append(compiled.finding(rule, resource))
+            if timings is not None:
+                timings[rule.id] = timings.get(rule.id, 0.0) + clock() - started
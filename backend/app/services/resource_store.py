@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.core.config import get_settings
+from app.services.resources import CompactResource, intern_value, resource_schema
+
+logger = logging.getLogger(__name__)
+
+STORE_BACKENDS = ("auto", "memory", "disk")
+SIZE_SAMPLE = 32
+READ_BATCH = 500
+COMPACT_KEY = "__compact__"
+TUPLE_KEY = "__tuple__"
+DATETIME_KEY = "__datetime__"
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, CompactResource):
+        return {COMPACT_KEY: list(value.__slots__), "items": {name: _encode(item) for name, item in value.items()}}
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return {TUPLE_KEY: [_encode(item) for item in value]}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, datetime):
+        return {DATETIME_KEY: value.isoformat()}
+    return value
+
+
+def _decode(payload: Dict[str, Any]) -> Any:
+    if COMPACT_KEY in payload:
+        record = resource_schema(frozenset(payload[COMPACT_KEY]))()
+        for name, item in payload["items"].items():
+            setattr(record, name, intern_value(item))
+        return record
+    if TUPLE_KEY in payload:
+        return tuple(payload[TUPLE_KEY])
+    if DATETIME_KEY in payload:
+        return datetime.fromisoformat(payload[DATETIME_KEY])
+    return payload
+
+
+def _dumps(resource: Any) -> bytes:
+    return json.dumps(_encode(resource), separators=(",", ":")).encode()
+
+
+def _loads(payload: bytes) -> Any:
+    return json.loads(payload, object_hook=_decode)
+
+
+def estimate_bytes(resources: List[Any]) -> int:
+    if not resources:
+        return 0
+    sample = resources[:SIZE_SAMPLE]
+    return len(_dumps(sample)) * len(resources) // len(sample)
+
+
+class ResourceStore(ABC):
+    backend = "memory"
+
+    @abstractmethod
+    def add(self, service: str, resources: Iterable[Any]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def services(self) -> List[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def resources(self, service: Optional[str] = None) -> Iterable[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, resource_id: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "ResourceStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class MemoryResourceStore(ResourceStore):
+    backend = "memory"
+
+    def __init__(self) -> None:
+        self._services: Dict[str, List[Any]] = {}
+        self._index: Dict[str, Any] = {}
+        self.estimated_bytes = 0
+
+    def add(self, service: str, resources: Iterable[Any]) -> None:
+        batch = list(resources)
+        self._services.setdefault(service, []).extend(batch)
+        for resource in batch:
+            if resource.get("id"):
+                self._index[resource["id"]] = resource
+        self.estimated_bytes += estimate_bytes(batch)
+
+    def services(self) -> List[str]:
+        return list(self._services)
+
+    def resources(self, service: Optional[str] = None) -> Iterable[Any]:
+        if service is not None:
+            return self._services.get(service, [])
+        return [resource for batch in self._services.values() for resource in batch]
+
+    def get(self, resource_id: str) -> Optional[Any]:
+        return self._index.get(resource_id)
+
+    def __len__(self) -> int:
+        return sum(len(batch) for batch in self._services.values())
+
+    def close(self) -> None:
+        self._services.clear()
+        self._index.clear()
+
+
+class _StoredResources:
+    def __init__(self, store: "DiskResourceStore", service: Optional[str]) -> None:
+        self.store = store
+        self.service = service
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.store._iterate(self.service)
+
+
+class DiskResourceStore(ResourceStore):
+    backend = "disk"
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix="resources-", suffix=".sqlite", dir=directory or None)
+        os.close(fd)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE resources (seq INTEGER PRIMARY KEY, service TEXT NOT NULL, resource_id TEXT, payload BLOB)"
+        )
+        self._conn.execute("CREATE INDEX ix_resources_id ON resources (resource_id)")
+        self._services: Dict[str, int] = {}
+
+    def add(self, service: str, resources: Iterable[Any]) -> None:
+        rows = ((service, resource.get("id"), _dumps(resource)) for resource in resources)
+        cursor = self._conn.executemany("INSERT INTO resources (service, resource_id, payload) VALUES (?, ?, ?)", rows)
+        self._conn.commit()
+        self._services[service] = self._services.get(service, 0) + cursor.rowcount
+
+    def services(self) -> List[str]:
+        return list(self._services)
+
+    def resources(self, service: Optional[str] = None) -> Iterable[Any]:
+        return _StoredResources(self, service)
+
+    def get(self, resource_id: str) -> Optional[Any]:
+        row = self._conn.execute(
+            "SELECT payload FROM resources WHERE resource_id = ? ORDER BY seq DESC LIMIT 1", (resource_id,)
+        ).fetchone()
+        return _loads(row[0]) if row else None
+
+    def __len__(self) -> int:
+        return sum(self._services.values())
+
+    def close(self) -> None:
+        self._conn.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _iterate(self, service: Optional[str]) -> Iterator[Any]:
+        if service is None:
+            cursor = self._conn.execute("SELECT payload FROM resources ORDER BY seq")
+        else:
+            cursor = self._conn.execute("SELECT payload FROM resources WHERE service = ? ORDER BY seq", (service,))
+        while True:
+            rows = cursor.fetchmany(READ_BATCH)
+            if not rows:
+                return
+            for (payload,) in rows:
+                yield _loads(payload)
+
+
+class SpillingResourceStore(ResourceStore):
+    def __init__(self, limit_bytes: int, directory: Optional[str] = None) -> None:
+        self.limit_bytes = limit_bytes
+        self.directory = directory
+        self._store: ResourceStore = MemoryResourceStore()
+
+    @property
+    def backend(self) -> str:  # type: ignore[override]
+        return self._store.backend
+
+    def add(self, service: str, resources: Iterable[Any]) -> None:
+        self._store.add(service, resources)
+        memory = self._store
+        if isinstance(memory, MemoryResourceStore) and memory.estimated_bytes > self.limit_bytes:
+            logger.info(
+                "Spilling %d resources (~%d MB) to disk",
+                len(memory),
+                memory.estimated_bytes // (1024 * 1024),
+            )
+            disk = DiskResourceStore(self.directory)
+            for name in memory.services():
+                disk.add(name, memory.resources(name))
+            memory.close()
+            self._store = disk
+
+    def services(self) -> List[str]:
+        return self._store.services()
+
+    def resources(self, service: Optional[str] = None) -> Iterable[Any]:
+        return self._store.resources(service)
+
+    def get(self, resource_id: str) -> Optional[Any]:
+        return self._store.get(resource_id)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def close(self) -> None:
+        self._store.close()
+
+
+def open_resource_store(
+    backend: Optional[str] = None,
+    memory_limit_mb: Optional[int] = None,
+    directory: Optional[str] = None,
+) -> ResourceStore:
+    settings = get_settings()
+    backend = (backend or settings.resource_store_backend).lower()
+    directory = directory or settings.resource_store_dir or None
+    if backend == "memory":
+        return MemoryResourceStore()
+    if backend == "disk":
+        return DiskResourceStore(directory)
+    if backend == "auto":
+        limit = settings.resource_store_memory_limit_mb if memory_limit_mb is None else memory_limit_mb
+        return SpillingResourceStore(limit * 1024 * 1024, directory)
+    raise ValueError(f"Unsupported resource store backend: {backend}")
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import sys
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Type
+
+INTERN_MAX_LENGTH = 64
+SHARED_RECORDS_MAX = 65_536
+
+Projection = Optional[Dict[str, Any]]
+SharedRecords = Dict[Tuple[Any, ...], "CompactResource"]
+
+
+class CompactResource:
+    __slots__: Tuple[str, ...] = ()
+    _fields: FrozenSet[str] = frozenset()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self._fields:
+            return default
+        return getattr(self, key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._fields:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and key in self._fields and hasattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CompactResource):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def keys(self) -> List[str]:
+        return [name for name in self.__slots__ if hasattr(self, name)]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(name, getattr(self, name)) for name in self.keys()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return _restore_resource, (tuple(self.__slots__), tuple(self.items()))
+
+
+@lru_cache(maxsize=None)
+def resource_schema(fields: FrozenSet[str]) -> Type[CompactResource]:
+    names = tuple(sorted(fields))
+    return type(
+        "CompactResource",
+        (CompactResource,),
+        {"__slots__": names, "_fields": frozenset(names)},
+    )
+
+
+def _restore_resource(fields: Tuple[str, ...], items: Tuple[Tuple[str, Any], ...]) -> CompactResource:
+    record = resource_schema(frozenset(fields))()
+    for name, value in items:
+        setattr(record, name, intern_value(value))
+    return record
+
+
+def build_projection(paths: Iterable[str]) -> Dict[str, Projection]:
+    tree: Dict[str, Projection] = {}
+    for path in paths:
+        node = tree
+        parts = path.split(".")
+        for index, part in enumerate(parts):
+            last = index == len(parts) - 1
+            if part in node and node[part] is None:
+                break
+            if last:
+                node[part] = None
+            else:
+                node = node.setdefault(part, {})  # type: ignore[assignment]
+    return tree
+
+
+def intern_value(value: Any, projection: Projection = None, shared: Optional[SharedRecords] = None) -> Any:
+    if isinstance(value, str):
+        return sys.intern(value) if len(value) <= INTERN_MAX_LENGTH else value
+    if isinstance(value, dict):
+        if projection is None:
+            return {_intern_key(key): intern_value(item) for key, item in value.items()}
+        record = resource_schema(frozenset(projection))()
+        for key, child in projection.items():
+            if key in value:
+                setattr(record, key, intern_value(value[key], child, shared))
+        if shared is None:
+            return record
+        return _share_record(record, shared)
+    if isinstance(value, (list, tuple)):
+        return tuple(intern_value(item, projection, shared) for item in value)
+    return value
+
+
+def _share_record(record: CompactResource, shared: SharedRecords) -> CompactResource:
+    # Nested records are never mutated after compaction, so equal ones (the default security group on every
+    # instance, say) can be stored once. Records holding unhashable values are kept as they are.
+    try:
+        key = (type(record), *record.items())
+        existing = shared.get(key)
+    except TypeError:
+        return record
+    if existing is not None:
+        return existing
+    if len(shared) < SHARED_RECORDS_MAX:
+        shared[key] = record
+    return record
+
+
+def _intern_key(key: Any) -> Any:
+    return sys.intern(key) if isinstance(key, str) else key
+
+
+class ResourceCompactor:
+    def __init__(self, fields: Iterable[str]) -> None:
+        self.fields = frozenset(fields)
+        self.projection = build_projection(self.fields)
+        self.schema = resource_schema(frozenset(self.projection))
+        self._slots = tuple((name, self.projection[name]) for name in self.schema.__slots__)
+        self._shared: SharedRecords = {}
+
+    def compact(self, configuration: Dict[str, Any]) -> CompactResource:
+        record = self.schema()
+        for name, projection in self._slots:
+            if name in configuration:
+                setattr(record, name, intern_value(configuration[name], projection, self._shared))
+        return record
+
+    def compact_all(self, configurations: Iterable[Dict[str, Any]]) -> List[CompactResource]:
+        return [self.compact(configuration) for configuration in configurations]
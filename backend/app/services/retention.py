@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.scan import Finding, ScanRegion, ScanRun
+from app.services.archive import ScanArchive, prune_orphan_evidence
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLE = "findings"
+DEFAULT_PARTITION = "findings_default"
+MONTHS_AHEAD = 2
+PARTITION_PATTERN = re.compile(r"^findings_y(\d{4})m(\d{2})$")
+DEFAULT_HAS_MONTH_SQL = (
+    "SELECT EXISTS (SELECT 1 FROM findings_default WHERE scan_created_at >= :start AND scan_created_at < :end)"
+)
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"findings_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    match = PARTITION_PATTERN.match(name)
+    if not match:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1)
+
+
+def create_partition_sql(month: datetime) -> str:
+    start = month_start(month)
+    end = add_months(start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF {PARTITIONED_TABLE} "
+        f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+    )
+
+
+def move_default_rows_sql(month: datetime) -> List[str]:
+    # A month whose rows already landed in the default partition cannot be created in place:
+    # PostgreSQL rejects the new partition while the default holds matching rows.
+    return [
+        f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {DEFAULT_PARTITION}",
+        create_partition_sql(month),
+        "INSERT INTO findings SELECT * FROM findings_default WHERE scan_created_at >= :start AND scan_created_at < :end",
+        "DELETE FROM findings_default WHERE scan_created_at >= :start AND scan_created_at < :end",
+        f"ALTER TABLE {PARTITIONED_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT",
+    ]
+
+
+def drop_partition_sql(name: str) -> List[str]:
+    return [f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}", f"DROP TABLE {name}"]
+
+
+def is_partitioned(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def list_partitions(db: Session) -> List[Tuple[str, datetime]]:
+    rows = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": PARTITIONED_TABLE},
+    ).scalars()
+    partitions = []
+    for name in rows:
+        month = partition_month(name)
+        if month is not None:
+            partitions.append((name, month))
+    return sorted(partitions, key=lambda entry: entry[1])
+
+
+def ensure_partitions(db: Session, now: Optional[datetime] = None, months_ahead: int = MONTHS_AHEAD) -> List[str]:
+    if not is_partitioned(db):
+        return []
+    current = month_start(now or datetime.utcnow())
+    existing = {name for name, _ in list_partitions(db)}
+    created = []
+    db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARTITIONED_TABLE} DEFAULT"))
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if partition_name(month) in existing:
+            continue
+        bounds = {"start": month, "end": add_months(month, 1)}
+        if db.execute(text(DEFAULT_HAS_MONTH_SQL), bounds).scalar():
+            logger.warning("Moving %s rows out of %s", partition_name(month), DEFAULT_PARTITION)
+            for statement in move_default_rows_sql(month):
+                db.execute(text(statement), bounds)
+        else:
+            db.execute(text(create_partition_sql(month)))
+        created.append(partition_name(month))
+    db.commit()
+    return created
+
+
+def apply_retention(
+    db: Session,
+    retention_months: Optional[int] = None,
+    now: Optional[datetime] = None,
+    archive: Optional[ScanArchive] = None,
+) -> Dict[str, Any]:
+    months = get_settings().findings_retention_months if retention_months is None else retention_months
+    created = ensure_partitions(db, now)
+    result: Dict[str, Any] = {"partitionsCreated": created, "partitionsDropped": [], "scansDeleted": 0}
+    if months <= 0:
+        return result
+
+    cutoff = add_months(month_start(now or datetime.utcnow()), -months)
+    if is_partitioned(db):
+        for name, month in list_partitions(db):
+            if month >= cutoff:
+                continue
+            for statement in drop_partition_sql(name):
+                db.execute(text(statement))
+            result["partitionsDropped"].append(name)
+    db.execute(delete(Finding).where(Finding.scan_created_at < cutoff))
+
+    archive = archive or ScanArchive()
+    expired = db.execute(select(ScanRun.id, ScanRun.archive_path).where(ScanRun.created_at < cutoff)).all()
+    scan_ids = [scan_id for scan_id, _ in expired]
+    if scan_ids:
+        db.execute(delete(ScanRegion).where(ScanRegion.scan_id.in_(scan_ids)))
+        db.execute(delete(ScanRun).where(ScanRun.id.in_(scan_ids)))
+    db.commit()
+    for _, path in expired:
+        if path:
+            archive.remove(path)
+    result["scansDeleted"] = len(scan_ids)
+    prune_orphan_evidence(db, older_than=cutoff)
+    logger.info(
+        "Retention dropped %d partitions and %d scans older than %s",
+        len(result["partitionsDropped"]),
+        len(scan_ids),
+        cutoff.date(),
+    )
+    return result
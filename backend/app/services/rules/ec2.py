@@ -2,9 +2,18 @@ from __future__ import annotations
 
 from typing import Any, Dict, Iterable, List
 
+from app.services.graph import ResourceGraph, world_open_ports
 from app.services.rules import utils
 
 
+@utils.requires(
+    "ip_permissions.IpProtocol",
+    "ip_permissions.FromPort",
+    "ip_permissions.ToPort",
+    "ip_permissions.IpRanges.CidrIp",
+    "name",
+    "description",
+)
 def security_group_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     ports = rule.evaluation.get("ports", [])
     cidrs = rule.evaluation.get("cidrs", ["0.0.0.0/0", "::/0"])
@@ -44,6 +53,7 @@ def security_group_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[
     return findings
 
 
+@utils.requires("metadata_options.HttpTokens", "public_ip")
 def instance_metadata_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     findings: List[Dict[str, Any]] = []
     for resource in resources:
@@ -66,7 +76,19 @@ def instance_metadata_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Di
     return findings
 
 
-def instance_public_exposure(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+@utils.requires(
+    "public_ip",
+    "metadata_options.HttpTokens",
+    "security_groups.GroupId",
+    "name",
+    "ip_permissions.IpProtocol",
+    "ip_permissions.FromPort",
+    "ip_permissions.ToPort",
+    "ip_permissions.IpRanges.CidrIp",
+    "ip_permissions.Ipv6Ranges.CidrIpv6",
+    graph=("security_group",),
+)
+def instance_public_exposure(rule, resources: Iterable[Dict[str, Any]], graph: ResourceGraph) -> List[Dict[str, Any]]:
     findings: List[Dict[str, Any]] = []
     for resource in resources:
         if resource.get("type") != "instance":
@@ -76,8 +98,10 @@ def instance_public_exposure(rule, resources: Iterable[Dict[str, Any]]) -> List[
             continue
         metadata_options = resource.get("metadata_options", {})
         http_tokens = metadata_options.get("HttpTokens")
-        security_groups = resource.get("security_groups", [])
-        exposures = [sg for sg in security_groups if sg.get("GroupName")]
+        exposures = {
+            sg.get("name"): world_open_ports(sg) for sg in graph.neighbors(resource["id"], "security_group")
+        }
+        exposures = {name: ports for name, ports in exposures.items() if ports}
         if http_tokens != "required" or exposures:
             findings.append(
                 utils.build_finding(
@@ -87,13 +111,15 @@ def instance_public_exposure(rule, resources: Iterable[Dict[str, Any]]) -> List[
                     {
                         "public_ip": public_ip,
                         "metadata_tokens": http_tokens,
-                        "security_groups": [sg.get("GroupName") for sg in exposures],
+                        "security_groups": list(exposures),
+                        "exposures": [port for ports in exposures.values() for port in ports],
                     },
                 )
             )
     return findings
 
 
+@utils.requires("encrypted", "attachments.InstanceId", "kms_key_id")
 def volume_encryption_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     findings: List[Dict[str, Any]] = []
     for resource in resources:
@@ -114,42 +140,7 @@ def volume_encryption_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Di
     return findings
 
 
-def snapshot_sharing_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    findings: List[Dict[str, Any]] = []
-    for resource in resources:
-        if resource.get("type") != "snapshot":
-            continue
-        shared_accounts = resource.get("shared_accounts", [])
-        if shared_accounts:
-            findings.append(
-                utils.build_finding(
-                    rule,
-                    resource,
-                    "WARN",
-                    {"shared_accounts": shared_accounts},
-                )
-            )
-    return findings
-
-
-def instance_age_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    threshold = rule.evaluation.get("ageDays", 180)
-    findings: List[Dict[str, Any]] = []
-    for resource in resources:
-        if resource.get("type") != "instance":
-            continue
-        if resource.get("age_days") and resource["age_days"] > threshold:
-            findings.append(
-                utils.build_finding(
-                    rule,
-                    resource,
-                    "WARN",
-                    {"age_days": resource["age_days"], "threshold": threshold},
-                )
-            )
-    return findings
-
-
+@utils.requires("iam_instance_profile.Arn")
 def instance_profile_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     findings: List[Dict[str, Any]] = []
     wildcard_keywords = ["*", "AdministratorAccess"]
@@ -171,21 +162,3 @@ def instance_profile_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dic
                     )
                 )
     return findings
-
-
-def termination_protection_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    findings: List[Dict[str, Any]] = []
-    for resource in resources:
-        if resource.get("type") != "instance":
-            continue
-        if not resource.get("termination_protection", False):
-            findings.append(
-                utils.build_finding(
-                    rule,
-                    resource,
-                    "WARN",
-                    {"termination_protection": False},
-                )
-            )
-    return findings
-
@@ -10,6 +10,7 @@ from app.services.rules import utils
 SUPPORTED_MINOR_DRIFT = 1
 
 
+@utils.requires("endpoint_public_access", "public_access_cidrs")
 def endpoint_restriction_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     findings: List[Dict[str, Any]] = []
     for resource in resources:
@@ -30,6 +31,7 @@ def endpoint_restriction_rule(rule, resources: Iterable[Dict[str, Any]]) -> List
     return findings
 
 
+@utils.requires("logging.clusterLogging.enabled", "logging.clusterLogging.types")
 def control_plane_logging_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     required = set(rule.evaluation.get("requiredLogs", ["api", "audit", "authenticator"]))
     findings: List[Dict[str, Any]] = []
@@ -53,6 +55,7 @@ def control_plane_logging_rule(rule, resources: Iterable[Dict[str, Any]]) -> Lis
     return findings
 
 
+@utils.requires("version", "nodegroups.version", "nodegroups.name")
 def version_skew_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     current_version = version.parse(rule.evaluation.get("currentVersion", "1.29"))
     drift = int(rule.evaluation.get("minorDrift", SUPPORTED_MINOR_DRIFT))
@@ -104,6 +107,7 @@ def version_skew_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[st
     return findings
 
 
+@utils.requires("tags")
 def irsa_usage_rule(rule, resources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     findings: List[Dict[str, Any]] = []
     for resource in resources:
@@ -1,13 +1,26 @@
 from __future__ import annotations
 
 import hashlib
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterable, TypeVar
+
+Evaluator = TypeVar("Evaluator", bound=Callable[..., Any])
+FINDING_FIELDS = ("id", "region")
 
 
 def anonymize_identifier(identifier: str) -> str:
     return hashlib.sha256(identifier.encode()).hexdigest()
 
 
+def requires(*fields: str, graph: Iterable[str] = ()) -> Callable[[Evaluator], Evaluator]:
+    def decorate(func: Evaluator) -> Evaluator:
+        func.fields = frozenset((*FINDING_FIELDS, "type", *fields))  # type: ignore[attr-defined]
+        func.relations = frozenset(graph)  # type: ignore[attr-defined]
+        func.uses_graph = bool(func.relations)  # type: ignore[attr-defined]
+        return func
+
+    return decorate
+
+
 def build_finding(rule, resource: Dict[str, Any], status: str, evidence: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "rule_id": rule.id,
@@ -1,57 +1,296 @@
 from __future__ import annotations
 
 import asyncio
+import base64
 import hashlib
 import json
 import logging
 import uuid
 from collections import defaultdict
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from functools import partial
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 
-import boto3
-from botocore.exceptions import ClientError
-from sqlalchemy.orm import Session
+from sqlalchemy import func, literal, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 
 from app.core import credentials
 from app.core.config import get_settings
+from app.core.telemetry import get_telemetry
 from app.db.session import SessionLocal
-from app.models.scan import Finding, LLMAdvice, RuleCatalog, ScanRegion, ScanRun, ScanStatusEnum
+from app.models.scan import (
+    AdviceStatusEnum,
+    EvidenceBlob,
+    Finding,
+    LLMAdvice,
+    RuleCatalog,
+    ScanBatch,
+    ScanRegion,
+    ScanRun,
+    ScanStatusEnum,
+)
 from app.services import schemas
+from app.services.aws_collectors._boto import boto3
 from app.services.aws_collectors.registry import CollectorRegistry
-from app.services.policy_engine import PolicyEngine
-from app.services.tasks import enqueue_scan
-from app.services.llm_service import LLMService
+from app.services.archive import ScanArchive, ScanArchivedError
+from app.services.aws_sessions import assumed_sessions
+from app.services.coalescing import coalesce_key, get_scan_coalescer
+from app.services.graph import ResourceGraph
+from app.services.inventory import InventoryCache, merge_inventory_stats
+from app.services.policy_engine import PolicyEngine, RuleStats, merge_rule_stats
+from app.services.resource_store import open_resource_store
+from app.services.scheduler import FairScheduler
+from app.services.validation_cache import get_validation_cache, validation_cache_key
 
 logger = logging.getLogger(__name__)
 
+DIFF_KINDS = ("new", "resolved", "unchanged")
+FINDING_FLUSH_BATCH = 1000
+
+
+class _AdviceCandidate(NamedTuple):
+    id: uuid.UUID
+    severity: str
+
 
 class ScanOrchestrator:
-    def __init__(self, db: Optional[Session] = None) -> None:
+    def __init__(self, db: Optional[Session] = None, async_db: Optional[AsyncSession] = None) -> None:
         self.db = db
+        self.async_db = async_db
         self.settings = get_settings()
         self.rule_engine = PolicyEngine()
 
     async def start_scan(self, request: schemas.ScanRequest) -> uuid.UUID:
-        caller_identity, minimal_permissions = await asyncio.to_thread(self._validate_credentials, request)
+        caller_identity, minimal_permissions = await self._validate_credentials(request)
 
         scan_id = uuid.uuid4()
         if not self.db:
             raise RuntimeError("Database session required to start a scan")
 
+        coalescer = get_scan_coalescer()
+        key = None
+        if coalescer.enabled and caller_identity.get("Account"):
+            key = coalesce_key(caller_identity["Account"], request.region_scope, self.rule_engine.catalog_version())
+            existing_id = coalescer.claim(key, scan_id)
+            if existing_id:
+                # The claimer commits its scan row after claiming, so a missing row is still in flight.
+                existing = self.db.get(ScanRun, existing_id)
+                if existing is None or existing.status != ScanStatusEnum.failed.value:
+                    logger.info("Coalescing scan request into %s", existing_id)
+                    return existing_id
+                coalescer.replace(key, scan_id)
+
+        try:
+            cred_key = self._create_scan(scan_id, request, caller_identity, minimal_permissions)
+            self.db.commit()
+            await enqueue_scan(scan_id=scan_id, credential_key=cred_key, region_scope=request.region_scope)
+        except Exception:
+            if key:
+                coalescer.release(key, scan_id)
+            raise
+        if not PERMISSION_PROBES.keys() <= minimal_permissions.keys():
+            self._spawn_permission_probes(scan_id, request)
+        return scan_id
+
+    async def start_batch(self, request: schemas.BatchScanRequest) -> Dict[str, Any]:
+        if not self.db:
+            raise RuntimeError("Database session required to start a batch")
+        scan_requests = request.scan_requests()
+        if not scan_requests:
+            raise ValueError("Batch requires at least one account")
+        results = await asyncio.gather(
+            *[self._validate_credentials(item) for item in scan_requests],
+            return_exceptions=True,
+        )
+        batch = ScanBatch(id=uuid.uuid4(), status=ScanStatusEnum.pending.value)
+        self.db.add(batch)
+        self.db.flush()
+        entries: List[Dict[str, Any]] = []
+        pending_probes: List[tuple[uuid.UUID, schemas.ScanRequest]] = []
+        rejected: List[int] = []
+        for index, (item, result) in enumerate(zip(scan_requests, results)):
+            if isinstance(result, BaseException):
+                rejected.append(index)
+                continue
+            caller_identity, minimal_permissions = result
+            scan_id = uuid.uuid4()
+            cred_key = self._create_scan(scan_id, item, caller_identity, minimal_permissions, batch_id=batch.id)
+            entries.append(
+                {
+                    "scan_id": str(scan_id),
+                    "credential_key": cred_key,
+                    "region_scope": item.region_scope,
+                    "account": _member_account(item, caller_identity) or str(scan_id),
+                }
+            )
+            if not PERMISSION_PROBES.keys() <= minimal_permissions.keys():
+                pending_probes.append((scan_id, item))
+        if not entries:
+            batch.status = ScanStatusEnum.failed.value
+        self.db.commit()
+        if entries:
+            await enqueue_batch(batch_id=batch.id, entries=entries)
+        for scan_id, item in pending_probes:
+            self._spawn_permission_probes(scan_id, item)
+        return {
+            "batchId": str(batch.id),
+            "scanIds": [entry["scan_id"] for entry in entries],
+            "rejected": rejected,
+        }
+
+    async def get_batch_status(self, batch_id: uuid.UUID) -> schemas.BatchStatusResponse:
+        batch = await self._get(ScanBatch, batch_id)
+        if not batch:
+            raise ValueError("Batch not found")
+        scans: Dict[str, int] = defaultdict(int)
+        for scan_status, count in await self._rows(
+            select(ScanRun.status, func.count(ScanRun.id))
+            .where(ScanRun.batch_id == batch_id)
+            .group_by(ScanRun.status)
+        ):
+            scans[scan_status] = count
+        regions_total = 0
+        regions_done = 0
+        for region_status, count in await self._rows(
+            select(ScanRegion.status, func.count(ScanRegion.id))
+            .join(ScanRun, ScanRun.id == ScanRegion.scan_id)
+            .where(ScanRun.batch_id == batch_id)
+            .group_by(ScanRegion.status)
+        ):
+            regions_total += count
+            if region_status in (ScanStatusEnum.completed.value, ScanStatusEnum.failed.value):
+                regions_done += count
+        return schemas.BatchStatusResponse(
+            batch_id=batch.id,
+            status=batch.status,
+            scans=dict(scans),
+            regions_total=regions_total,
+            regions_done=regions_done,
+            progress=round(regions_done / regions_total, 4) if regions_total else 0.0,
+        )
+
+    async def diff_scans(
+        self,
+        base_id: uuid.UUID,
+        target_id: uuid.UUID,
+        kind: str = "new",
+        cursor: Optional[str] = None,
+        limit: int = 500,
+    ) -> schemas.ScanDiffResponse:
+        if kind not in DIFF_KINDS:
+            raise ValueError(f"Unsupported diff kind: {kind}")
+        base = await self._get(ScanRun, base_id)
+        target = await self._get(ScanRun, target_id)
+        if not base or not target:
+            raise ValueError("Scan not found")
+        if base.archive_path or target.archive_path:
+            raise ScanArchivedError("Diff is only available for scans that have not been archived")
+
+        counts = None
+        if cursor is None:
+            counts = {}
+            for name in DIFF_KINDS:
+                stmt = select(func.count(Finding.id)).where(*_diff_criteria(name, base, target))
+                counts[name] = (await self._rows(stmt))[0][0]
+
+        stmt = _diff_statement(kind, base, target)
+        # NULL resource hashes sort and compare as '' so the keyset never skips them.
+        resource_key = func.coalesce(Finding.resource_hash, "")
+        if cursor:
+            rule_id, resource_hash, finding_id = _decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(Finding.rule_id, resource_key, Finding.id)
+                > tuple_(literal(rule_id), literal(resource_hash or ""), literal(finding_id, Finding.id.type))
+            )
+        stmt = stmt.order_by(Finding.rule_id, resource_key, Finding.id).limit(limit + 1)
+        rows = await self._rows(stmt)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = _encode_cursor(last.rule_id, last.resource_hash, last.id)
+        return schemas.ScanDiffResponse(
+            base_scan_id=base_id,
+            target_scan_id=target_id,
+            kind=kind,
+            counts=counts,
+            items=[schemas.ScanDiffItem(**row._mapping) for row in rows],
+            next_cursor=next_cursor,
+        )
+
+    async def _finding_rows(
+        self,
+        scan: ScanRun,
+        service: Optional[str] = None,
+        severity: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        if scan.archive_path:
+            return await asyncio.to_thread(ScanArchive().findings, scan.archive_path, service, severity)
+        stmt = select(Finding).where(Finding.scan_id == scan.id, Finding.scan_created_at == scan.created_at)
+        if service:
+            stmt = stmt.where(Finding.service == service)
+        if severity:
+            stmt = stmt.where(Finding.severity == severity)
+        return [
+            {
+                "id": str(f.id),
+                "rule_id": f.rule_id,
+                "service": f.service,
+                "severity": f.severity,
+                "status": f.status,
+                "evidence": f.evidence,
+                "region": f.region,
+                "resource_hash": f.resource_hash,
+                "advice_status": f.advice_status,
+                "advice_signature": f.advice_signature,
+            }
+            for f in await self._scalars(stmt)
+        ]
+
+    async def _get(self, model: Any, ident: Any) -> Any:
+        if self.async_db is not None:
+            return await self.async_db.get(model, ident)
+        return self._require_db().get(model, ident)
+
+    async def _scalars(self, stmt: Any) -> List[Any]:
+        if self.async_db is not None:
+            return list((await self.async_db.scalars(stmt)).all())
+        return list(self._require_db().scalars(stmt).all())
+
+    async def _rows(self, stmt: Any) -> List[Any]:
+        if self.async_db is not None:
+            return list((await self.async_db.execute(stmt)).all())
+        return list(self._require_db().execute(stmt).all())
+
+    def _require_db(self) -> Session:
+        if not self.db:
+            raise RuntimeError("Database session required")
+        return self.db
+
+    def _create_scan(
+        self,
+        scan_id: uuid.UUID,
+        request: schemas.ScanRequest,
+        caller_identity: Dict[str, Any],
+        minimal_permissions: Dict[str, Any],
+        batch_id: Optional[uuid.UUID] = None,
+    ) -> str:
+        db = self._require_db()
         scan_run = ScanRun(
             id=scan_id,
             status=ScanStatusEnum.pending.value,
             region_scope=request.region_scope or ["all"],
             caller_identity=caller_identity,
             minimal_permissions=minimal_permissions,
+            batch_id=batch_id,
         )
-        self.db.add(scan_run)
+        db.add(scan_run)
         regions = request.region_scope or ["all"]
         if regions == ["all"]:
             regions = ["GLOBAL"]
         for region in regions:
-            self.db.add(
+            db.add(
                 ScanRegion(
                     id=uuid.uuid4(),
                     scan_id=scan_id,
@@ -59,9 +298,8 @@ class ScanOrchestrator:
                     status=ScanStatusEnum.pending.value,
                 )
             )
-        self.db.commit()
 
-        cred_key = credentials.vault.store(
+        return credentials.vault.store(
             credentials.EphemeralCredential(
                 access_key_id=request.access_key_id,
                 secret_access_key=request.secret_access_key,
@@ -70,62 +308,103 @@ class ScanOrchestrator:
             )
         )
 
-        await enqueue_scan(scan_id=scan_id, credential_key=cred_key, region_scope=request.region_scope)
-        return scan_id
-
     async def get_status(self, scan_id: uuid.UUID) -> schemas.ScanStatusResponse:
-        if not self.db:
-            raise RuntimeError("Database session required")
-        scan = self.db.get(ScanRun, scan_id)
+        scan = await self._get(ScanRun, scan_id)
         if not scan:
             raise ValueError("Scan not found")
+        scan_regions = await self._scalars(
+            select(ScanRegion).where(ScanRegion.scan_id == scan_id).order_by(ScanRegion.region)
+        )
         regions = [
             schemas.RegionProgress(region=r.region, status=r.status, service_progress={})
-            for r in scan.regions
+            for r in scan_regions
         ]
         return schemas.ScanStatusResponse(scan_id=scan.id, status=scan.status, regions=regions)
 
     async def get_summary(self, scan_id: uuid.UUID) -> Dict[str, Any]:
-        if not self.db:
-            raise RuntimeError("Database session required")
-        scan = self.db.get(ScanRun, scan_id)
+        scan = await self._get(ScanRun, scan_id)
         if not scan:
             raise ValueError("Scan not found")
-        findings = self.db.query(Finding).filter(Finding.scan_id == scan_id).all()
+        if scan.archive_path:
+            totals = await asyncio.to_thread(ScanArchive().summary, scan.archive_path)
+            return {
+                "scanId": str(scan.id),
+                "status": scan.status,
+                "archived": True,
+                "metrics": scan.metrics,
+                "inventory": await self._scan_inventory_stats(scan.id),
+                **totals,
+            }
         severities: Dict[str, int] = defaultdict(int)
         services: Dict[str, int] = defaultdict(int)
-        for finding in findings:
-            severities[finding.severity] += 1
-            services[finding.service] += 1
+        advice: Dict[str, int] = defaultdict(int)
+        total = 0
+        for severity, service, advice_status, count in await self._rows(
+            select(Finding.severity, Finding.service, Finding.advice_status, func.count(Finding.id))
+            .where(Finding.scan_id == scan_id, Finding.scan_created_at == scan.created_at)
+            .group_by(Finding.severity, Finding.service, Finding.advice_status)
+        ):
+            severities[severity] += count
+            services[service] += count
+            advice[advice_status] += count
+            total += count
         return {
             "scanId": str(scan.id),
             "status": scan.status,
+            "archived": False,
+            "metrics": scan.metrics,
+            "inventory": await self._scan_inventory_stats(scan.id),
             "severityTotals": dict(severities),
             "serviceTotals": dict(services),
-            "totalFindings": len(findings),
+            "adviceTotals": dict(advice),
+            "totalFindings": total,
         }
 
+    async def list_findings(
+        self,
+        scan_id: uuid.UUID,
+        service: Optional[str] = None,
+        severity: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        scan = await self._get(ScanRun, scan_id)
+        if not scan:
+            return []
+        return [
+            {
+                "id": row["id"],
+                "ruleId": row["rule_id"],
+                "service": row["service"],
+                "severity": row["severity"],
+                "status": row["status"],
+                "evidence": row["evidence"],
+                "region": row["region"],
+                "adviceStatus": row["advice_status"],
+                "adviceSignature": row["advice_signature"],
+            }
+            for row in await self._finding_rows(scan, service=service, severity=severity)
+        ]
+
     async def export_scan(self, scan_id: uuid.UUID, format: str = "json") -> Any:
-        if not self.db:
-            raise RuntimeError("Database session required")
-        scan: ScanRun = self.db.query(ScanRun).get(scan_id)
+        scan = await self._get(ScanRun, scan_id)
         if not scan:
             raise ValueError("Scan not found")
-        findings = self.db.query(Finding).filter(Finding.scan_id == scan_id).all()
+        rows = await self._finding_rows(scan)
         export = schemas.ScanExport(
             scan_id=scan.id,
             summary=await self.get_summary(scan_id),
             findings=[
                 schemas.FindingExport(
-                    rule_id=f.rule_id,
-                    service=f.service,
-                    severity=f.severity,
-                    status=f.status,
-                    region=f.region,
-                    evidence=f.evidence,
+                    rule_id=row["rule_id"],
+                    service=row["service"],
+                    severity=row["severity"],
+                    status=row["status"],
+                    region=row["region"],
+                    evidence=row["evidence"],
+                    advice_status=row["advice_status"],
                 )
-                for f in findings
+                for row in rows
             ],
+            rule_stats=await self._scan_rule_stats(scan.id),
         )
         if format == "json":
             return json.loads(export.json())
@@ -141,68 +420,350 @@ class ScanOrchestrator:
                 lines.append(f"Region: {item.region or 'global'}")
                 lines.append("Evidence:")
                 lines.append(f"````json\n{json.dumps(item.evidence, indent=2)}\n````")
+            if export.rule_stats:
+                lines.append("## Rule profile")
+                lines.append("| Rule | Seconds | Resources | Findings | Over budget | Skipped |")
+                lines.append("| --- | --- | --- | --- | --- | --- |")
+                ranked = sorted(export.rule_stats.items(), key=lambda item: item[1]["seconds"], reverse=True)
+                for rule_id, stats in ranked:
+                    lines.append(
+                        f"| {rule_id} | {stats['seconds']:.4f} | {stats['resources']} | {stats['findings']} "
+                        f"| {stats['overBudget']} | {stats['skipped']} |"
+                    )
             return "\n\n".join(lines)
         raise ValueError("Unsupported format")
 
-    def _validate_credentials(self, request: schemas.ScanRequest) -> tuple[Dict[str, Any], Dict[str, Any]]:
-        session = boto3.Session(
-            aws_access_key_id=request.access_key_id,
-            aws_secret_access_key=request.secret_access_key,
-        )
-        client = session.client("sts")
+    async def rule_stats(self, since: datetime) -> Dict[str, Dict[str, Any]]:
+        totals: Dict[str, Dict[str, Any]] = {}
+        for stats in await self._scalars(
+            select(ScanRegion.rule_stats).where(ScanRegion.finished_at >= since, ScanRegion.rule_stats.is_not(None))
+        ):
+            merge_rule_stats(totals, stats)
+        return totals
+
+    async def _scan_inventory_stats(self, scan_id: uuid.UUID) -> Optional[Dict[str, Dict[str, Any]]]:
+        totals: Dict[str, Dict[str, Any]] = {}
+        for stats in await self._scalars(
+            select(ScanRegion.inventory_stats).where(
+                ScanRegion.scan_id == scan_id, ScanRegion.inventory_stats.is_not(None)
+            )
+        ):
+            merge_inventory_stats(totals, stats)
+        return totals or None
+
+    async def _scan_rule_stats(self, scan_id: uuid.UUID) -> Optional[Dict[str, Dict[str, Any]]]:
+        totals: Dict[str, Dict[str, Any]] = {}
+        for stats in await self._scalars(
+            select(ScanRegion.rule_stats).where(ScanRegion.scan_id == scan_id, ScanRegion.rule_stats.is_not(None))
+        ):
+            merge_rule_stats(totals, stats)
+        return totals or None
+
+    async def _validate_credentials(self, request: schemas.ScanRequest) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        # The cache is backed by sync Redis, so lookups run off the event loop like the STS call itself.
+        cache = get_validation_cache()
+        cache_key = _validation_key(request)
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached and cached.get("identity"):
+            permissions = {"sts:GetCallerIdentity": True, **(cached.get("permissions") or {})}
+            return cached["identity"], permissions
+        identity = await asyncio.to_thread(self._validate_identity, request)
+        await asyncio.to_thread(cache.update, cache_key, identity=identity)
+        return identity, {"sts:GetCallerIdentity": True}
+
+    def _validate_identity(self, request: schemas.ScanRequest) -> Dict[str, Any]:
+        from botocore.exceptions import ClientError
+
         try:
-            identity = client.get_caller_identity()
+            session = assumed_sessions.session_for(_ephemeral_credential(request))
+            identity = session.client("sts").get_caller_identity()
         except ClientError as exc:
             logger.error("Credential validation failed: %s", exc, exc_info=False)
             raise
-        minimal_permissions = {"sts:GetCallerIdentity": True}
-        probe_calls = {
-            "ec2:DescribeSecurityGroups": ("ec2", "describe_security_groups", {"MaxResults": 5}, "us-east-1"),
-            "eks:ListClusters": ("eks", "list_clusters", {}, "us-east-1"),
-            "s3:ListAllMyBuckets": ("s3", "list_buckets", {}, None),
+        identity.pop("ResponseMetadata", None)
+        return identity
+
+    def _spawn_permission_probes(self, scan_id: uuid.UUID, request: schemas.ScanRequest) -> None:
+        task = asyncio.ensure_future(_record_permissions(scan_id, request))
+        _background_tasks.add(task)
+        task.add_done_callback(_permission_probes_done)
+
+
+PERMISSION_PROBES: Dict[str, Tuple[str, str, Dict[str, Any]]] = {
+    "ec2:DescribeSecurityGroups": ("ec2", "describe_security_groups", {"MaxResults": 5}),
+    "eks:ListClusters": ("eks", "list_clusters", {}),
+    "s3:ListAllMyBuckets": ("s3", "list_buckets", {}),
+}
+
+_background_tasks: Set[asyncio.Future] = set()
+
+
+def _permission_probes_done(task: asyncio.Future) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Recording permission probes failed", exc_info=task.exception())
+
+
+async def enqueue_scan(scan_id: uuid.UUID, credential_key: str, region_scope: Optional[List[str]]) -> None:
+    from app.services import tasks
+
+    await tasks.enqueue_scan(scan_id, credential_key, region_scope)
+
+
+async def enqueue_batch(batch_id: uuid.UUID, entries: List[Dict[str, Any]]) -> None:
+    from app.services import tasks
+
+    await tasks.enqueue_batch(batch_id, entries)
+
+
+async def enqueue_enrichment(findings: List[Any]) -> None:
+    from app.services import tasks
+
+    await tasks.enqueue_enrichment(findings)
+
+
+def _diff_criteria(kind: str, base: ScanRun, target: ScanRun) -> List[Any]:
+    source, other = (base, target) if kind == "resolved" else (target, base)
+    match = aliased(Finding)
+    exists = (
+        select(match.id)
+        .where(
+            match.scan_id == other.id,
+            match.scan_created_at == other.created_at,
+            match.rule_id == Finding.rule_id,
+            match.resource_hash.is_not_distinct_from(Finding.resource_hash),
+        )
+        .exists()
+    )
+    return [
+        Finding.scan_id == source.id,
+        Finding.scan_created_at == source.created_at,
+        exists if kind == "unchanged" else ~exists,
+    ]
+
+
+def _diff_statement(kind: str, base: ScanRun, target: ScanRun) -> Any:
+    return (
+        select(
+            Finding.id,
+            Finding.rule_id,
+            Finding.resource_hash,
+            Finding.service,
+            Finding.severity,
+            Finding.status,
+            Finding.region,
+            EvidenceBlob.content.label("evidence"),
+        )
+        .join(EvidenceBlob, EvidenceBlob.hash == Finding.evidence_hash)
+        .where(*_diff_criteria(kind, base, target))
+    )
+
+
+def _encode_cursor(rule_id: str, resource_hash: Optional[str], finding_id: uuid.UUID) -> str:
+    raw = json.dumps([rule_id, resource_hash, str(finding_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, Optional[str], uuid.UUID]:
+    try:
+        rule_id, resource_hash, finding_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return rule_id, resource_hash, uuid.UUID(finding_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def _member_account(request: schemas.ScanRequest, caller_identity: Dict[str, Any]) -> Optional[str]:
+    if request.role_arn:
+        parts = request.role_arn.split(":")
+        if len(parts) > 4 and parts[4]:
+            return parts[4]
+    return caller_identity.get("Account")
+
+
+def _ephemeral_credential(request: schemas.ScanRequest) -> credentials.EphemeralCredential:
+    return credentials.EphemeralCredential(
+        access_key_id=request.access_key_id,
+        secret_access_key=request.secret_access_key,
+        role_arn=request.role_arn,
+        external_id=request.external_id,
+    )
+
+
+def _validation_key(request: schemas.ScanRequest) -> str:
+    return validation_cache_key(
+        request.access_key_id,
+        request.secret_access_key,
+        request.role_arn,
+        request.external_id,
+    )
+
+
+def _probe_region(region_scope: Optional[List[str]]) -> str:
+    for region in region_scope or []:
+        if region.upper() != "GLOBAL":
+            return region
+    return get_settings().default_probe_region
+
+
+async def _probe_permissions(request: schemas.ScanRequest) -> Dict[str, bool]:
+    region = _probe_region(request.region_scope)
+
+    def build_clients() -> Dict[str, Any]:
+        session = assumed_sessions.session_for(_ephemeral_credential(request))
+        return {
+            action: session.client(service, region_name=None if service == "s3" else region)
+            for action, (service, _, _) in PERMISSION_PROBES.items()
         }
-        for action, (service, method, kwargs, region) in probe_calls.items():
-            try:
-                probe_client = session.client(service, region_name=region)
-                getattr(probe_client, method)(**kwargs)
-                minimal_permissions[action] = True
-            except ClientError:
-                minimal_permissions[action] = False
-        return identity, minimal_permissions
+
+    from botocore.exceptions import ClientError
+
+    clients = await asyncio.to_thread(build_clients)
+
+    async def probe(action: str) -> tuple[str, bool]:
+        _, method, kwargs = PERMISSION_PROBES[action]
+        try:
+            await asyncio.to_thread(getattr(clients[action], method), **kwargs)
+            return action, True
+        except ClientError:
+            return action, False
+
+    return dict(await asyncio.gather(*[probe(action) for action in PERMISSION_PROBES]))
+
+
+async def _record_permissions(scan_id: uuid.UUID, request: schemas.ScanRequest) -> None:
+    try:
+        permissions = await _probe_permissions(request)
+    except Exception:
+        logger.exception("Permission probes failed for scan %s", scan_id)
+        return
+    await asyncio.to_thread(_store_permissions, scan_id, request, permissions)
+
+
+def _store_permissions(scan_id: uuid.UUID, request: schemas.ScanRequest, permissions: Dict[str, bool]) -> None:
+    get_validation_cache().update(_validation_key(request), permissions=permissions)
+    db = SessionLocal()
+    try:
+        scan = db.get(ScanRun, scan_id)
+        if scan:
+            merged = {**(scan.minimal_permissions or {}), **permissions}
+            db.execute(update(ScanRun).where(ScanRun.id == scan_id).values(minimal_permissions=merged))
+            db.commit()
+    finally:
+        db.close()
 
 
 async def execute_scan(scan_id: uuid.UUID, credential_key: str, region_scope: Optional[List[str]]) -> None:
-    cred = credentials.vault.retrieve(credential_key)
+    cred = credentials.vault.consume(credential_key)
     if not cred:
         logger.error("Credentials expired before scan execution")
         return
 
-    session = boto3.Session(
-        aws_access_key_id=cred.access_key_id,
-        aws_secret_access_key=cred.secret_access_key,
-    )
+    session = assumed_sessions.session_for(cred)
 
     collector_registry = CollectorRegistry(session=session)
     rule_engine = PolicyEngine()
+    regions = _resolve_regions(session, region_scope)
+
+    try:
+        await asyncio.gather(
+            *[
+                _run_region_scan(scan_id, session, region, collector_registry, rule_engine)
+                for region in regions
+            ]
+        )
+    finally:
+        get_telemetry().release(scan_id)
+
+
+async def execute_batch(batch_id: uuid.UUID, entries: List[Dict[str, Any]]) -> None:
+    settings = get_settings()
+    scheduler = FairScheduler(settings.batch_global_concurrency, settings.batch_per_account_concurrency)
+    rule_engine = PolicyEngine()
+    _mark_batch_running(batch_id)
 
-    # Determine regions
+    async def prepare(entry: Dict[str, Any]) -> Optional[tuple[boto3.Session, List[str]]]:
+        cred = credentials.vault.consume(entry["credential_key"])
+        if not cred:
+            logger.error("Credentials expired before batch execution for scan %s", entry["scan_id"])
+            return None
+        try:
+            session = await asyncio.to_thread(assumed_sessions.session_for, cred)
+            regions = await asyncio.to_thread(_resolve_regions, session, entry.get("region_scope"))
+        except Exception:
+            logger.exception("Session setup failed for scan %s", entry["scan_id"])
+            return None
+        return session, regions
+
+    prepared = await asyncio.gather(*[prepare(entry) for entry in entries])
+    for entry, result in zip(entries, prepared):
+        if result is None:
+            continue
+        session, regions = result
+        registry = CollectorRegistry(session=session)
+        for region in regions:
+            scheduler.submit(
+                entry["account"],
+                partial(_run_region_scan, uuid.UUID(entry["scan_id"]), session, region, registry, rule_engine),
+            )
+
+    try:
+        await scheduler.run()
+    finally:
+        credentials.vault.revoke_many(entry["credential_key"] for entry in entries)
+        for entry in entries:
+            get_telemetry().release(entry["scan_id"])
+        _finalize_batch(batch_id, [uuid.UUID(entry["scan_id"]) for entry in entries])
+
+
+def _resolve_regions(session: boto3.Session, region_scope: Optional[List[str]]) -> List[str]:
     if region_scope:
         regions = list(region_scope)
         if "GLOBAL" not in [r.upper() for r in regions]:
             regions.append("GLOBAL")
-    else:
-        ec2 = session.client("ec2", region_name="us-east-1")
-        response = ec2.describe_regions(AllRegions=True)
-        regions = [r["RegionName"] for r in response["Regions"] if r.get("OptInStatus") in ("opt-in-not-required", "opted-in")]
-        regions.append("GLOBAL")
-
-    await asyncio.gather(
-        *[
-            _run_region_scan(scan_id, session, region, collector_registry, rule_engine)
-            for region in regions
-        ]
-    )
-    credentials.vault.revoke(credential_key)
+        return regions
+    ec2 = session.client("ec2", region_name="us-east-1")
+    response = ec2.describe_regions(AllRegions=True)
+    regions = [r["RegionName"] for r in response["Regions"] if r.get("OptInStatus") in ("opt-in-not-required", "opted-in")]
+    regions.append("GLOBAL")
+    return regions
+
+
+def _mark_batch_running(batch_id: uuid.UUID) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(ScanBatch)
+            .where(ScanBatch.id == batch_id, ScanBatch.status == ScanStatusEnum.pending.value)
+            .values(status=ScanStatusEnum.running.value)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _finalize_batch(batch_id: uuid.UUID, scan_ids: List[uuid.UUID]) -> None:
+    db = SessionLocal()
+    try:
+        # Every region of these scans has finished, so any scan that did not complete has failed.
+        db.execute(
+            update(ScanRun)
+            .where(ScanRun.id.in_(scan_ids), ScanRun.status != ScanStatusEnum.completed.value)
+            .values(status=ScanStatusEnum.failed.value)
+        )
+        db.commit()
+        statuses = set(db.scalars(select(ScanRun.status).where(ScanRun.batch_id == batch_id).distinct()))
+        if statuses & {ScanStatusEnum.pending.value, ScanStatusEnum.running.value}:
+            return
+        if statuses == {ScanStatusEnum.completed.value}:
+            status = ScanStatusEnum.completed.value
+        elif ScanStatusEnum.completed.value in statuses:
+            status = ScanStatusEnum.partial.value
+        else:
+            status = ScanStatusEnum.failed.value
+        db.execute(update(ScanBatch).where(ScanBatch.id == batch_id).values(status=status))
+        db.commit()
+    finally:
+        db.close()
 
 
 async def _run_region_scan(
@@ -212,6 +773,18 @@ async def _run_region_scan(
     registry: CollectorRegistry,
     rule_engine: PolicyEngine,
 ) -> None:
+    with get_telemetry().scan(scan_id):
+        await _scan_region(scan_id, session, region, registry, rule_engine)
+
+
+async def _scan_region(
+    scan_id: uuid.UUID,
+    session: boto3.Session,
+    region: str,
+    registry: CollectorRegistry,
+    rule_engine: PolicyEngine,
+) -> None:
+    telemetry = get_telemetry()
     db = SessionLocal()
     scan_region = None
     try:
@@ -237,31 +810,62 @@ async def _run_region_scan(
             scan_region.status = ScanStatusEnum.running.value
             scan_region.started_at = datetime.utcnow()
         collectors = registry.get_collectors(region)
-        llm_candidates: List[Finding] = []
-        for collector in collectors:
-            resources = [r.configuration for r in await collector.collect()]
-            findings = rule_engine.evaluate(collector.service, resources)
-            for finding in findings:
-                finding_model = Finding(
-                    id=uuid.uuid4(),
-                    scan_id=scan_id,
-                    service=finding["service"],
-                    rule_id=finding["rule_id"],
-                    severity=finding["severity"],
-                    status=finding["status"],
-                    evidence=finding["evidence"],
-                    region=finding.get("region", region),
-                    resource_hash=finding.get("resource_hash"),
-                )
-                db.add(finding_model)
-                llm_candidates.append(finding_model)
+        settings = get_settings()
+        account = (scan_run.caller_identity or {}).get("Account")
+        inventory = InventoryCache.load(db, account, region) if settings.inventory_cache_enabled and account else None
+        if inventory is not None:
+            for collector in collectors:
+                if collector.uses_inventory_cache:
+                    collector.cache = inventory.for_collector(type(collector).__name__)
+        advice_status = AdviceStatusEnum.pending.value if settings.llm_advice_enabled else AdviceStatusEnum.skipped.value
+        llm_candidates: List[_AdviceCandidate] = []
+        rule_stats: Optional[Dict[str, RuleStats]] = {} if rule_engine.profile else None
+        with open_resource_store() as store:
+            for collector in collectors:
+                collector.compactor = rule_engine.compactor(collector.service)
+                with telemetry.span("collector.collect", collector.service, region=region):
+                    collected = await collector.collect()
+                store.add(collector.service, [result.configuration for result in collected])
+                del collected
+            with telemetry.span("graph.build", region, store=store.backend):
+                graph = ResourceGraph.build(store.resources(), lookup=store.get)
+            pending = 0
+            for service in store.services():
+                findings = rule_engine.evaluate(service, store.resources(service), stats=rule_stats, graph=graph)
+                for finding in findings:
+                    finding_model = Finding(
+                        id=uuid.uuid4(),
+                        scan_id=scan_id,
+                        scan_created_at=scan_run.created_at,
+                        service=finding["service"],
+                        rule_id=finding["rule_id"],
+                        severity=finding["severity"],
+                        status=finding["status"],
+                        evidence=finding["evidence"],
+                        region=finding.get("region", region),
+                        resource_hash=finding.get("resource_hash"),
+                        advice_status=advice_status,
+                    )
+                    db.add(finding_model)
+                    if settings.llm_advice_enabled:
+                        llm_candidates.append(_AdviceCandidate(finding_model.id, finding_model.severity))
+                    pending += 1
+                    if pending >= FINDING_FLUSH_BATCH:
+                        db.flush()
+                        pending = 0
+                del findings
         if scan_region:
             scan_region.status = ScanStatusEnum.completed.value
             scan_region.finished_at = datetime.utcnow()
+            if rule_stats is not None:
+                scan_region.rule_stats = {rule_id: stats.dict() for rule_id, stats in rule_stats.items()}
+            if inventory is not None:
+                scan_region.inventory_stats = inventory.stats() or None
+        if inventory is not None:
+            inventory.save(db)
         db.commit()
         if llm_candidates:
-            service = LLMService(db)
-            await service.enrich_findings(llm_candidates)
+            await enqueue_enrichment(llm_candidates)
         remaining = (
             db.query(ScanRegion)
             .filter(ScanRegion.scan_id == scan_id, ScanRegion.status != ScanStatusEnum.completed.value)
@@ -269,6 +873,9 @@ async def _run_region_scan(
         )
         if remaining == 0:
             scan_run.status = ScanStatusEnum.completed.value
+        rollup = telemetry.rollup(scan_id)
+        if rollup is not None:
+            scan_run.metrics = rollup.snapshot()
         db.commit()
     except Exception:
         db.rollback()
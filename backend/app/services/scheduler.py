@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict, deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+
+class FairScheduler:
+    def __init__(self, global_limit: int, per_account_limit: int) -> None:
+        self.global_limit = max(1, global_limit)
+        self.per_account_limit = max(1, per_account_limit)
+        self._queues: Dict[str, Deque[Job]] = {}
+        self._accounts: List[str] = []
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._cursor = 0
+        self.started: List[str] = []
+
+    def submit(self, account: str, job: Job) -> None:
+        if account not in self._queues:
+            self._queues[account] = deque()
+            self._accounts.append(account)
+        self._queues[account].append(job)
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def run(self) -> None:
+        running: Set[asyncio.Future] = set()
+        while True:
+            while len(running) < self.global_limit:
+                account = self._next_account()
+                if account is None:
+                    break
+                job = self._queues[account].popleft()
+                self._in_flight[account] += 1
+                self.started.append(account)
+                running.add(asyncio.ensure_future(self._run_job(account, job)))
+            if not running:
+                break
+            _, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+    def _next_account(self) -> Optional[str]:
+        total = len(self._accounts)
+        for offset in range(total):
+            index = (self._cursor + offset) % total
+            account = self._accounts[index]
+            if self._queues[account] and self._in_flight[account] < self.per_account_limit:
+                self._cursor = (index + 1) % total
+                return account
+        return None
+
+    async def _run_job(self, account: str, job: Job) -> None:
+        try:
+            await job()
+        except Exception:
+            logger.exception("Scheduled job for account %s failed", account)
+        finally:
+            self._in_flight[account] -= 1
+
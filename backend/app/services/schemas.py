@@ -31,6 +31,55 @@ class ScanRequest(CredentialBundle):
     pass
 
 
+class BatchScanRequest(BaseModel):
+    accounts: List[ScanRequest] = Field(default_factory=list)
+    hub: Optional[CredentialBundle] = None
+    role_arns: List[str] = Field(default_factory=list, alias="roleArns")
+    external_id: Optional[str] = Field(None, alias="externalId")
+    region_scope: Optional[List[str]] = Field(None, alias="regionScope")
+
+    class Config:
+        allow_population_by_field_name = True
+
+    @validator("region_scope", pre=True)
+    def validate_region_scope(cls, value):
+        return CredentialBundle.validate_region_scope(value)
+
+    @validator("role_arns")
+    def validate_role_arns(cls, value, values):
+        if value and not values.get("hub"):
+            raise ValueError("roleArns require hub credentials")
+        return value
+
+    def scan_requests(self) -> List[ScanRequest]:
+        requests = list(self.accounts)
+        if not self.role_arns:
+            return requests
+        hub = self.hub
+        if hub is None:
+            raise ValueError("roleArns require hub credentials")
+        for role_arn in self.role_arns:
+            requests.append(
+                ScanRequest(
+                    accessKeyId=hub.access_key_id,
+                    secretAccessKey=hub.secret_access_key,
+                    regionScope=self.region_scope or hub.region_scope,
+                    roleArn=role_arn,
+                    externalId=self.external_id or hub.external_id,
+                )
+            )
+        return requests
+
+
+class BatchStatusResponse(BaseModel):
+    batch_id: uuid.UUID
+    status: str
+    scans: Dict[str, int]
+    regions_total: int
+    regions_done: int
+    progress: float
+
+
 class RegionProgress(BaseModel):
     region: str
     status: str
@@ -50,9 +99,31 @@ class FindingExport(BaseModel):
     status: str
     region: Optional[str]
     evidence: Dict[str, Any]
+    advice_status: Optional[str] = None
 
 
 class ScanExport(BaseModel):
     scan_id: uuid.UUID
     summary: Dict[str, Any]
     findings: List[FindingExport]
+    rule_stats: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+class ScanDiffItem(BaseModel):
+    id: uuid.UUID
+    rule_id: str
+    resource_hash: Optional[str]
+    service: str
+    severity: str
+    status: str
+    region: Optional[str]
+    evidence: Dict[str, Any]
+
+
+class ScanDiffResponse(BaseModel):
+    base_scan_id: uuid.UUID
+    target_scan_id: uuid.UUID
+    kind: str
+    counts: Optional[Dict[str, int]] = None
+    items: List[ScanDiffItem]
+    next_cursor: Optional[str] = None
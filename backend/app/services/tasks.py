@@ -6,26 +6,102 @@ import uuid
 from typing import Any, Dict, Optional
 
 from celery import Celery
+from celery.signals import worker_init  # type: ignore[import-untyped]
 
 from app.core.config import get_settings
-from app.services.scan_orchestrator import execute_scan
+from app.core.telemetry import get_telemetry
 
 settings = get_settings()
 
 celery_app = Celery("aws_securescope")
 celery_app.conf.broker_url = settings.celery_config["broker_url"]
 celery_app.conf.result_backend = settings.celery_config["result_backend"]
-celery_app.conf.task_routes = {"app.services.tasks.run_scan_task": {"queue": "scans"}}
+celery_app.conf.task_routes = {
+    "app.services.tasks.run_scan_task": {"queue": "scans"},
+    "app.services.tasks.run_batch_task": {"queue": "scans"},
+    "app.services.tasks.enrich_findings_task": {"queue": "llm"},
+    "app.services.tasks.archive_scans_task": {"queue": "scans"},
+    "app.services.tasks.apply_retention_task": {"queue": "scans"},
+}
 celery_app.conf.task_serializer = "json"
 celery_app.conf.result_serializer = "json"
 celery_app.conf.accept_content = ["json"]
 celery_app.conf.worker_concurrency = int(os.getenv("CELERY_CONCURRENCY", "4"))
+celery_app.conf.broker_transport_options = {
+    "priority_steps": list(range(10)),
+    "sep": ":",
+    "queue_order_strategy": "priority",
+}
+celery_app.conf.beat_schedule = {
+    "archive-completed-scans": {"task": "app.services.tasks.archive_scans_task", "schedule": 3600.0},
+    "apply-retention": {"task": "app.services.tasks.apply_retention_task", "schedule": 86400.0},
+}
+
+
+@worker_init.connect
+def start_worker_metrics(**_: Any) -> None:
+    get_telemetry().start_metrics_server(settings.worker_metrics_port)
+
+
+SEVERITY_PRIORITY = {"CRITICAL": 0, "HIGH": 3, "MEDIUM": 6, "LOW": 9}
+ENRICHMENT_CHUNK = 500
 
 
 @celery_app.task(name="app.services.tasks.run_scan_task")
 def run_scan_task(scan_id: str, credential_key: str, region_scope: Optional[list[str]]) -> None:
+    from app.services.scan_orchestrator import execute_scan
+
     asyncio.run(execute_scan(uuid.UUID(scan_id), credential_key, region_scope))
 
 
 async def enqueue_scan(scan_id: uuid.UUID, credential_key: str, region_scope: Optional[list[str]]) -> None:
     run_scan_task.delay(str(scan_id), credential_key, region_scope)
+
+
+@celery_app.task(name="app.services.tasks.run_batch_task")
+def run_batch_task(batch_id: str, entries: list[Dict[str, Any]]) -> None:
+    from app.services.scan_orchestrator import execute_batch
+
+    asyncio.run(execute_batch(uuid.UUID(batch_id), entries))
+
+
+async def enqueue_batch(batch_id: uuid.UUID, entries: list[Dict[str, Any]]) -> None:
+    run_batch_task.delay(str(batch_id), entries)
+
+
+@celery_app.task(name="app.services.tasks.enrich_findings_task")
+def enrich_findings_task(finding_ids: list[str]) -> None:
+    from app.services.llm_service import enrich_pending_findings
+
+    asyncio.run(enrich_pending_findings([uuid.UUID(finding_id) for finding_id in finding_ids]))
+
+
+async def enqueue_enrichment(findings: list[Any]) -> None:
+    by_severity: Dict[str, list[str]] = {}
+    for finding in findings:
+        by_severity.setdefault(finding.severity, []).append(str(finding.id))
+    for severity in sorted(by_severity, key=lambda value: SEVERITY_PRIORITY.get(value, 9)):
+        ids = by_severity[severity]
+        for start in range(0, len(ids), ENRICHMENT_CHUNK):
+            enrich_findings_task.apply_async(
+                args=[ids[start : start + ENRICHMENT_CHUNK]],
+                priority=SEVERITY_PRIORITY.get(severity, 9),
+            )
+
+
+@celery_app.task(name="app.services.tasks.archive_scans_task")
+def archive_scans_task() -> int:
+    from app.db.session import SessionLocal
+    from app.services.archive import archive_completed_scans
+
+    with SessionLocal() as db:
+        return archive_completed_scans(db)
+
+
+@celery_app.task(name="app.services.tasks.apply_retention_task")
+def apply_retention_task() -> Dict[str, Any]:
+    from app.db.session import SessionLocal
+    from app.services.retention import apply_retention
+
+    with SessionLocal() as db:
+        return apply_retention(db)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.cache import get_redis
+from app.core.config import get_settings
+
+KEY_PREFIX = "cred-validation:"
+
+
+def validation_cache_key(
+    access_key_id: str,
+    secret_access_key: str,
+    role_arn: Optional[str] = None,
+    external_id: Optional[str] = None,
+) -> str:
+    raw = "|".join([access_key_id, secret_access_key, role_arn or "", external_id or ""])
+    return KEY_PREFIX + hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ValidationCache:
+    def __init__(self, client=None, ttl_seconds: Optional[int] = None) -> None:
+        settings = get_settings()
+        self.ttl_seconds = settings.credential_validation_cache_seconds if ttl_seconds is None else ttl_seconds
+        self._client = client
+        self._memory: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._lock = threading.Lock()
+
+    def _redis(self):
+        return self._client if self._client is not None else get_redis()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.ttl_seconds <= 0:
+            return None
+        redis = self._redis()
+        if redis:
+            raw = redis.get(key)
+            return json.loads(raw) if raw else None
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > time.time():
+                return entry[0]
+            self._memory.pop(key, None)
+        return None
+
+    def update(self, key: str, **fields: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        value = dict(self.get(key) or {})
+        value.update(fields)
+        redis = self._redis()
+        if redis:
+            redis.set(key, json.dumps(value, default=str), ex=self.ttl_seconds)
+            return
+        with self._lock:
+            self._memory[key] = (value, time.time() + self.ttl_seconds)
+
+
+@lru_cache()
+def get_validation_cache() -> ValidationCache:
+    return ValidationCache()
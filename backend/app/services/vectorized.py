@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# op -> (pyarrow.compute function, result for rows whose field is missing)
+VECTOR_OPS: Dict[str, Tuple[Optional[str], bool]] = {
+    "truthy": (None, False),
+    "falsy": (None, True),
+    "eq": ("equal", False),
+    "ne": ("not_equal", True),
+    "gt": ("greater", False),
+    "ge": ("greater_equal", False),
+    "lt": ("less", False),
+    "le": ("less_equal", False),
+}
+
+
+@lru_cache()
+def _arrow() -> Any:
+    try:
+        import pyarrow as pa  # type: ignore[import-untyped]
+        import pyarrow.compute as pc  # type: ignore[import-untyped]
+    except ImportError:
+        logger.warning("pyarrow not installed; vectorized rules fall back to Python evaluators")
+        return None
+    return pa, pc
+
+
+def vector_spec_valid(spec: Any) -> bool:
+    return isinstance(spec, dict) and bool(spec.get("type")) and bool(spec.get("field")) and spec.get("op") in VECTOR_OPS
+
+
+def _field_values(rows: List[Any], path: str) -> List[Any]:
+    if "." not in path:
+        return [row.get(path) for row in rows]
+    parts = path.split(".")
+    values = []
+    for row in rows:
+        value = row
+        for part in parts:
+            if value is None:
+                break
+            value = value.get(part)
+        values.append(value)
+    return values
+
+
+class ColumnarResources:
+    def __init__(self, resources: Sequence[Any], specs: Iterable[Dict[str, Any]]) -> None:
+        self.resources = resources
+        self.fields: Dict[str, List[str]] = {}
+        for spec in specs:
+            if vector_spec_valid(spec) and spec["field"] not in self.fields.setdefault(spec["type"], []):
+                self.fields[spec["type"]].append(spec["field"])
+        self._rows: Dict[str, List[Any]] = {}
+        self._columns: Dict[Tuple[str, str, bool], Any] = {}
+
+    def rows(self, resource_type: str) -> List[Any]:
+        if resource_type not in self._rows:
+            self._rows[resource_type] = [
+                resource for resource in self.resources if resource.get("type") == resource_type
+            ]
+        return self._rows[resource_type]
+
+    def column(self, resource_type: str, field: str, boolean: bool = False) -> Any:
+        key = (resource_type, field, boolean)
+        if key not in self._columns:
+            pa, _ = _arrow()
+            if field not in self.fields.get(resource_type, ()):
+                raise ValueError(f"{resource_type}.{field} is not a declared column")
+            values = _field_values(self.rows(resource_type), field)
+            if boolean:
+                try:
+                    column = pa.array(values, type=pa.bool_())
+                except (pa.ArrowException, TypeError, ValueError):
+                    column = pa.array([bool(value) for value in values], type=pa.bool_())
+            else:
+                column = pa.array(values)
+            self._columns[key] = column
+        return self._columns[key]
+
+    def select(self, spec: Dict[str, Any], params: Dict[str, Any]) -> Optional[List[Any]]:
+        arrow = _arrow()
+        if arrow is None or not vector_spec_valid(spec):
+            return None
+        pa, pc = arrow
+        resource_type, field, op = spec["type"], spec["field"], spec["op"]
+        function, missing = VECTOR_OPS[op]
+        try:
+            if function is None:
+                mask = self.column(resource_type, field, boolean=True)
+                if op == "falsy":
+                    mask = pc.invert(mask)
+            else:
+                value = params.get(spec["param"], spec.get("value")) if spec.get("param") else spec.get("value")
+                mask = pc.call_function(function, [self.column(resource_type, field), pa.scalar(value)])
+            mask = pc.fill_null(mask, missing)
+            matched = pc.indices_nonzero(mask).to_pylist()
+        except (pa.ArrowException, TypeError, ValueError, AttributeError) as exc:
+            logger.debug("Vectorized predicate on %s.%s unavailable: %s", resource_type, field, exc)
+            return None
+        rows = self.rows(resource_type)
+        return [rows[index] for index in matched]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import uuid
+
+import pytest
+from inventory import synthetic_inventory
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.scan import Finding, ScanRun, ScanStatusEnum
+from app.services.policy_engine import PolicyEngine
+from app.services.scan_orchestrator import ScanOrchestrator
+
+INSERT_CHUNK = 5000
+
+
+def _database_url(tmp_path_factory) -> str:
+    return os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tmp_path_factory.mktemp('bench') / 'findings.db'}"
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = create_engine(_database_url(tmp_path_factory))
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _findings(size: int):
+    engine = PolicyEngine(profile=False, rule_budget_seconds=0)
+    findings = engine.evaluate("ec2", synthetic_inventory("ec2", size))
+    while len(findings) < size:
+        findings.extend(findings[: size - len(findings)])
+    return findings[:size]
+
+
+def _insert(session_factory, findings) -> uuid.UUID:
+    with session_factory() as db:
+        scan = ScanRun(status=ScanStatusEnum.completed.value, region_scope=["us-east-1"])
+        db.add(scan)
+        db.flush()
+        for start in range(0, len(findings), INSERT_CHUNK):
+            db.add_all(
+                Finding(
+                    scan_id=scan.id,
+                    scan_created_at=scan.created_at,
+                    service=finding["service"],
+                    rule_id=finding["rule_id"],
+                    severity=finding["severity"],
+                    status=finding["status"],
+                    evidence=finding["evidence"],
+                    region=finding["region"],
+                    resource_hash=finding["resource_hash"],
+                )
+                for finding in findings[start : start + INSERT_CHUNK]
+            )
+            db.flush()
+        db.commit()
+        return scan.id
+
+
+@pytest.fixture(scope="module")
+def seeded(engine):
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    cache = {}
+
+    def scan_for(size: int) -> uuid.UUID:
+        if size not in cache:
+            cache[size] = _insert(session_factory, _findings(size))
+        return cache[size]
+
+    return session_factory, scan_for
+
+
+def test_bulk_insert_findings(benchmark, engine, size):
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    findings = _findings(size)
+    scan_id = benchmark.pedantic(_insert, args=(session_factory, findings), rounds=3, iterations=1)
+    assert scan_id
+
+
+def test_summary_aggregation(benchmark, seeded, size):
+    session_factory, scan_for = seeded
+    scan_id = scan_for(size)
+    with session_factory() as db:
+        orchestrator = ScanOrchestrator(db=db)
+        summary = benchmark.pedantic(lambda: asyncio.run(orchestrator.get_summary(scan_id)), rounds=5, iterations=1)
+    assert summary["totalFindings"] == size
+
+
+@pytest.mark.parametrize("format", ["json", "md"])
+def test_export(benchmark, seeded, size, format):
+    session_factory, scan_for = seeded
+    scan_id = scan_for(size)
+
+    def export():
+        with session_factory() as db:
+            return asyncio.run(ScanOrchestrator(db=db).export_scan(scan_id, format=format))
+
+    result = benchmark.pedantic(export, rounds=3, iterations=1)
+    assert result
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import pytest
+from inventory import synthetic_inventory
+
+from app.services.graph import ResourceGraph
+from app.services.policy_engine import RULES_DIR, PolicyEngine, _load_rules
+from app.services.resource_store import DiskResourceStore
+from app.services.rules.utils import build_finding
+
+
+def test_load_rules_parsing(benchmark):
+    texts = [path.read_text() for path in sorted(RULES_DIR.glob("*.yaml"))]
+    parsed = benchmark(lambda: [_load_rules(text) for text in texts])
+    assert sum(len(rules) for rules in parsed) >= 50
+
+
+@pytest.mark.parametrize("service", ["ec2", "eks", "common"])
+def test_evaluate(benchmark, service, size):
+    engine = PolicyEngine(profile=False, rule_budget_seconds=0)
+    engine.load_rules(service)
+    resources = synthetic_inventory(service, size)
+    findings = benchmark.pedantic(engine.evaluate, args=(service, resources), rounds=3, iterations=1)
+    assert findings
+
+
+@pytest.mark.parametrize("fused", [True, False], ids=["fused", "per-rule"])
+def test_evaluate_spilled(benchmark, fused, size, tmp_path):
+    engine = PolicyEngine(profile=False, rule_budget_seconds=0 if fused else 3600)
+    engine.load_rules("common")
+    store = DiskResourceStore(str(tmp_path))
+    store.add("common", synthetic_inventory("common", size))
+    try:
+        findings = benchmark.pedantic(
+            engine.evaluate, args=("common", store.resources("common")), rounds=3, iterations=1
+        )
+    finally:
+        store.close()
+    assert findings
+
+
+def test_build_finding_hashing(benchmark, size):
+    rule = PolicyEngine().load_rules("ec2")[0]
+    resources = synthetic_inventory("ec2", size)
+    findings = benchmark.pedantic(
+        lambda: [build_finding(rule, resource, "FAIL", {"id": resource["id"]}) for resource in resources],
+        rounds=3,
+        iterations=1,
+    )
+    assert len(findings) == size
+
+
+def test_compact_resources(benchmark, size):
+    engine = PolicyEngine(compact=True)
+    resources = synthetic_inventory("ec2", size)
+    compact = benchmark.pedantic(engine.compact, args=("EC2", resources), rounds=3, iterations=1)
+    assert len(compact) == size
+
+
+def test_build_graph(benchmark, size):
+    resources = synthetic_inventory("ec2", size) + synthetic_inventory("eks", size // 10)
+    graph = benchmark.pedantic(ResourceGraph.build, args=(resources,), rounds=3, iterations=1)
+    assert graph.edge_count
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+for path in (ROOT / "backend", ROOT):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6399/0")
+os.environ.setdefault("CREDENTIAL_VAULT_ALLOW_MEMORY", "true")
+
+DEFAULT_SIZES = "1000,10000"
+
+
+def bench_sizes() -> list[int]:
+    return [int(size) for size in os.getenv("BENCH_SIZES", DEFAULT_SIZES).split(",") if size.strip()]
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if "size" in metafunc.fixturenames:
+        metafunc.parametrize("size", bench_sizes(), ids=lambda size: f"{size}")
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import random
+from typing import Any, Callable, Dict, List
+
+REGIONS = ["us-east-1", "us-west-2", "eu-west-1", "ap-southeast-2"]
+EXPOSED_PORTS = [22, 80, 443, 3389, 5432, 6379, 9200, 27017]
+
+
+def _security_group(rng: random.Random, index: int) -> Dict[str, Any]:
+    permissions = []
+    for _ in range(rng.randint(1, 4)):
+        port = rng.choice(EXPOSED_PORTS)
+        cidr = "0.0.0.0/0" if rng.random() < 0.2 else f"10.{rng.randint(0, 255)}.0.0/16"
+        permissions.append({"IpProtocol": "tcp", "FromPort": port, "ToPort": port, "IpRanges": [{"CidrIp": cidr}]})
+    return {
+        "id": f"sg-{index:08x}",
+        "type": "security_group",
+        "name": f"sg-{index}",
+        "description": "synthetic",
+        "ip_permissions": permissions,
+    }
+
+
+def _instance(rng: random.Random, index: int) -> Dict[str, Any]:
+    return {
+        "id": f"i-{index:012x}",
+        "type": "instance",
+        "state": "running",
+        "public_ip": f"54.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}" if rng.random() < 0.3 else None,
+        "security_groups": [{"GroupId": f"sg-{rng.randint(0, 10_000):08x}"}],
+        "iam_instance_profile": {"Arn": "arn:aws:iam::123456789012:instance-profile/app"} if rng.random() < 0.7 else None,
+        "metadata_options": {"HttpTokens": "required" if rng.random() < 0.6 else "optional"},
+        "age_days": rng.randint(0, 900),
+        "termination_protection": rng.random() < 0.5,
+    }
+
+
+def _volume(rng: random.Random, index: int) -> Dict[str, Any]:
+    return {
+        "id": f"vol-{index:012x}",
+        "type": "ebs_volume",
+        "encrypted": rng.random() < 0.8,
+        "kms_key_id": None,
+        "attachments": [{"InstanceId": f"i-{rng.randint(0, 10_000):012x}"}],
+    }
+
+
+def _snapshot(rng: random.Random, index: int) -> Dict[str, Any]:
+    return {
+        "id": f"snap-{index:012x}",
+        "type": "snapshot",
+        "volume_id": f"vol-{rng.randint(0, 10_000):012x}",
+        "shared_accounts": ["all"] if rng.random() < 0.05 else [],
+    }
+
+
+def _cluster(rng: random.Random, index: int) -> Dict[str, Any]:
+    minor = rng.randint(24, 29)
+    return {
+        "id": f"arn:aws:eks:us-east-1:123456789012:cluster/c{index}",
+        "type": "eks_cluster",
+        "name": f"c{index}",
+        "version": f"1.{minor}",
+        "endpoint_public_access": rng.random() < 0.5,
+        "public_access_cidrs": [] if rng.random() < 0.5 else ["10.0.0.0/8"],
+        "logging": {"clusterLogging": [{"enabled": True, "types": rng.sample(["api", "audit", "authenticator"], 2)}]},
+        "nodegroups": [{"name": f"ng{n}", "version": f"1.{minor - rng.randint(0, 3)}"} for n in range(rng.randint(1, 3))],
+        "tags": {"irsa": "true"} if rng.random() < 0.5 else {},
+    }
+
+
+def _bucket(rng: random.Random, index: int) -> Dict[str, Any]:
+    return {"id": f"bucket-{index}", "type": "s3_bucket", "name": f"bucket-{index}", "encryption_enabled": rng.random() < 0.7}
+
+
+GENERATORS: Dict[str, List[Callable[[random.Random, int], Dict[str, Any]]]] = {
+    "ec2": [_security_group, _instance, _volume, _snapshot],
+    "eks": [_cluster],
+    "common": [_bucket],
+}
+
+
+def synthetic_inventory(service: str, count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(f"{service}:{count}:{seed}")
+    generators = GENERATORS[service]
+    resources = []
+    for index in range(count):
+        resource = generators[index % len(generators)](rng, index)
+        resource["region"] = REGIONS[index % len(REGIONS)]
+        resources.append(resource)
+    return resources
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SECTION_PATTERN = re.compile(r"^### (F\d+)$", re.MULTILINE)
+
+
+def create_app(overloaded_requests: int = 0, token_delay: float = 0.0) -> FastAPI:
+    app = FastAPI(title="fake llama.cpp server")
+    app.state.remaining_overloads = overloaded_requests
+    app.state.completions = 0
+    app.state.active = 0
+    app.state.peak_active = 0
+
+    def answer(prompt: str) -> list[str]:
+        labels = SECTION_PATTERN.findall(prompt)
+        if not labels:
+            return ["Why ", "it ", "matters"]
+        tokens: list[str] = []
+        for label in labels:
+            tokens.extend([f"### {label}\n", "Enable ", "the ", "control.\n"])
+        return tokens
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok"}
+
+    @app.post("/tokenize")
+    async def tokenize(request: Request) -> dict:
+        body = await request.json()
+        return {"tokens": list(range(len(body.get("content", "").split())))}
+
+    @app.post("/completion")
+    async def completion(request: Request):
+        if app.state.remaining_overloads > 0:
+            app.state.remaining_overloads -= 1
+            return JSONResponse(status_code=503, content={"error": "no slot available"})
+        app.state.completions += 1
+        body = await request.json()
+        tokens = answer(body["prompt"])[: body.get("n_predict", 512)]
+        if not body.get("stream"):
+            return {"content": "".join(tokens), "stop": True}
+
+        async def events():
+            app.state.active += 1
+            app.state.peak_active = max(app.state.peak_active, app.state.active)
+            try:
+                for token in tokens:
+                    if token_delay:
+                        await asyncio.sleep(token_delay)
+                    yield f"data: {json.dumps({'content': token, 'stop': False})}\n\n"
+                yield f"data: {json.dumps({'content': '', 'stop': True})}\n\n"
+            finally:
+                app.state.active -= 1
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake llama.cpp server for local benchmarks")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    args = parser.parse_args()
+    uvicorn.run(create_app(token_delay=args.token_delay), host="127.0.0.1", port=args.port)
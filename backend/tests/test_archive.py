@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pyarrow as pa
+from sqlalchemy import create_engine, delete, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import get_settings
+from app.models.base import Base
+from app.models.scan import AdviceStatusEnum, EvidenceBlob, Finding, ScanRun, ScanStatusEnum
+from app.services import archive as archive_module
+from app.services.archive import ScanArchive, archive_completed_scans, archive_scan, prune_orphan_evidence
+from app.services.scan_orchestrator import ScanOrchestrator
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _scan(db, status=ScanStatusEnum.completed.value, created_at=None, advice=AdviceStatusEnum.skipped.value):
+    scan = ScanRun(status=status, region_scope=["us-east-1"], created_at=created_at or datetime.utcnow())
+    db.add(scan)
+    db.flush()
+    for index, (service, severity) in enumerate([("ec2", "HIGH"), ("ec2", "LOW"), ("s3", "HIGH")]):
+        db.add(
+            Finding(
+                scan_id=scan.id,
+                service=service,
+                rule_id=f"{service}-rule-{index}",
+                severity=severity,
+                status="FAIL",
+                evidence={"resource_id": f"r-{index}", "nested": {"ports": [22]}},
+                region="us-east-1",
+                resource_hash=f"hash-{index}",
+                advice_status=advice,
+            )
+        )
+    db.commit()
+    return scan.id
+
+
+def _read(db, scan_id):
+    orchestrator = ScanOrchestrator(db=db)
+
+    async def run():
+        return (
+            await orchestrator.get_summary(scan_id),
+            await orchestrator.list_findings(scan_id, severity="HIGH"),
+            await orchestrator.export_scan(scan_id, format="json"),
+        )
+
+    return asyncio.run(run())
+
+
+def test_archive_scan_trims_rows_and_reads_transparently(tmp_path):
+    db = _session()
+    scan_id = _scan(db)
+    summary, findings, export = _read(db, scan_id)
+
+    path = archive_scan(db, scan_id, ScanArchive(str(tmp_path)))
+
+    assert path == str(tmp_path / f"{scan_id}.arrow")
+    assert db.scalar(select(func.count(Finding.id)).where(Finding.scan_id == scan_id)) == 0
+    assert db.get(ScanRun, scan_id).archived_at is not None
+    archived_summary, archived_findings, archived_export = _read(db, scan_id)
+    assert archived_summary["archived"] is True
+    assert {k: v for k, v in archived_summary.items() if k != "archived"} == {
+        k: v for k, v in summary.items() if k != "archived"
+    }
+    assert sorted(f["id"] for f in archived_findings) == sorted(f["id"] for f in findings)
+    assert archived_export["findings"] == export["findings"]
+
+
+def test_archive_file_uses_dictionary_columns(tmp_path):
+    db = _session()
+    scan_id = _scan(db)
+    path = archive_scan(db, scan_id, ScanArchive(str(tmp_path)))
+    table = ScanArchive(str(tmp_path)).load(path)
+    assert pa.types.is_dictionary(table.schema.field("rule_id").type)
+    assert pa.types.is_dictionary(table.schema.field("severity").type)
+    assert table.num_rows == 3
+
+
+def test_archive_skips_running_and_pending_advice_scans(tmp_path):
+    db = _session()
+    running = _scan(db, status=ScanStatusEnum.running.value)
+    pending = _scan(db, advice=AdviceStatusEnum.pending.value)
+    archive = ScanArchive(str(tmp_path))
+    assert archive_scan(db, running, archive) is None
+    assert archive_scan(db, pending, archive) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stale_pending_advice_does_not_block_archiving(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "scan_archive_pending_advice_hours", 1)
+    db = _session()
+    scan_id = _scan(db, advice=AdviceStatusEnum.pending.value)
+    db.query(Finding).update({Finding.created_at: datetime.utcnow() - timedelta(hours=2)})
+    db.commit()
+
+    path = archive_scan(db, scan_id, ScanArchive(str(tmp_path)))
+
+    assert path is not None
+    assert set(ScanArchive(str(tmp_path)).load(path)["advice_status"].to_pylist()) == {AdviceStatusEnum.failed.value}
+
+
+def test_archive_keeps_callers_objects_attached(tmp_path):
+    db = _session()
+    kept = db.get(ScanRun, _scan(db))
+    scan_id = _scan(db)
+    archive = ScanArchive(str(tmp_path))
+    archive_scan(db, scan_id, archive)
+    assert kept in db
+    assert db.get(ScanRun, scan_id).archive_path
+
+
+def test_archive_reads_every_record_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_module, "ARCHIVE_BATCH_ROWS", 2)
+    db = _session()
+    scan_id = _scan(db)
+    archive = ScanArchive(str(tmp_path))
+    path = archive_scan(db, scan_id, archive)
+    assert len(list(archive.batches(path))) == 2
+    assert archive.summary(path)["severityTotals"] == {"HIGH": 2, "LOW": 1}
+    assert len(archive.findings(path, severity="HIGH")) == 2
+
+
+def test_archive_write_streams_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_module, "ARCHIVE_BATCH_ROWS", 2)
+    archive = ScanArchive(str(tmp_path))
+    tmp_file = archive.path_for("scan").with_suffix(".tmp")
+    flushed = []
+
+    def findings():
+        for index, severity in enumerate(["LOW", "LOW", "HIGH", "CRITICAL", "LOW"]):
+            flushed.append(tmp_file.stat().st_size)
+            yield Finding(service="ec2", rule_id=f"rule-{index}", severity=severity, status="FAIL", evidence={})
+
+    path = archive.write("scan", findings())
+    assert flushed[2] > flushed[0]
+    assert len(list(archive.batches(path))) == 3
+    assert archive.load(path)["severity"].to_pylist() == ["LOW", "LOW", "HIGH", "CRITICAL", "LOW"]
+    assert not tmp_file.exists()
+
+
+def test_archive_completed_scans_respects_age(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_module, "ScanArchive", lambda: ScanArchive(str(tmp_path)))
+    db = _session()
+    old = _scan(db, created_at=datetime.utcnow() - timedelta(days=45))
+    recent = _scan(db)
+    assert archive_completed_scans(db, older_than_days=30) == 1
+    assert db.get(ScanRun, old).archive_path
+    assert db.get(ScanRun, recent).archive_path is None
+
+
+def test_archive_prunes_orphaned_evidence(tmp_path):
+    db = _session()
+    old = datetime.utcnow() - timedelta(days=45)
+    archived = _scan(db, created_at=old)
+    kept = _scan(db)
+    db.query(EvidenceBlob).update({EvidenceBlob.created_at: old})
+    db.commit()
+
+    archive_scan(db, archived, ScanArchive(str(tmp_path)))
+    assert prune_orphan_evidence(db, older_than=datetime.utcnow()) == 0
+
+    db.execute(delete(Finding).where(Finding.scan_id == kept))
+    db.commit()
+    assert prune_orphan_evidence(db, older_than=datetime.utcnow()) == 3
+    assert db.scalar(select(func.count()).select_from(EvidenceBlob)) == 0
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import async_database_url
+from app.models.base import Base
+from app.models.scan import Finding, ScanRegion, ScanRun, ScanStatusEnum
+from app.services.scan_orchestrator import ScanOrchestrator
+
+
+def test_async_database_url_swaps_driver():
+    assert async_database_url("sqlite://") == "sqlite+aiosqlite://"
+    assert async_database_url("postgresql://u:p@db/app") == "postgresql+psycopg://u:p@db/app"
+    assert async_database_url("postgresql+psycopg://u:p@db/app") == "postgresql+psycopg://u:p@db/app"
+
+
+def _seed(path) -> uuid.UUID:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        scan = ScanRun(status=ScanStatusEnum.completed.value, region_scope=["us-east-1", "us-west-2"])
+        db.add(scan)
+        db.flush()
+        for region in ("us-west-2", "us-east-1"):
+            db.add(
+                ScanRegion(
+                    scan_id=scan.id,
+                    region=region,
+                    status=ScanStatusEnum.completed.value,
+                    finished_at=datetime.utcnow(),
+                    rule_stats={
+                        "ec2-rule-0": {"service": "ec2", "runs": 1, "seconds": 0.1, "maxSeconds": 0.1, "resources": 2}
+                    },
+                )
+            )
+        for index, (service, severity) in enumerate([("ec2", "HIGH"), ("ec2", "LOW"), ("s3", "HIGH")]):
+            db.add(
+                Finding(
+                    scan_id=scan.id,
+                    service=service,
+                    rule_id=f"{service}-rule-{index}",
+                    severity=severity,
+                    status="FAIL",
+                    evidence={"resource_id": f"r-{index}"},
+                    region="us-east-1",
+                )
+            )
+        db.commit()
+        scan_id = scan.id
+    engine.dispose()
+    return scan_id
+
+
+def test_async_reads_match_sync_reads(tmp_path):
+    path = tmp_path / "scans.db"
+    scan_id = _seed(path)
+    sync_engine = create_engine(f"sqlite:///{path}")
+
+    async def read(orchestrator: ScanOrchestrator):
+        return (
+            await orchestrator.get_status(scan_id),
+            await orchestrator.get_summary(scan_id),
+            await orchestrator.list_findings(scan_id, service="ec2"),
+            await orchestrator.export_scan(scan_id, format="json"),
+        )
+
+    async def read_async():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        try:
+            async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as db:
+                return await read(ScanOrchestrator(async_db=db))
+        finally:
+            await engine.dispose()
+
+    with sessionmaker(bind=sync_engine)() as db:
+        sync_result = asyncio.run(read(ScanOrchestrator(db=db)))
+    async_result = asyncio.run(read_async())
+
+    status, summary, findings, export = async_result
+    assert [r.region for r in status.regions] == ["us-east-1", "us-west-2"]
+    assert summary["severityTotals"] == {"HIGH": 2, "LOW": 1}
+    assert summary["serviceTotals"] == {"ec2": 2, "s3": 1}
+    assert summary["totalFindings"] == 3
+    assert sorted(f["ruleId"] for f in findings) == ["ec2-rule-0", "ec2-rule-1"]
+    assert len(export["findings"]) == 3
+    assert export["rule_stats"]["ec2-rule-0"]["runs"] == 2
+    assert export["rule_stats"]["ec2-rule-0"]["resources"] == 4
+    assert sync_result[0] == status
+    assert sync_result[1] == summary
+    assert sorted(f["id"] for f in sync_result[2]) == sorted(f["id"] for f in findings)
+
+
+def test_rule_stats_aggregate_recent_regions(tmp_path):
+    path = tmp_path / "scans.db"
+    _seed(path)
+
+    async def read(since):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        try:
+            async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as db:
+                return await ScanOrchestrator(async_db=db).rule_stats(since)
+        finally:
+            await engine.dispose()
+
+    recent = asyncio.run(read(datetime.utcnow() - timedelta(days=1)))
+    assert recent["ec2-rule-0"]["runs"] == 2
+    assert recent["ec2-rule-0"]["seconds"] == 0.2
+    assert asyncio.run(read(datetime.utcnow() + timedelta(days=1))) == {}
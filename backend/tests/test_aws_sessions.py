@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+from app.core.credentials import EphemeralCredential
+from app.services.aws_sessions import AssumedSessionCache
+
+
+class FakeSTSClient:
+    def __init__(self, lifetime: timedelta):
+        self.lifetime = lifetime
+        self.calls = []
+
+    def assume_role(self, **params):
+        self.calls.append(params)
+        return {
+            "Credentials": {
+                "AccessKeyId": f"ASIA{len(self.calls)}",
+                "SecretAccessKey": "secret",
+                "SessionToken": "token",
+                "Expiration": datetime.now(timezone.utc) + self.lifetime,
+            }
+        }
+
+
+def _credential(role_arn="arn:aws:iam::111111111111:role/audit"):
+    return EphemeralCredential(
+        access_key_id="AKIAHUB",
+        secret_access_key="hub-secret",
+        role_arn=role_arn,
+        external_id="ext-123",
+    )
+
+
+def test_assumed_sessions_are_cached_per_role():
+    sts = FakeSTSClient(timedelta(hours=1))
+    cache = AssumedSessionCache(sts_client_factory=lambda base: sts)
+
+    first = cache.session_for(_credential())
+    second = cache.session_for(_credential())
+    other = cache.session_for(_credential("arn:aws:iam::222222222222:role/audit"))
+
+    assert first is second
+    assert other is not first
+    assert len(sts.calls) == 2
+    assert sts.calls[0]["ExternalId"] == "ext-123"
+    assert first.get_credentials().get_frozen_credentials().access_key == "ASIA1"
+
+
+def test_assumed_session_refreshes_before_expiry():
+    sts = FakeSTSClient(timedelta(minutes=5))
+    cache = AssumedSessionCache(sts_client_factory=lambda base: sts)
+
+    session = cache.session_for(_credential())
+    frozen = session.get_credentials().get_frozen_credentials()
+
+    assert frozen.access_key == "ASIA2"
+    assert len(sts.calls) == 2
+
+
+def test_plain_credentials_skip_assume_role():
+    sts = FakeSTSClient(timedelta(hours=1))
+    cache = AssumedSessionCache(sts_client_factory=lambda base: sts)
+
+    session = cache.session_for(_credential(role_arn=None))
+
+    assert session.get_credentials().access_key == "AKIAHUB"
+    assert sts.calls == []
+
+
+class BlockingSTSClient(FakeSTSClient):
+    def __init__(self, release: threading.Event):
+        super().__init__(timedelta(hours=1))
+        self.release = release
+
+    def assume_role(self, **params):
+        if params["RoleArn"].startswith("arn:aws:iam::111111111111"):
+            self.release.wait(5)
+        return super().assume_role(**params)
+
+
+def test_concurrent_callers_share_one_assume_and_do_not_block_other_roles():
+    release = threading.Event()
+    sts = BlockingSTSClient(release)
+    cache = AssumedSessionCache(sts_client_factory=lambda base: sts)
+    sessions = []
+    workers = [threading.Thread(target=lambda: sessions.append(cache.session_for(_credential()))) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+
+    other = cache.session_for(_credential("arn:aws:iam::222222222222:role/audit"))
+    assert [call["RoleArn"] for call in sts.calls] == ["arn:aws:iam::222222222222:role/audit"]
+
+    release.set()
+    for worker in workers:
+        worker.join(5)
+    assert len(sts.calls) == 2
+    assert len({id(session) for session in sessions}) == 1
+    assert sessions[0] is not other
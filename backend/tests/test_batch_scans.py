@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import get_settings
+from app.models.base import Base
+from app.models.scan import ScanBatch, ScanRegion, ScanRun, ScanStatusEnum
+from app.services import scan_orchestrator, tasks
+from app.services.schemas import BatchScanRequest
+
+
+def _session_factory(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(scan_orchestrator, "SessionLocal", factory)
+    return factory
+
+
+def _batch(db, statuses, batch_status=ScanStatusEnum.running.value):
+    batch = ScanBatch(id=uuid.uuid4(), status=batch_status)
+    db.add(batch)
+    scans = []
+    for scan_status, region_statuses in statuses:
+        scan = ScanRun(id=uuid.uuid4(), status=scan_status, region_scope=["all"], batch_id=batch.id)
+        db.add(scan)
+        for index, region_status in enumerate(region_statuses):
+            db.add(ScanRegion(id=uuid.uuid4(), scan_id=scan.id, region=f"region-{index}", status=region_status))
+        scans.append(scan.id)
+    db.commit()
+    return batch.id, scans
+
+
+def test_start_batch_creates_scans_keyed_by_member_account(monkeypatch):
+    db = _session_factory(monkeypatch)()
+    enqueued = []
+
+    async def fake_validate(self, request):
+        if request.role_arn.endswith("broken"):
+            raise RuntimeError("AccessDenied")
+        # Identity of the hub account, as returned when members are validated with hub credentials.
+        return {"Account": "999999999999"}, {"sts:GetCallerIdentity": True}
+
+    async def fake_enqueue(batch_id, entries):
+        enqueued.append((batch_id, entries))
+
+    monkeypatch.setattr(scan_orchestrator.ScanOrchestrator, "_validate_credentials", fake_validate)
+    monkeypatch.setattr(scan_orchestrator.ScanOrchestrator, "_spawn_permission_probes", lambda self, scan_id, request: None)
+    monkeypatch.setattr(scan_orchestrator, "enqueue_batch", fake_enqueue)
+    request = BatchScanRequest(
+        hub={"accessKeyId": "AKIA", "secretAccessKey": "secret"},
+        roleArns=[
+            "arn:aws:iam::111111111111:role/audit",
+            "arn:aws:iam::222222222222:role/broken",
+            "arn:aws:iam::333333333333:role/audit",
+        ],
+        regionScope=["us-east-1"],
+    )
+
+    result = asyncio.run(scan_orchestrator.ScanOrchestrator(db=db).start_batch(request))
+
+    assert result["rejected"] == [1]
+    batch = db.get(ScanBatch, uuid.UUID(result["batchId"]))
+    assert batch.status == ScanStatusEnum.pending.value
+    assert sorted(str(scan.id) for scan in batch.scans) == sorted(result["scanIds"])
+    [(batch_id, entries)] = enqueued
+    assert batch_id == batch.id
+    assert [entry["account"] for entry in entries] == ["111111111111", "333333333333"]
+
+
+def test_batch_is_enqueued_as_one_task(monkeypatch):
+    sent = []
+    monkeypatch.setattr(tasks.run_batch_task, "delay", lambda batch_id, entries: sent.append(entries))
+    entries = [
+        {"scan_id": str(uuid.uuid4()), "credential_key": f"key-{index}", "region_scope": None, "account": account}
+        for index, account in enumerate(["a", "b", "a", "c"])
+    ]
+    asyncio.run(tasks.enqueue_batch(uuid.uuid4(), entries))
+    assert sent == [entries]
+
+
+def test_execute_batch_interleaves_accounts_and_aggregates_status(monkeypatch):
+    factory = _session_factory(monkeypatch)
+    with factory() as db:
+        pending = (ScanStatusEnum.pending.value, [])
+        batch_id, (first, second, other) = _batch(db, [pending] * 3, ScanStatusEnum.pending.value)
+    entries = [
+        {"scan_id": str(first), "credential_key": "k1", "region_scope": ["r1", "r2"], "account": "early"},
+        {"scan_id": str(second), "credential_key": "k2", "region_scope": ["r3"], "account": "early"},
+    ]
+    late = [{"scan_id": str(other), "credential_key": "k3", "region_scope": ["r1"], "account": "late"}]
+    started = []
+    statuses = {}
+
+    async def fake_region_scan(scan_id, session, region, registry, rule_engine):
+        started.append((scan_id, region))
+        with factory() as db:
+            statuses[db.get(ScanBatch, batch_id).status] = True
+            if scan_id != second:
+                db.get(ScanRun, scan_id).status = ScanStatusEnum.completed.value
+                db.commit()
+
+    monkeypatch.setattr(get_settings(), "batch_global_concurrency", 1)
+    monkeypatch.setattr(get_settings(), "batch_per_account_concurrency", 1)
+    monkeypatch.setattr(scan_orchestrator.credentials.vault, "consume", lambda key: key)
+    monkeypatch.setattr(scan_orchestrator.credentials.vault, "revoke_many", lambda keys: list(keys))
+    monkeypatch.setattr(scan_orchestrator.assumed_sessions, "session_for", lambda cred: cred)
+    monkeypatch.setattr(scan_orchestrator, "_resolve_regions", lambda session, scope: scope)
+    monkeypatch.setattr(scan_orchestrator, "CollectorRegistry", lambda session: None)
+    monkeypatch.setattr(scan_orchestrator, "_run_region_scan", fake_region_scan)
+
+    asyncio.run(scan_orchestrator.execute_batch(batch_id, entries + late))
+    assert started == [(first, "r1"), (other, "r1"), (first, "r2"), (second, "r3")]
+    assert statuses == {ScanStatusEnum.running.value: True}
+
+    status = asyncio.run(scan_orchestrator.ScanOrchestrator(db=factory()).get_batch_status(batch_id))
+    assert status.status == ScanStatusEnum.partial.value
+    assert status.scans == {ScanStatusEnum.completed.value: 2, ScanStatusEnum.failed.value: 1}
+
+
+def test_batch_waits_for_every_account_before_finalizing(monkeypatch):
+    factory = _session_factory(monkeypatch)
+    with factory() as db:
+        batch_id, (done, in_flight) = _batch(
+            db,
+            [
+                (ScanStatusEnum.completed.value, [ScanStatusEnum.completed.value, ScanStatusEnum.completed.value]),
+                (ScanStatusEnum.running.value, [ScanStatusEnum.failed.value, ScanStatusEnum.running.value]),
+            ],
+        )
+
+    scan_orchestrator._finalize_batch(batch_id, [done])
+    status = asyncio.run(scan_orchestrator.ScanOrchestrator(db=factory()).get_batch_status(batch_id))
+    assert status.status == ScanStatusEnum.running.value
+    assert (status.regions_total, status.regions_done, status.progress) == (4, 3, 0.75)
+
+    scan_orchestrator._finalize_batch(batch_id, [in_flight])
+    status = asyncio.run(scan_orchestrator.ScanOrchestrator(db=factory()).get_batch_status(batch_id))
+    assert status.status == ScanStatusEnum.partial.value
+    assert status.scans == {ScanStatusEnum.completed.value: 1, ScanStatusEnum.failed.value: 1}
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.scan import ScanRun, ScanStatusEnum
+from app.services import coalescing, scan_orchestrator
+from app.services.coalescing import ScanCoalescer, coalesce_key
+from app.services.schemas import ScanRequest
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value.encode()
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+def test_coalesce_key_ignores_region_order():
+    assert coalesce_key("123", ["us-west-2", "us-east-1"], "v1") == coalesce_key("123", ["us-east-1", "us-west-2"], "v1")
+    assert coalesce_key("123", None, "v1") != coalesce_key("123", None, "v2")
+    assert coalesce_key("123", None, "v1") != coalesce_key("456", None, "v1")
+
+
+def test_coalescer_returns_in_flight_scan():
+    coalescer = ScanCoalescer(client=FakeRedis(), window_seconds=60)
+    first, second = uuid.uuid4(), uuid.uuid4()
+    assert coalescer.claim("key", first) is None
+    assert coalescer.claim("key", second) == first
+    coalescer.release("key", first)
+    assert coalescer.claim("key", second) is None
+
+
+def test_coalescer_memory_window_expires(monkeypatch):
+    monkeypatch.setattr(coalescing, "get_redis", lambda: None)
+    coalescer = ScanCoalescer(client=None, window_seconds=60)
+    first, second = uuid.uuid4(), uuid.uuid4()
+    assert coalescer.claim("key", first) is None
+    assert coalescer.claim("key", second) == first
+    coalescer._memory["key"] = (first, 0.0)
+    assert coalescer.claim("key", second) is None
+
+
+def _orchestrator(monkeypatch, coalescer=None):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    enqueued = []
+
+    async def fake_enqueue(scan_id, credential_key, region_scope):
+        enqueued.append(scan_id)
+
+    async def fake_validate(self, request):
+        return {"Account": "123456789012"}, {"sts:GetCallerIdentity": True}
+
+    monkeypatch.setattr(scan_orchestrator, "enqueue_scan", fake_enqueue)
+    if coalescer is not None:
+        monkeypatch.setattr(scan_orchestrator, "get_scan_coalescer", lambda: coalescer)
+    monkeypatch.setattr(scan_orchestrator.ScanOrchestrator, "_validate_credentials", fake_validate)
+    monkeypatch.setattr(scan_orchestrator.ScanOrchestrator, "_spawn_permission_probes", lambda self, scan_id, request: None)
+    return db, enqueued
+
+
+REQUEST = ScanRequest(accessKeyId="AKIA", secretAccessKey="secret", regionScope=["us-east-1"])
+
+
+def test_start_scan_attaches_to_in_flight_scan(monkeypatch):
+    db, enqueued = _orchestrator(monkeypatch, ScanCoalescer(client=FakeRedis(), window_seconds=60))
+    orchestrator = scan_orchestrator.ScanOrchestrator(db=db)
+
+    first = asyncio.run(orchestrator.start_scan(REQUEST))
+    second = asyncio.run(orchestrator.start_scan(REQUEST))
+    assert first == second
+    assert enqueued == [first]
+
+    db.get(ScanRun, first).status = ScanStatusEnum.failed.value
+    db.commit()
+    third = asyncio.run(orchestrator.start_scan(REQUEST))
+    assert third != first
+    assert enqueued == [first, third]
+
+
+def test_memory_fallback_is_shared_across_requests(monkeypatch):
+    monkeypatch.setattr(coalescing, "get_redis", lambda: None)
+    coalescing.get_scan_coalescer.cache_clear()
+    try:
+        db, enqueued = _orchestrator(monkeypatch)
+        first = asyncio.run(scan_orchestrator.ScanOrchestrator(db=db).start_scan(REQUEST))
+        second = asyncio.run(scan_orchestrator.ScanOrchestrator(db=db).start_scan(REQUEST))
+    finally:
+        coalescing.get_scan_coalescer.cache_clear()
+    assert first == second
+    assert enqueued == [first]
+
+
+def test_uncommitted_claim_is_treated_as_in_flight(monkeypatch):
+    coalescer = ScanCoalescer(client=FakeRedis(), window_seconds=60)
+    db, enqueued = _orchestrator(monkeypatch, coalescer)
+    in_flight = uuid.uuid4()
+    key = coalesce_key("123456789012", REQUEST.region_scope, scan_orchestrator.PolicyEngine().catalog_version())
+    assert coalescer.claim(key, in_flight) is None
+
+    assert asyncio.run(scan_orchestrator.ScanOrchestrator(db=db).start_scan(REQUEST)) == in_flight
+    assert enqueued == []
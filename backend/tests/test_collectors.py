@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 
 from app.services.aws_collectors.ec2.security_groups import SecurityGroupCollector
+from app.services.resources import CompactResource, ResourceCompactor
 
 
 class FakeEC2Client:
@@ -31,3 +32,11 @@ def test_security_group_collector_returns_results():
     results = asyncio.run(collector.collect())
     assert len(results) == 1
     assert results[0].configuration["id"] == "sg-123"
+
+
+def test_collector_compacts_each_result_as_it_is_built():
+    collector = SecurityGroupCollector(FakeSession(), "us-east-1")
+    collector.compactor = ResourceCompactor(["id", "type"])
+    results = asyncio.run(collector.collect())
+    assert isinstance(results[0].configuration, CompactResource)
+    assert results[0].configuration.to_dict() == {"id": "sg-123", "type": "security_group"}
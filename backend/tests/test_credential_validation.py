@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+
+from botocore.exceptions import ClientError
+
+from app.services import scan_orchestrator, validation_cache
+from app.services.schemas import ScanRequest
+from app.services.validation_cache import ValidationCache, get_validation_cache, validation_cache_key
+
+
+class FakeClient:
+    def __init__(self, service, region, calls):
+        self.service = service
+        self.region = region
+        self.calls = calls
+
+    def describe_security_groups(self, **kwargs):
+        self.calls.append(("ec2", self.region))
+        return {}
+
+    def list_clusters(self, **kwargs):
+        self.calls.append(("eks", self.region))
+        raise ClientError({"Error": {"Code": "AccessDenied", "Message": "denied"}}, "ListClusters")
+
+    def list_buckets(self, **kwargs):
+        self.calls.append(("s3", self.region))
+        return {}
+
+
+class FakeSession:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def client(self, service, region_name=None):
+        return FakeClient(service, region_name, self.calls)
+
+
+class FakeSessionCache:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def session_for(self, cred):
+        return FakeSession(self.calls)
+
+
+def _request(**overrides):
+    values = {"accessKeyId": "AKIA", "secretAccessKey": "secret", "regionScope": ["eu-west-1"]}
+    values.update(overrides)
+    return ScanRequest(**values)
+
+
+def test_validation_cache_key_depends_on_secret_and_role():
+    base = validation_cache_key("AKIA", "secret")
+    assert base == validation_cache_key("AKIA", "secret")
+    assert base != validation_cache_key("AKIA", "other")
+    assert base != validation_cache_key("AKIA", "secret", role_arn="arn:aws:iam::1:role/x")
+
+
+def test_validation_cache_merges_fields():
+    cache = ValidationCache(client=None, ttl_seconds=60)
+    cache._redis = lambda: None
+    cache.update("key", identity={"Account": "1"})
+    cache.update("key", permissions={"s3:ListAllMyBuckets": True})
+    assert cache.get("key") == {"identity": {"Account": "1"}, "permissions": {"s3:ListAllMyBuckets": True}}
+
+
+def test_probes_run_in_requested_region(monkeypatch):
+    calls = []
+    monkeypatch.setattr(scan_orchestrator, "assumed_sessions", FakeSessionCache(calls))
+
+    permissions = asyncio.run(scan_orchestrator._probe_permissions(_request()))
+
+    assert permissions == {
+        "ec2:DescribeSecurityGroups": True,
+        "eks:ListClusters": False,
+        "s3:ListAllMyBuckets": True,
+    }
+    assert ("ec2", "eu-west-1") in calls and ("eks", "eu-west-1") in calls
+
+
+def test_cached_identity_skips_sts(monkeypatch):
+    cache = ValidationCache(client=None, ttl_seconds=60)
+    cache._redis = lambda: None
+    request = _request()
+    cache.update(
+        validation_cache_key(request.access_key_id, request.secret_access_key),
+        identity={"Account": "123456789012"},
+        permissions={"s3:ListAllMyBuckets": True},
+    )
+    monkeypatch.setattr(scan_orchestrator, "get_validation_cache", lambda: cache)
+
+    def fail(self, request):
+        raise AssertionError("STS should not be called on a cache hit")
+
+    monkeypatch.setattr(scan_orchestrator.ScanOrchestrator, "_validate_identity", fail)
+
+    identity, permissions = asyncio.run(scan_orchestrator.ScanOrchestrator()._validate_credentials(request))
+    assert identity["Account"] == "123456789012"
+    assert permissions == {"sts:GetCallerIdentity": True, "s3:ListAllMyBuckets": True}
+
+
+def test_memory_fallback_is_shared_across_requests(monkeypatch):
+    monkeypatch.setattr(validation_cache, "get_redis", lambda: None)
+    get_validation_cache.cache_clear()
+    calls = []
+
+    def validate(self, request):
+        calls.append(request.access_key_id)
+        return {"Account": "123456789012"}
+
+    monkeypatch.setattr(scan_orchestrator.ScanOrchestrator, "_validate_identity", validate)
+    try:
+        for _ in range(2):
+            asyncio.run(scan_orchestrator.ScanOrchestrator()._validate_credentials(_request()))
+    finally:
+        get_validation_cache.cache_clear()
+    assert calls == ["AKIA"]
+
+
+def test_failed_permission_recording_is_logged(monkeypatch, caplog):
+    async def probes(request):
+        return {"s3:ListAllMyBuckets": True}
+
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(scan_orchestrator, "_probe_permissions", probes)
+    monkeypatch.setattr(scan_orchestrator, "get_validation_cache", lambda: ValidationCache(ttl_seconds=0))
+    monkeypatch.setattr(scan_orchestrator, "SessionLocal", broken_session)
+
+    async def spawn():
+        scan_orchestrator.ScanOrchestrator()._spawn_permission_probes(None, _request())
+        await asyncio.gather(*scan_orchestrator._background_tasks, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(spawn())
+    assert "Recording permission probes failed" in caplog.text
+    assert not scan_orchestrator._background_tasks
+
+
+def test_cache_and_database_calls_stay_off_the_event_loop(monkeypatch):
+    loop_threads = []
+    blocking_threads = []
+
+    class RecordingCache(ValidationCache):
+        def get(self, key):
+            blocking_threads.append(threading.get_ident())
+            return None
+
+        def update(self, key, **fields):
+            blocking_threads.append(threading.get_ident())
+
+    async def probes(request):
+        loop_threads.append(threading.get_ident())
+        return {"s3:ListAllMyBuckets": True}
+
+    def session():
+        blocking_threads.append(threading.get_ident())
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(scan_orchestrator, "get_validation_cache", lambda: RecordingCache(ttl_seconds=0))
+    monkeypatch.setattr(scan_orchestrator.ScanOrchestrator, "_validate_identity", lambda self, request: {"Account": "1"})
+    monkeypatch.setattr(scan_orchestrator, "_probe_permissions", probes)
+    monkeypatch.setattr(scan_orchestrator, "SessionLocal", session)
+
+    async def start():
+        await scan_orchestrator.ScanOrchestrator()._validate_credentials(_request())
+        scan_orchestrator.ScanOrchestrator()._spawn_permission_probes(None, _request())
+        await asyncio.gather(*scan_orchestrator._background_tasks, return_exceptions=True)
+
+    asyncio.run(start())
+    assert len(blocking_threads) == 4
+    assert loop_threads[0] not in blocking_threads
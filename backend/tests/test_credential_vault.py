@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import pytest
+import redis
+
+from app.core.cache import RedisConnection, RedisHealth
+from app.core.credentials import CredentialVault, EphemeralCredential, VaultUnavailableError
+
+
+class FakeRedis:
+    def __init__(self, reachable=True):
+        self.reachable = reachable
+        self.values = {}
+        self.commands = []
+
+    def ping(self):
+        self.commands.append("PING")
+        if not self.reachable:
+            raise redis.ConnectionError("connection refused")
+        return True
+
+    def set(self, key, value, ex=None):
+        self.commands.append("SET")
+        self.values[key] = (value.encode(), ex)
+        return True
+
+    def get(self, key):
+        self.commands.append("GET")
+        entry = self.values.get(key)
+        return entry[0] if entry else None
+
+    def getdel(self, key):
+        self.commands.append("GETDEL")
+        entry = self.values.pop(key, None)
+        return entry[0] if entry else None
+
+    def delete(self, *keys):
+        self.commands.append("DEL")
+        for key in keys:
+            self.values.pop(key, None)
+
+
+def _vault(fake, allow_memory=False, retry_seconds=30.0):
+    connection = RedisConnection("redis://fake", retry_seconds=retry_seconds, client=fake)
+    return CredentialVault(connection=connection, allow_memory=allow_memory)
+
+
+def _cred():
+    return EphemeralCredential(access_key_id="AKIA", secret_access_key="secret", role_arn="arn:aws:iam::1:role/r")
+
+
+def test_vault_is_lazy():
+    vault = CredentialVault()
+    assert vault._connection is None
+
+
+def test_store_is_single_command_with_ttl_and_consume_is_one_shot():
+    fake = FakeRedis()
+    vault = _vault(fake)
+    key = vault.store(_cred(), ttl=120)
+    assert fake.commands == ["PING", "SET"]
+    assert next(iter(fake.values.values()))[1] == 120
+
+    fake.commands.clear()
+    cred = vault.consume(key)
+    assert cred.access_key_id == "AKIA" and cred.role_arn == "arn:aws:iam::1:role/r"
+    assert fake.commands == ["GETDEL"]
+    assert vault.consume(key) is None
+    assert vault.retrieve(key) is None
+
+
+def test_revoke_many_uses_one_delete():
+    fake = FakeRedis()
+    vault = _vault(fake)
+    keys = [vault.store(_cred()) for _ in range(3)]
+    fake.commands.clear()
+    vault.revoke_many(keys)
+    assert fake.commands == ["DEL"]
+    assert fake.values == {}
+
+
+def test_unreachable_redis_raises_unless_memory_allowed():
+    vault = _vault(FakeRedis(reachable=False))
+    with pytest.raises(VaultUnavailableError):
+        vault.store(_cred())
+    assert vault.health()["state"] == RedisHealth.unavailable.value
+    assert vault.health()["backend"] == "unavailable"
+
+    memory_vault = _vault(FakeRedis(reachable=False), allow_memory=True)
+    key = memory_vault.store(_cred())
+    assert memory_vault.consume(key).secret_access_key == "secret"
+    assert memory_vault.consume(key) is None
+    assert memory_vault.health()["backend"] == "memory"
+
+
+def test_connection_rechecks_after_retry_interval():
+    fake = FakeRedis(reachable=False)
+    connection = RedisConnection("redis://fake", retry_seconds=0.0, client=fake)
+    assert connection.client() is None
+    assert connection.state == RedisHealth.unavailable
+    fake.reachable = True
+    assert connection.client() is fake
+    assert connection.state == RedisHealth.healthy
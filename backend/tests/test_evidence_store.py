@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.scan import EvidenceBlob, Finding, ScanRun, evidence_hash
+from app.services.archive import prune_orphan_evidence
+
+
+def _finding(scan_id, evidence):
+    return Finding(
+        scan_id=scan_id,
+        service="ec2",
+        rule_id="EC2_TERMINATION_PROTECTION",
+        severity="LOW",
+        status="FAIL",
+        evidence=evidence,
+        region="us-east-1",
+    )
+
+
+def test_evidence_hash_is_canonical():
+    assert evidence_hash({"a": 1, "b": [1, 2]}) == evidence_hash({"b": [1, 2], "a": 1})
+    assert evidence_hash({"a": 1}) != evidence_hash({"a": 2})
+
+
+def test_identical_evidence_is_stored_once_across_flushes():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        scan = ScanRun(status="COMPLETED", region_scope=[])
+        db.add(scan)
+        db.flush()
+        scan_id = scan.id
+        db.add_all([_finding(scan_id, {"termination_protection": False}) for _ in range(50)])
+        db.add(_finding(scan_id, {"termination_protection": True}))
+        db.commit()
+
+    with Session() as db:
+        db.add_all([_finding(scan_id, {"termination_protection": False}) for _ in range(10)])
+        db.commit()
+
+    with Session() as db:
+        assert db.scalar(select(func.count()).select_from(EvidenceBlob)) == 2
+        findings = db.scalars(select(Finding)).all()
+        assert len(findings) == 61
+        assert sum(1 for f in findings if f.evidence == {"termination_protection": False}) == 60
+
+
+def test_prune_skips_blobs_referenced_after_candidates_are_selected():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    scan = ScanRun(status="COMPLETED", region_scope=[])
+    db.add(scan)
+    db.add(EvidenceBlob(hash=evidence_hash({"port": 22}), content={"port": 22}))
+    db.add(EvidenceBlob(hash=evidence_hash({"port": 80}), content={"port": 80}))
+    db.commit()
+    scalars = db.scalars
+
+    def select_then_reference(statement, *args, **kwargs):
+        del db.scalars
+        candidates = scalars(statement, *args, **kwargs)
+        db.add(_finding(scan.id, {"port": 22}))
+        return candidates
+
+    db.scalars = select_then_reference
+    assert prune_orphan_evidence(db) == 1
+    assert db.scalars(select(EvidenceBlob.content)).all() == [{"port": 22}]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1]
+DEFERRED_MODULES = {
+    "boto3",
+    "botocore",
+    "celery",
+    "redis",
+    "pyarrow",
+    "httpx",
+    "llama_cpp",
+    "prometheus_client",
+    "opentelemetry",
+    "app.services.tasks",
+    "app.services.llm_service",
+    "app.llm",
+}
+
+
+def _import_times(module: str) -> dict[str, int]:
+    env = {**os.environ, "PYTHONPATH": str(BACKEND)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_api_import_defers_heavy_dependencies():
+    times = _import_times("app.main")
+    loaded = {
+        name for name in times if any(name == module or name.startswith(module + ".") for module in DEFERRED_MODULES)
+    }
+    assert not loaded, f"imported at startup: {sorted(loaded)}"
+
+
+@pytest.mark.skipif(not os.getenv("IMPORT_TIME_BUDGET_MS"), reason="set IMPORT_TIME_BUDGET_MS to check the budget")
+def test_api_import_time_budget():
+    # What remains is FastAPI and SQLAlchemy themselves (about 0.7-0.9s locally, so 1000 is a sensible budget).
+    budget_ms = int(os.environ["IMPORT_TIME_BUDGET_MS"])
+    # Best of three keeps a busy CI runner from failing an otherwise fast import.
+    best_us = min(_import_times("app.main")["app.main"] for _ in range(3))
+    assert best_us / 1000 < budget_ms
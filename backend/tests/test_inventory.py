@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.scan import InventorySnapshot
+from app.services.aws_collectors.common.global_services import GlobalServiceCollector
+from app.services.aws_collectors.ec2.instances import InstanceCollector
+from app.services.aws_collectors.registry import CollectorRegistry
+from app.services.inventory import InventoryCache, merge_inventory_stats
+
+
+class FakeS3Client:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.encrypted = set()
+        self.location_calls = 0
+        self.encryption_calls = 0
+
+    def list_buckets(self):
+        return {"Buckets": self.buckets}
+
+    def get_bucket_location(self, Bucket):
+        self.location_calls += 1
+        return {"LocationConstraint": "eu-west-1"}
+
+    def get_bucket_encryption(self, Bucket):
+        self.encryption_calls += 1
+        if Bucket not in self.encrypted:
+            raise RuntimeError("ServerSideEncryptionConfigurationNotFoundError")
+        return {"ServerSideEncryptionConfiguration": {"Rules": [{"ApplyServerSideEncryptionByDefault": {}}]}}
+
+
+class FakeEC2Client:
+    def __init__(self, instances):
+        self.instances = instances
+        self.attribute_calls = 0
+
+    def describe_instances(self):
+        return {"Reservations": [{"Instances": self.instances}]}
+
+    def describe_instance_attribute(self, InstanceId, Attribute):
+        self.attribute_calls += 1
+        return {"DisableApiTermination": {"Value": True}}
+
+
+class FakeSession:
+    def __init__(self, client):
+        self._client = client
+
+    def client(self, service_name, region_name=None):
+        return self._client
+
+
+def _bucket(name, created=datetime(2024, 1, 1, tzinfo=timezone.utc)):
+    return {"Name": name, "CreationDate": created}
+
+
+def _scan(db, client):
+    cache = InventoryCache.load(db, "123456789012", "GLOBAL")
+    collector = GlobalServiceCollector(FakeSession(client), "GLOBAL")
+    collector.cache = cache.for_collector("GlobalServiceCollector")
+    results = asyncio.run(collector.collect())
+    cache.save(db)
+    db.commit()
+    return results, cache.stats()["GlobalServiceCollector"]
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_unchanged_resources_skip_enrichment():
+    client = FakeS3Client([_bucket("logs"), _bucket("data")])
+    with _session()() as db:
+        results, stats = _scan(db, client)
+        assert client.location_calls == 2
+        assert stats["fullRefresh"] is True
+        assert stats["changed"] is True
+
+        cached, stats = _scan(db, client)
+        assert (client.location_calls, client.encryption_calls) == (2, 2)
+        assert [result.configuration["region"] for result in cached] == ["eu-west-1", "eu-west-1"]
+        assert (stats["hits"], stats["misses"], stats["hitRate"], stats["changed"]) == (2, 0, 1.0, False)
+
+        client.buckets = [_bucket("logs", created=datetime(2024, 6, 1, tzinfo=timezone.utc)), _bucket("new")]
+        _, stats = _scan(db, client)
+        assert (client.location_calls, client.encryption_calls) == (4, 4)
+        assert (stats["hits"], stats["misses"], stats["changed"]) == (0, 2, True)
+        snapshot = db.get(InventorySnapshot, ("123456789012", "GLOBAL", "GlobalServiceCollector"))
+        assert sorted(snapshot.entries) == ["logs", "new"]
+        assert snapshot.resource_count == 2
+
+
+def test_full_refresh_interval_forces_enrichment():
+    client = FakeS3Client([_bucket("logs")])
+    with _session()() as db:
+        _scan(db, client)
+        client.encrypted.add("logs")
+        results, _ = _scan(db, client)
+        assert results[0].configuration["encryption_enabled"] is False
+        snapshot = db.get(InventorySnapshot, ("123456789012", "GLOBAL", "GlobalServiceCollector"))
+        snapshot.refreshed_at = datetime.utcnow() - timedelta(hours=25)
+        db.commit()
+        results, stats = _scan(db, client)
+        assert stats["fullRefresh"] is True
+        assert results[0].configuration["encryption_enabled"] is True
+        assert client.location_calls == 2
+        _, stats = _scan(db, client)
+        assert stats["fullRefresh"] is False
+        assert client.location_calls == 2
+
+
+def test_instance_attributes_are_cached_until_the_instance_changes():
+    instance = {"InstanceId": "i-1", "State": {"Name": "running"}, "Tags": [{"Key": "env", "Value": "prod"}]}
+    client = FakeEC2Client([instance])
+    with _session()() as db:
+        for _ in range(2):
+            cache = InventoryCache.load(db, "123456789012", "us-east-1")
+            collector = InstanceCollector(FakeSession(client), "us-east-1")
+            collector.cache = cache.for_collector("InstanceCollector")
+            [result] = asyncio.run(collector.collect())
+            cache.save(db)
+            db.commit()
+        assert result.configuration["termination_protection"] is True
+        assert client.attribute_calls == 1
+        instance["State"] = {"Name": "stopped"}
+        asyncio.run(collector.collect())
+        assert client.attribute_calls == 2
+
+
+def test_only_enriching_collectors_use_the_inventory_cache():
+    collectors = CollectorRegistry(FakeSession(None)).get_collectors("GLOBAL")
+    for collector in collectors:
+        assert collector.uses_inventory_cache == ("self._enrich(" in inspect.getsource(type(collector)))
+    assert sorted(type(c).__name__ for c in collectors if c.uses_inventory_cache) == [
+        "EKSClusterCollector",
+        "GlobalServiceCollector",
+        "InstanceCollector",
+    ]
+
+
+def test_concurrent_scans_upsert_the_same_snapshot():
+    factory = _session()
+    client = FakeS3Client([_bucket("logs")])
+    with factory() as first, factory() as second:
+        caches = [InventoryCache.load(db, "123456789012", "GLOBAL") for db in (first, second)]
+        for db, cache in zip((first, second), caches):
+            collector = GlobalServiceCollector(FakeSession(client), "GLOBAL")
+            collector.cache = cache.for_collector("GlobalServiceCollector")
+            asyncio.run(collector.collect())
+            cache.save(db)
+            db.commit()
+    with factory() as db:
+        [snapshot] = db.query(InventorySnapshot).all()
+        assert sorted(snapshot.entries) == ["logs"]
+
+
+def test_inventory_stats_merge_across_regions():
+    totals = merge_inventory_stats({}, {"InstanceCollector": {"hits": 3, "misses": 1, "resources": 4, "changed": True}})
+    merge_inventory_stats(totals, {"InstanceCollector": {"hits": 0, "misses": 4, "resources": 4, "fullRefresh": True}})
+    assert totals["InstanceCollector"] == {
+        "hits": 3,
+        "misses": 5,
+        "resources": 8,
+        "fullRefresh": 1,
+        "changed": 1,
+        "hitRate": 0.375,
+    }
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.config import get_settings
+from app.llm.providers.llama_server import LlamaServerProvider, LLMOverloadedError
+from fake_llama_server import create_app
+
+
+def _provider(app, monkeypatch, **settings):
+    monkeypatch.setattr(get_settings(), "llm_server_backoff_seconds", 0.0)
+    for key, value in settings.items():
+        monkeypatch.setattr(get_settings(), key, value)
+    return LlamaServerProvider(endpoint="http://llm.test", transport=httpx.ASGITransport(app=app))
+
+
+def test_streams_completion_tokens(monkeypatch):
+    provider = _provider(create_app(), monkeypatch)
+
+    async def run():
+        tokens = [token async for token in provider.stream("### F1\n{}", 64)]
+        return tokens, await provider.complete("### F1\n{}\n### F2\n{}", 64)
+
+    tokens, text = asyncio.run(run())
+    assert tokens[0] == "### F1\n"
+    assert "### F2" in text
+
+
+def test_retries_when_server_is_overloaded(monkeypatch):
+    app = create_app(overloaded_requests=2)
+    provider = _provider(app, monkeypatch, llm_server_max_retries=3)
+
+    text = asyncio.run(provider.complete("prompt", 16))
+
+    assert text == "Why it matters"
+    assert app.state.completions == 1
+
+
+def test_gives_up_after_max_retries(monkeypatch):
+    provider = _provider(create_app(overloaded_requests=5), monkeypatch, llm_server_max_retries=1)
+
+    with pytest.raises(LLMOverloadedError):
+        asyncio.run(provider.complete("prompt", 16))
+
+
+def test_count_tokens_uses_warmed_server_counts():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"tokens": [1, 2, 3]})
+
+    provider = LlamaServerProvider(endpoint="http://llm.test", transport=httpx.MockTransport(handler))
+    asyncio.run(provider.warm_token_counts(["three word prompt", "three word prompt"]))
+
+    assert provider.count_tokens("three word prompt") == 3
+    assert provider.count_tokens("not warmed, estimated locally") == 7
+    assert len(requests) == 1
+
+
+def test_clients_are_closed_with_their_event_loop(monkeypatch):
+    provider = _provider(create_app(), monkeypatch)
+    clients = []
+
+    async def run():
+        await provider.complete("prompt", 8)
+        clients.append(provider._client().client)
+
+    asyncio.run(run())
+    assert clients[0].is_closed
+
+    async def explicit():
+        async with provider:
+            await provider.complete("prompt", 8)
+            client = provider._client().client
+        return client
+
+    assert asyncio.run(explicit()).is_closed
+
+
+def test_backoff_releases_the_slot(monkeypatch):
+    app = create_app(overloaded_requests=1)
+    provider = _provider(app, monkeypatch, llm_server_concurrency=1, llm_server_max_retries=1)
+    provider.backoff_seconds = 0.05
+    finished = []
+
+    async def run(name):
+        await provider.complete("prompt", 8)
+        finished.append(name)
+
+    async def main():
+        first = asyncio.ensure_future(run("retried"))
+        await asyncio.sleep(0.01)
+        await run("second")
+        await first
+
+    asyncio.run(main())
+    assert finished == ["second", "retried"]
+
+
+def test_concurrency_limit_is_respected(monkeypatch):
+    app = create_app(token_delay=0.001)
+    provider = _provider(app, monkeypatch, llm_server_concurrency=2)
+
+    async def run():
+        await asyncio.gather(*[provider.complete("prompt", 8) for _ in range(6)])
+
+    asyncio.run(run())
+    assert app.state.completions == 6
+    assert app.state.peak_active <= 2
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.core.config import get_settings
+from app.core.telemetry import Telemetry
+from app.llm import manager as manager_module
+from app.llm.batching import SYSTEM_PROMPT, PromptBatch, PromptBatchPlanner, split_sections
+from app.llm.manager import ModelManager
+from app.llm.providers.base import LLMProvider
+
+
+class FakeProvider(LLMProvider):
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def generate(self, findings):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.001)
+        self.active -= 1
+        self.calls += 1
+        return f"advice for {len(findings)}"
+
+    async def complete(self, prompt, max_tokens):
+        return prompt
+
+
+def test_model_is_loaded_once_and_generation_is_serialized():
+    loads = []
+
+    def factory():
+        loads.append(1)
+        return FakeProvider()
+
+    manager = ModelManager(provider_factory=factory, workers=1)
+
+    async def run():
+        return await asyncio.gather(*[manager.generate([{"rule_id": str(i)}]) for i in range(5)])
+
+    results = asyncio.run(run())
+    provider = manager.get_provider()
+
+    assert results == ["advice for 1"] * 5
+    assert loads == [1]
+    assert provider.peak == 1
+    metrics = manager.metrics()
+    assert metrics["submitted"] == 5
+    assert metrics["completed"] == 5
+    assert metrics["queueDepth"] == 0
+
+
+def test_manager_survives_new_event_loops():
+    manager = ModelManager(provider_factory=FakeProvider, workers=2)
+    assert asyncio.run(manager.generate([{}])) == "advice for 1"
+    assert asyncio.run(manager.generate([{}, {}])) == "advice for 2"
+    assert manager.get_provider().calls == 2
+
+
+def test_queue_depth_and_latency_are_exported(monkeypatch):
+    telemetry = Telemetry(enabled=True)
+    monkeypatch.setattr(manager_module, "get_telemetry", lambda: telemetry)
+    manager = ModelManager(provider_factory=FakeProvider, workers=1)
+
+    async def run():
+        return await asyncio.gather(*[manager.generate([{}]) for _ in range(3)])
+
+    asyncio.run(run())
+    body, _ = telemetry.render_metrics()
+    assert b"securescope_llm_queue_depth 0.0" in body
+    assert b"securescope_llm_in_flight 0.0" in body
+    assert b'securescope_llm_latency_seconds_count{outcome="completed"}' in body
+    assert b"securescope_llm_queue_wait_seconds_count" in body
+
+
+def test_unavailable_provider_returns_none():
+    def factory():
+        raise RuntimeError("llama-cpp-python is not installed")
+
+    manager = ModelManager(provider_factory=factory)
+    assert asyncio.run(manager.generate([{}])) is None
+    assert manager.metrics()["loaded"] is False
+
+
+class BatchingProvider(FakeProvider):
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+
+    def count_tokens(self, text):
+        return len(text.split())
+
+    async def complete(self, prompt, max_tokens):
+        self.prompts.append(prompt)
+        labels = [line[4:] for line in prompt.splitlines() if line.startswith("### F")]
+        return "\n".join(f"### {label}\nadvice {label}" for label in labels)
+
+
+def test_planner_packs_items_within_budget():
+    planner = PromptBatchPlanner(lambda text: len(text.split()), context_tokens=200, tokens_per_item=40)
+    items = {f"sig{i}": {"rule_id": f"RULE_{i}", "severity": "HIGH", "evidence": {}} for i in range(7)}
+
+    batches = planner.plan(items)
+
+    assert sorted(key for batch in batches for key in batch.keys) == sorted(items)
+    for batch in batches:
+        assert batch.prompt_tokens + planner.max_tokens(batch) <= 200
+        assert batch.render().startswith(SYSTEM_PROMPT)
+    assert len(batches) < len(items)
+
+
+def test_planner_truncates_oversized_sections():
+    planner = PromptBatchPlanner(lambda text: len(text.split()), context_tokens=200, tokens_per_item=40)
+    evidence = {"cidrs": [f"10.0.0.{i}/32 " for i in range(300)]}
+    items = {
+        "big": {"rule_id": "BIG", "severity": "HIGH", "evidence": evidence},
+        "small": {"rule_id": "SMALL", "severity": "LOW", "evidence": {}},
+    }
+
+    batches = planner.plan(items)
+
+    assert sorted(key for batch in batches for key in batch.keys) == ["big", "small"]
+    for batch in batches:
+        assert batch.prompt_tokens + planner.max_tokens(batch) <= 200
+    big = next(batch for batch in batches if "big" in batch.keys)
+    assert big.sections[big.keys.index("big")].endswith("...[truncated]")
+
+    tiny = PromptBatchPlanner(lambda text: len(text.split()), context_tokens=60, tokens_per_item=40)
+    assert tiny.plan(items) == []
+
+
+def test_split_sections_maps_labels_back_to_keys():
+    batch = PromptBatch(keys=["a", "b"], sections=["{}", "{}"])
+    text = "preamble\n### F2\nsecond\n### F1\nfirst\n"
+    assert split_sections(text, batch) == {"a": "first", "b": "second"}
+    assert split_sections("plain", PromptBatch(keys=["only"], sections=["{}"])) == {"only": "plain"}
+
+
+def test_generate_grouped_uses_few_forward_passes(monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_context_tokens", 400)
+    monkeypatch.setattr(get_settings(), "llm_tokens_per_advice", 20)
+    provider = BatchingProvider()
+    manager = ModelManager(provider_factory=lambda: provider)
+    items = {f"sig{i}": {"rule_id": f"RULE_{i}", "severity": "LOW", "evidence": {"x": i}} for i in range(12)}
+
+    results = asyncio.run(manager.generate_grouped(items))
+
+    assert all(results[key] and results[key].startswith("advice F") for key in items)
+    assert len(provider.prompts) < len(items)
+    assert len({prompt[: len(SYSTEM_PROMPT)] for prompt in provider.prompts}) == 1
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.scan import Finding, LLMAdvice, ScanRun
+from app.services.llm_service import LLMService, advice_signature, normalize_evidence
+
+
+class FakeManager:
+    def __init__(self):
+        self.prompts = []
+
+    async def generate_grouped(self, items):
+        self.prompts.append(items)
+        return {key: f"advice for {item['rule_id']}" for key, item in items.items()}
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _findings(db, evidences):
+    scan = ScanRun(id=uuid.uuid4(), region_scope=["us-east-1"])
+    db.add(scan)
+    findings = [
+        Finding(
+            id=uuid.uuid4(),
+            scan_id=scan.id,
+            service="EC2",
+            rule_id="EC2_EBS_ENCRYPTION",
+            severity="HIGH",
+            status="FAIL",
+            evidence=evidence,
+        )
+        for evidence in evidences
+    ]
+    db.add_all(findings)
+    db.commit()
+    return findings
+
+
+def test_normalize_evidence_redacts_identifiers():
+    first = normalize_evidence({"attachments": ["i-1"], "kms_key_id": None, "age_days": 200})
+    second = normalize_evidence({"attachments": ["i-2"], "kms_key_id": None, "age_days": 365})
+    assert first == second == {"attachments": "<redacted>", "kms_key_id": None}
+    assert advice_signature("m", "R", first) != advice_signature("m", "R2", first)
+
+
+def test_advice_is_generated_once_per_signature_and_reused_across_scans():
+    db = _session()
+    manager = FakeManager()
+    service = LLMService(db, manager=manager)
+
+    first_scan = _findings(db, [{"attachments": [f"i-{n}"], "kms_key_id": None} for n in range(5)])
+    asyncio.run(service.enrich_findings(first_scan))
+    second_scan = _findings(db, [{"attachments": ["i-9"], "kms_key_id": None}])
+    asyncio.run(service.enrich_findings(second_scan))
+
+    assert len(manager.prompts) == 1
+    assert db.query(LLMAdvice).count() == 1
+    assert all(f.llm_advice.content_md == "advice for EC2_EBS_ENCRYPTION" for f in first_scan + second_scan)
+    assert {f.advice_status for f in first_scan + second_scan} == {"READY"}
+    assert "i-0" not in str(manager.prompts)
+
+
+def test_enrichment_is_enqueued_critical_first(monkeypatch):
+    from app.services import tasks
+
+    sent = []
+    monkeypatch.setattr(
+        tasks.enrich_findings_task,
+        "apply_async",
+        lambda args, priority: sent.append((priority, len(args[0]))),
+    )
+    findings = [
+        Finding(id=uuid.uuid4(), severity=severity)
+        for severity in ["LOW", "CRITICAL", "HIGH", "CRITICAL"]
+    ]
+    asyncio.run(tasks.enqueue_enrichment(findings))
+    assert sent == [(0, 2), (3, 1), (9, 1)]
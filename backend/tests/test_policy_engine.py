@@ -1,6 +1,21 @@
 from __future__ import annotations
 
-from app.services.policy_engine import PolicyEngine
+import threading
+import time
+
+from app.services import policy_engine
+from app.services.policy_engine import PolicyEngine, merge_rule_stats
+from app.services.resource_store import DiskResourceStore
+
+CUSTOM_RULE = """
+- id: CUSTOM
+  service: TEST
+  title: "Custom evaluator"
+  severity: LOW
+  rationale: "Test rule"
+  evaluation:
+    evaluator: custom.evaluate
+"""
 
 
 def test_policy_engine_loads_rules():
@@ -32,3 +47,108 @@ def test_policy_engine_evaluates_resources():
     findings = engine.evaluate("ec2", resources)
     assert findings
     assert any(f["rule_id"] == "EC2_SG_SSH_OPEN" for f in findings)
+
+
+def _open_security_groups(count):
+    return [
+        {
+            "id": f"sg-{index}",
+            "type": "security_group",
+            "region": "us-east-1",
+            "ip_permissions": [
+                {"IpProtocol": "tcp", "FromPort": 22, "ToPort": 22, "IpRanges": [{"CidrIp": "0.0.0.0/0"}]}
+            ],
+        }
+        for index in range(count)
+    ]
+
+
+def test_profiling_records_time_resources_and_findings_per_rule():
+    engine = PolicyEngine(profile=True)
+    stats = {}
+    resources = _open_security_groups(3)
+    findings = engine.evaluate("ec2", resources, stats=stats)
+    engine.evaluate("ec2", resources, stats=stats)
+
+    ssh = stats["EC2_SG_SSH_OPEN"]
+    assert ssh.runs == 2
+    assert ssh.resources == 6
+    assert ssh.findings == 2 * sum(1 for f in findings if f["rule_id"] == "EC2_SG_SSH_OPEN")
+    assert ssh.seconds >= ssh.max_seconds > 0
+    assert ssh.over_budget == ssh.skipped == 0
+    assert set(stats) == {rule.id for rule in engine.load_rules("ec2") if rule.evaluation.get("evaluator") or rule.predicate}
+
+
+def test_rule_budget_flags_or_skips_runaway_evaluators():
+    resources = _open_security_groups(5)
+    flagged = {}
+    findings = PolicyEngine(rule_budget_seconds=1e-9, budget_action="flag").evaluate("ec2", resources, stats=flagged)
+    assert any(f["rule_id"] == "EC2_SG_SSH_OPEN" for f in findings)
+    assert flagged["EC2_SG_SSH_OPEN"].over_budget == 1
+    assert flagged["EC2_SG_SSH_OPEN"].skipped == 0
+
+    skipped = {}
+    findings = PolicyEngine(rule_budget_seconds=1e-9, budget_action="skip").evaluate("ec2", resources, stats=skipped)
+    assert findings == []
+    assert skipped["EC2_SG_SSH_OPEN"].skipped == 1
+    assert skipped["EC2_SG_SSH_OPEN"].resources < len(resources)
+
+
+def _custom_engine(tmp_path, monkeypatch, evaluator, **kwargs):
+    (tmp_path / "test.yaml").write_text(CUSTOM_RULE)
+    monkeypatch.setattr(policy_engine, "_resolve_evaluator", lambda name: evaluator)
+    return PolicyEngine(rules_dir=tmp_path, **kwargs)
+
+
+def test_rule_stats_count_each_resource_once(tmp_path, monkeypatch):
+    def two_passes(rule, resources):
+        return [{"rule_id": rule.id} for resource in resources] + [{"rule_id": rule.id} for resource in resources]
+
+    stats = {}
+    findings = _custom_engine(tmp_path, monkeypatch, two_passes, profile=True).evaluate("test", [{}, {}, {}], stats=stats)
+    assert len(findings) == 6
+    assert stats["CUSTOM"].resources == 3
+
+
+def test_rule_stats_count_streamed_resources_by_position(tmp_path, monkeypatch):
+    def two_passes(rule, resources):
+        return [{"rule_id": rule.id} for resource in resources if resource["n"] == 0] + [{} for _ in resources]
+
+    store = DiskResourceStore(str(tmp_path / "store"))
+    store.add("test", [{"n": index} for index in range(2000)])
+    stats = {}
+    try:
+        _custom_engine(tmp_path, monkeypatch, two_passes, profile=True).evaluate("test", store.resources("test"), stats=stats)
+    finally:
+        store.close()
+    assert stats["CUSTOM"].resources == 2000
+
+
+def test_skip_budget_stops_between_resources_on_the_calling_thread(tmp_path, monkeypatch):
+    threads = set()
+
+    def slow(rule, resources):
+        for resource in resources:
+            threads.add(threading.get_ident())
+            time.sleep(0.1)
+        return [{"rule_id": rule.id}]
+
+    engine = _custom_engine(tmp_path, monkeypatch, slow, rule_budget_seconds=0.05, budget_action="skip")
+    stats = {}
+    started = time.perf_counter()
+    assert engine.evaluate("test", [{}] * 10, stats=stats) == []
+    assert time.perf_counter() - started < 0.5
+    assert threads == {threading.get_ident()}
+    assert stats["CUSTOM"].skipped == stats["CUSTOM"].over_budget == 1
+    assert 1 <= stats["CUSTOM"].resources < 10
+
+
+def test_merge_rule_stats_sums_counts_and_keeps_max():
+    first = {"R1": {"service": "EC2", "runs": 1, "seconds": 0.5, "maxSeconds": 0.5, "resources": 3, "findings": 1}}
+    second = {"R1": {"service": "EC2", "runs": 2, "seconds": 0.25, "maxSeconds": 0.2, "resources": 4, "findings": 0}}
+    totals = merge_rule_stats(merge_rule_stats({}, first), second)
+    assert totals["R1"]["runs"] == 3
+    assert totals["R1"]["seconds"] == 0.75
+    assert totals["R1"]["maxSeconds"] == 0.5
+    assert totals["R1"]["resources"] == 7
+    assert first["R1"]["runs"] == 1
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.services.policy_engine import PolicyEngine
+from app.services.predicates import CompiledRule, PredicateError, compile_expression
+from app.services.resource_store import DiskResourceStore
+from app.services.resources import CompactResource, ResourceCompactor
+
+RULES = """
+- id: SG_WORLD_SSH
+  service: TEST
+  title: "SSH open to the world"
+  severity: HIGH
+  rationale: "Test rule"
+  evaluation:
+    resource: security_group
+    predicate: any(ip_permissions, port_in(FromPort, ToPort, params.ports) and any(IpRanges, world_open(CidrIp)))
+    ports: [22]
+    evidence:
+      cidrs: map(ip_permissions, map(IpRanges, CidrIp))
+      group: group_name
+- id: INSTANCE_OLD
+  service: TEST
+  title: "Old instance"
+  severity: LOW
+  rationale: "Test rule"
+  evaluation:
+    resource: instance
+    predicate: age_days >= params.ageDays and lower(state) != 'stopped'
+    ageDays: 30
+    status: WARN
+    evidence:
+      age_days: age_days
+      reviewed: false
+"""
+
+
+def _resources():
+    return [
+        {
+            "id": "sg-1",
+            "type": "security_group",
+            "group_name": "web",
+            "ip_permissions": [{"FromPort": 22, "ToPort": 22, "IpRanges": [{"CidrIp": "0.0.0.0/0"}]}],
+        },
+        {
+            "id": "sg-2",
+            "type": "security_group",
+            "group_name": "internal",
+            "ip_permissions": [{"FromPort": 0, "ToPort": 65535, "IpRanges": [{"CidrIp": "10.0.0.0/8"}]}],
+        },
+        {"id": "sg-3", "type": "security_group", "group_name": "empty"},
+        {"id": "i-1", "type": "instance", "age_days": 45, "state": "RUNNING"},
+        {"id": "i-2", "type": "instance", "age_days": 45, "state": "stopped"},
+        {"id": "i-3", "type": "instance", "age_days": None},
+    ]
+
+
+def _engine(tmp_path, text=RULES, **kwargs):
+    (tmp_path / "test.yaml").write_text(text)
+    return PolicyEngine(rules_dir=tmp_path, compact=False, **kwargs)
+
+
+def test_expressions_are_none_safe_and_track_fields():
+    expression = compile_expression("age_days > 10 and metadata.HttpTokens in ['optional', 'none']")
+    assert expression.fields == {"age_days", "metadata.HttpTokens"}
+    assert expression.evaluate({"age_days": 11, "metadata": {"HttpTokens": "optional"}}, {})
+    assert not expression.evaluate({"age_days": None}, {})
+    assert not expression.evaluate({"age_days": "old", "metadata": None}, {})
+    assert compile_expression("cidr_in(cidr, '10.0.0.0/8')").evaluate({"cidr": "10.1.0.0/16"}, {})
+    assert not compile_expression("cidr_in(cidr, '10.0.0.0/8')").evaluate({"cidr": "::/0"}, {})
+    assert compile_expression("not encrypted").vector == {"field": "encrypted", "op": "falsy"}
+    assert compile_expression("age > params.days").vector == {"field": "age", "op": "gt", "param": "days"}
+    assert compile_expression("age > params.days or tagged").vector is None
+
+
+@pytest.mark.parametrize(
+    "source",
+    ["__import__('os')", "name.upper()", "items[0]", "lambda: 1", "age >", "open(path)"],
+)
+def test_unsupported_expressions_are_rejected(source):
+    with pytest.raises(PredicateError):
+        CompiledRule({"resource": "instance", "predicate": source})
+
+
+def test_invalid_predicates_fail_at_load(tmp_path):
+    text = RULES.replace("lower(state)", "state.lower()")
+    with pytest.raises(ValueError, match="INSTANCE_OLD"):
+        _engine(tmp_path, text).load_rules("test")
+
+
+def test_dsl_rules_produce_findings_and_declare_fields(tmp_path):
+    engine = _engine(tmp_path)
+    findings = engine.evaluate("test", _resources())
+    assert [(f["rule_id"], f["status"]) for f in findings] == [("SG_WORLD_SSH", "FAIL"), ("INSTANCE_OLD", "WARN")]
+    assert findings[0]["evidence"] == {"cidrs": [["0.0.0.0/0"]], "group": "web"}
+    assert findings[1]["evidence"] == {"age_days": 45, "reviewed": False}
+    assert {
+        "ip_permissions.FromPort",
+        "ip_permissions.IpRanges.CidrIp",
+        "group_name",
+        "age_days",
+        "state",
+    } <= engine.required_fields("test")
+
+
+def test_fused_pass_matches_per_rule_evaluation(tmp_path):
+    resources = _resources()
+    expected = _engine(tmp_path, profile=True).evaluate("test", resources, stats={})
+    store = DiskResourceStore(str(tmp_path / "store"))
+    try:
+        store.add("test", resources)
+        assert _engine(tmp_path).evaluate("test", store.resources("test")) == expected
+    finally:
+        store.close()
+    assert _engine(tmp_path, vectorized=False).evaluate("test", resources) == expected
+
+
+def test_evidence_from_compact_records_is_plain_json(tmp_path):
+    text = RULES.replace("      age_days: age_days\n", "      age_days: age_days\n      groups: security_groups\n")
+    engine = _engine(tmp_path, text)
+    instance = {
+        "id": "i-4",
+        "type": "instance",
+        "age_days": 90,
+        "state": "running",
+        "security_groups": [{"GroupId": "sg-1", "GroupName": "web"}],
+    }
+    compactor = ResourceCompactor(["id", "type", "age_days", "state", "security_groups.GroupId"])
+    compacted = compactor.compact_all([instance])
+    [finding] = engine.evaluate("test", compacted)
+    assert finding["evidence"]["groups"] == [{"GroupId": "sg-1"}]
+    assert not isinstance(finding["evidence"]["groups"][0], CompactResource)
+    assert json.dumps(finding["evidence"])
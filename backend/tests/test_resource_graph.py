@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from app.services.graph import ResourceGraph, world_open_ports
+from app.services.policy_engine import PolicyEngine
+from app.services.rules import ec2
+
+
+def _security_group(group_id: str, cidr: str):
+    return {
+        "id": group_id,
+        "type": "security_group",
+        "region": "us-east-1",
+        "name": group_id,
+        "ip_permissions": [
+            {"IpProtocol": "tcp", "FromPort": 22, "ToPort": 22, "IpRanges": [{"CidrIp": cidr}]},
+        ],
+    }
+
+
+def _instance(instance_id: str, *group_ids: str, http_tokens: str = "required"):
+    return {
+        "id": instance_id,
+        "type": "instance",
+        "region": "us-east-1",
+        "public_ip": "54.1.1.1",
+        "metadata_options": {"HttpTokens": http_tokens},
+        "security_groups": [{"GroupId": group_id, "GroupName": group_id} for group_id in group_ids],
+    }
+
+
+def test_graph_indexes_edges_both_ways():
+    graph = ResourceGraph.build(
+        [
+            _security_group("sg-open", "0.0.0.0/0"),
+            _instance("i-1", "sg-open", "sg-missing"),
+            {"id": "vol-1", "type": "ebs_volume", "attachments": [{"InstanceId": "i-1"}]},
+            {"id": "snap-1", "type": "snapshot", "volume_id": "vol-1"},
+            {"id": "cluster-1", "type": "eks_cluster", "nodegroups": [{"name": "ng", "version": "1.29"}]},
+        ]
+    )
+    assert [sg["id"] for sg in graph.neighbors("i-1", "security_group")] == ["sg-open"]
+    assert [instance["id"] for instance in graph.referrers("sg-open", "security_group")] == ["i-1"]
+    assert [volume["id"] for volume in graph.neighbors("snap-1", "source_volume")] == ["vol-1"]
+    assert [volume["id"] for volume in graph.referrers("i-1", "attached_to")] == ["vol-1"]
+    assert graph.get("cluster-1::ng")["version"] == "1.29"
+    assert [cluster["id"] for _, cluster in graph.edges("cluster")] == ["cluster-1"]
+    assert graph.edge_count == 5
+
+
+def test_public_exposure_only_counts_world_open_groups():
+    engine = PolicyEngine(compact=False)
+    rule = next(r for r in engine.load_rules("ec2") if r.id == "EC2_PUBLIC_IMDSV1")
+    resources = [
+        _security_group("sg-open", "0.0.0.0/0"),
+        _security_group("sg-private", "10.0.0.0/8"),
+        _instance("i-open", "sg-open", "sg-private"),
+        _instance("i-private", "sg-private"),
+        _instance("i-imdsv1", "sg-private", http_tokens="optional"),
+    ]
+    findings = ec2.instance_public_exposure(rule, resources, graph=ResourceGraph.build(resources))
+    assert [finding["evidence"]["security_groups"] for finding in findings] == [["sg-open"], []]
+    assert findings[0]["evidence"]["exposures"] == world_open_ports(resources[0])
+
+
+def test_engine_builds_graph_when_none_is_given():
+    engine = PolicyEngine(compact=True)
+    resources = [_security_group("sg-open", "::/0"), _instance("i-open", "sg-open")]
+    findings = [
+        finding
+        for finding in engine.evaluate("ec2", engine.compact("EC2", resources))
+        if finding["rule_id"] == "EC2_PUBLIC_IMDSV1"
+    ]
+    assert len(findings) == 1
+    assert findings == [
+        finding
+        for finding in engine.evaluate("ec2", resources, graph=ResourceGraph.build(resources))
+        if finding["rule_id"] == "EC2_PUBLIC_IMDSV1"
+    ]
+
+
+def test_ipv6_ranges_count_as_world_open():
+    group = _security_group("sg-v6", "10.0.0.0/8")
+    group["ip_permissions"][0]["Ipv6Ranges"] = [{"CidrIpv6": "::/0"}, {"CidrIpv6": "2001:db8::/32"}]
+    engine = PolicyEngine(compact=True)
+    resources = engine.compact("EC2", [group, _instance("i-v6", "sg-v6")])
+    [finding] = [f for f in engine.evaluate("ec2", resources) if f["rule_id"] == "EC2_PUBLIC_IMDSV1"]
+    assert finding["evidence"]["security_groups"] == ["sg-v6"]
+    assert [port["cidr"] for port in finding["evidence"]["exposures"]] == ["::/0"]
+
+
+def test_only_relations_used_by_rules_are_projected():
+    engine = PolicyEngine()
+    assert "security_groups.GroupId" in engine.required_fields("ec2")
+    assert not {"volume_id", "nodegroups.name"} & engine.required_fields("ec2")
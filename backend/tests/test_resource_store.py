@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime, timezone
+
+from app.services.graph import ResourceGraph
+from app.services.policy_engine import PolicyEngine
+from app.services.resource_store import DiskResourceStore, MemoryResourceStore, open_resource_store
+
+
+def _inventory(count: int):
+    resources = [
+        {
+            "id": "sg-open",
+            "type": "security_group",
+            "region": "us-east-1",
+            "name": "open",
+            "ip_permissions": [
+                {"IpProtocol": "tcp", "FromPort": 22, "ToPort": 22, "IpRanges": [{"CidrIp": "0.0.0.0/0"}]}
+            ],
+        }
+    ]
+    for index in range(count):
+        resources.append(
+            {
+                "id": f"i-{index}",
+                "type": "instance",
+                "region": "us-east-1",
+                "public_ip": "54.1.1.1" if index % 2 else None,
+                "metadata_options": {"HttpTokens": "required"},
+                "security_groups": [{"GroupId": "sg-open", "GroupName": "open"}],
+                "age_days": index,
+                "termination_protection": bool(index % 3),
+            }
+        )
+    return resources
+
+
+def test_resources_survive_the_disk_format(tmp_path):
+    engine = PolicyEngine(compact=True)
+    record = engine.compact("EC2", _inventory(1))[1]
+    raw = {"id": "vol-1", "create_time": datetime(2024, 1, 1, tzinfo=timezone.utc), "tags": ("a", ["b"])}
+    with DiskResourceStore(str(tmp_path)) as store:
+        store.add("EC2", [record, raw])
+        restored, restored_raw = store.resources("EC2")
+    assert restored == record
+    assert isinstance(restored["security_groups"], tuple)
+    assert restored["security_groups"][0].get("GroupId") == "sg-open"
+    assert restored_raw == raw
+
+
+def test_disk_store_streams_what_memory_store_holds(tmp_path):
+    resources = _inventory(20)
+    with MemoryResourceStore() as memory, DiskResourceStore(str(tmp_path)) as disk:
+        for store in (memory, disk):
+            store.add("EC2", resources[:10])
+            store.add("EKS", [{"id": "cluster", "type": "eks_cluster"}])
+            store.add("EC2", resources[10:])
+        assert disk.services() == memory.services() == ["EC2", "EKS"]
+        assert len(disk) == len(memory) == 22
+        assert list(disk.resources("EC2")) == list(memory.resources("EC2")) == resources
+        view = disk.resources("EC2")
+        assert list(view) == list(view)
+        assert disk.get("i-3") == memory.get("i-3") == resources[4]
+        assert disk.get("missing") is None
+        path = disk.path
+    assert not os.path.exists(path)
+
+
+def test_auto_store_spills_above_the_memory_limit(tmp_path):
+    store = open_resource_store("auto", memory_limit_mb=0, directory=str(tmp_path))
+    assert store.backend == "memory"
+    store.add("EC2", _inventory(5))
+    assert store.backend == "disk"
+    store.add("EC2", _inventory(2)[1:])
+    assert len(store) == 8
+    store.close()
+    assert open_resource_store("auto", memory_limit_mb=64).backend == "memory"
+
+
+def test_findings_match_across_backends(tmp_path):
+    engine = PolicyEngine(compact=True)
+    resources = engine.compact("EC2", _inventory(50))
+    expected = engine.evaluate("ec2", resources, graph=ResourceGraph.build(resources))
+    with DiskResourceStore(str(tmp_path)) as store:
+        store.add("EC2", resources)
+        graph = ResourceGraph.build(store.resources(), lookup=store.get)
+        assert engine.evaluate("ec2", store.resources("EC2"), graph=graph) == expected
+    assert any(finding["rule_id"] == "EC2_PUBLIC_IMDSV1" for finding in expected)
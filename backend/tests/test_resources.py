@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import sys
+
+from app.services.policy_engine import PolicyEngine
+from app.services.resources import ResourceCompactor, build_projection
+
+
+def _instance(index: int, public_ip=None):
+    return {
+        "id": f"i-{index:017x}",
+        "type": "instance",
+        "region": "us-east-1",
+        "state": "running",
+        "public_ip": public_ip,
+        "security_groups": [
+            {"GroupId": f"sg-{index:017x}", "GroupName": f"web-{index}"},
+            {"GroupId": "sg-0default", "GroupName": "default"},
+        ],
+        "iam_instance_profile": {"Arn": "arn:aws:iam::123456789012:instance-profile/app", "Id": f"AIPA{index:016X}"},
+        "metadata_options": {
+            "State": "applied",
+            "HttpTokens": "optional" if index % 2 else "required",
+            "HttpPutResponseHopLimit": 1,
+            "HttpEndpoint": "enabled",
+            "HttpProtocolIpv6": "disabled",
+            "InstanceMetadataTags": "disabled",
+        },
+        "root_device_type": "ebs",
+        "block_device_mappings": [
+            {
+                "DeviceName": f"/dev/xvd{device}",
+                "Ebs": {
+                    "AttachTime": "2024-01-01T00:00:00+00:00",
+                    "DeleteOnTermination": True,
+                    "Status": "attached",
+                    "VolumeId": f"vol-{index:016x}{device}",
+                },
+            }
+            for device in "abc"
+        ],
+        "launch_time": "2024-01-01T00:00:00+00:00",
+        "age_days": 200 + index,
+        "ebs_optimized": True,
+        "platform_details": "Linux/UNIX",
+        "termination_protection": bool(index % 3),
+    }
+
+
+def _deep_size(value, seen):
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_size(key, seen) + _deep_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_deep_size(item, seen) for item in value)
+    elif hasattr(value, "__slots__"):
+        size += sum(_deep_size(getattr(value, name), seen) for name in value.__slots__ if hasattr(value, name))
+    return size
+
+
+def test_projection_keeps_only_declared_paths():
+    assert build_projection(["a.b", "a.c.d", "e", "e.f", "g.h", "g"]) == {
+        "a": {"b": None, "c": {"d": None}},
+        "e": None,
+        "g": None,
+    }
+    record = ResourceCompactor(["id", "type", "metadata_options.HttpTokens", "security_groups.GroupName"]).compact(
+        _instance(1)
+    )
+    assert record["id"] == "i-00000000000000001"
+    assert record.get("block_device_mappings") is None
+    assert "state" not in record
+    assert record.get("metadata_options").get("HttpTokens") == "optional"
+    assert record["metadata_options"].get("State") is None
+    assert [sg.get("GroupName") for sg in record["security_groups"]] == ["web-1", "default"]
+    assert dict(record)["type"] == "instance"
+
+
+def test_repeated_values_are_interned():
+    compactor = ResourceCompactor(["id", "type", "region"])
+    first = compactor.compact({"id": "a", "type": "".join(["inst", "ance"]), "region": "".join(["us-", "east-1"])})
+    second = compactor.compact({"id": "b", "type": "".join(["in", "stance"]), "region": "".join(["us-e", "ast-1"])})
+    assert first["type"] is second["type"]
+    assert first["region"] is second["region"]
+
+
+def test_equal_nested_records_are_stored_once():
+    compactor = ResourceCompactor(["id", "security_groups.GroupId", "metadata_options.HttpTokens"])
+    first, second = compactor.compact_all([_instance(1), _instance(3)])
+    assert first["security_groups"][1] is second["security_groups"][1]
+    assert first["metadata_options"] is second["metadata_options"]
+    assert first["security_groups"][0] is not second["security_groups"][0]
+
+
+def test_required_fields_come_from_rule_declarations():
+    fields = PolicyEngine().required_fields("ec2")
+    assert {"id", "type", "region", "metadata_options.HttpTokens", "ip_permissions.IpRanges.CidrIp"} <= fields
+    assert not any(field.startswith("block_device_mappings") for field in fields)
+
+
+def test_compact_resources_yield_identical_findings():
+    engine = PolicyEngine(compact=True)
+    resources = [_instance(index, public_ip="54.1.1.1" if index % 4 == 0 else None) for index in range(40)]
+    resources.append(
+        {
+            "id": "sg-1",
+            "type": "security_group",
+            "region": "us-east-1",
+            "name": "open",
+            "description": "open",
+            "ip_permissions": [
+                {
+                    "IpProtocol": "tcp",
+                    "FromPort": 22,
+                    "ToPort": 22,
+                    "IpRanges": [{"CidrIp": "0.0.0.0/0", "Description": "ssh"}],
+                    "UserIdGroupPairs": [],
+                }
+            ],
+        }
+    )
+    resources.append(
+        {
+            "id": "vol-1",
+            "type": "ebs_volume",
+            "region": "us-east-1",
+            "encrypted": False,
+            "attachments": [{"InstanceId": "i-1", "State": "attached"}],
+        }
+    )
+    findings = engine.evaluate("ec2", engine.compact("EC2", resources))
+    assert findings == engine.evaluate("ec2", resources)
+    assert json.dumps([finding["evidence"] for finding in findings])
+
+
+def test_compact_resources_use_a_fraction_of_the_memory():
+    engine = PolicyEngine(compact=True)
+    full = [_instance(index) for index in range(500)]
+    compact = engine.compact("EC2", [_instance(index) for index in range(500)])
+    full_size = _deep_size(full, set())
+    compact_size = _deep_size(compact, set())
+    assert full_size / compact_size > 6
+    assert PolicyEngine(compact=False).compact("EC2", full) == full
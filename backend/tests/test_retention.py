@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, func, inspect, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from app.models.base import Base
+from app.models.scan import Finding, ScanRegion, ScanRun
+from app.services.archive import ScanArchive
+from app.services.retention import (
+    DEFAULT_PARTITION,
+    add_months,
+    apply_retention,
+    create_partition_sql,
+    ensure_partitions,
+    partition_month,
+    partition_name,
+)
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+def test_partition_naming_and_bounds():
+    month = datetime(2025, 12, 17, 8, 30)
+    assert partition_name(month) == "findings_y2025m12"
+    assert partition_month("findings_y2025m12") == datetime(2025, 12, 1)
+    assert partition_month("findings_default") is None
+    assert add_months(datetime(2025, 12, 1), 1) == datetime(2026, 1, 1)
+    assert add_months(datetime(2026, 1, 1), -13) == datetime(2024, 12, 1)
+    assert create_partition_sql(month) == (
+        "CREATE TABLE IF NOT EXISTS findings_y2025m12 PARTITION OF findings "
+        "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')"
+    )
+
+
+def test_findings_table_is_range_partitioned_on_postgres():
+    ddl = str(CreateTable(Finding.__table__).compile(dialect=postgresql.dialect()))
+    assert "PARTITION BY RANGE (scan_created_at)" in ddl
+    assert "PRIMARY KEY (id, scan_created_at)" in ddl
+
+
+class _RecordingPostgres:
+    """Stands in for a PostgreSQL session whose default partition already holds one month."""
+
+    def __init__(self, stranded_month):
+        self.stranded_month = stranded_month
+        self.statements = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=postgresql.dialect())
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        result = SimpleNamespace(scalars=lambda: [], scalar=lambda: None)
+        if sql.startswith("SELECT EXISTS"):
+            result.scalar = lambda: params["start"] == self.stranded_month
+        return result
+
+    def commit(self):
+        self.statements.append("COMMIT")
+
+
+def test_ensure_partitions_moves_rows_stranded_in_default():
+    db = _RecordingPostgres(stranded_month=datetime(2026, 3, 1))
+    created = ensure_partitions(db, now=datetime(2026, 3, 15), months_ahead=1)
+
+    assert created == ["findings_y2026m03", "findings_y2026m04"]
+    detach = f"ALTER TABLE findings DETACH PARTITION {DEFAULT_PARTITION}"
+    attach = f"ALTER TABLE findings ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"
+    moved = db.statements[db.statements.index(detach) : db.statements.index(attach) + 1]
+    assert moved[1] == create_partition_sql(datetime(2026, 3, 1))
+    assert moved[2].startswith("INSERT INTO findings SELECT * FROM findings_default")
+    assert moved[3].startswith("DELETE FROM findings_default")
+    assert db.statements.count(detach) == 1
+    assert create_partition_sql(datetime(2026, 4, 1)) in db.statements[db.statements.index(attach) :]
+    assert db.statements[-1] == "COMMIT"
+
+
+def _scan(db, created_at, archive_path=None):
+    scan = ScanRun(status="COMPLETED", region_scope=["us-east-1"], created_at=created_at, archive_path=archive_path)
+    db.add(scan)
+    db.flush()
+    db.add(ScanRegion(scan_id=scan.id, region="us-east-1", status="COMPLETED"))
+    db.add(
+        Finding(
+            scan_id=scan.id,
+            service="ec2",
+            rule_id="EC2_EBS_ENCRYPTION",
+            severity="HIGH",
+            status="FAIL",
+            evidence={"encrypted": False, "scan": str(scan.id)},
+        )
+    )
+    db.commit()
+    return scan.id
+
+
+def test_retention_removes_expired_scans(tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    archived_file = tmp_path / "old.arrow"
+    archived_file.write_bytes(b"arrow")
+    old = _scan(db, datetime(2025, 1, 15), archive_path=str(archived_file))
+    recent = _scan(db, datetime(2026, 9, 2))
+
+    assert apply_retention(db, retention_months=0, now=datetime(2026, 10, 18))["scansDeleted"] == 0
+    result = apply_retention(db, retention_months=6, now=datetime(2026, 10, 18), archive=ScanArchive(str(tmp_path)))
+
+    assert result["scansDeleted"] == 1
+    assert db.get(ScanRun, old) is None
+    assert db.get(ScanRun, recent) is not None
+    assert db.scalar(select(func.count(Finding.id))) == 1
+    assert not archived_file.exists()
+
+
+def test_migrations_upgrade_and_downgrade(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    config = Config(str(BACKEND / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND / "alembic"))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+    columns = {column["name"] for column in inspect(engine).get_columns("findings")}
+    assert {"scan_created_at", "evidence_hash"} <= columns
+    assert "metrics" in {column["name"] for column in inspect(engine).get_columns("scan_runs")}
+    assert "rule_stats" in {column["name"] for column in inspect(engine).get_columns("scan_regions")}
+
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.downgrade(config, "0001_initial_schema")
+    assert "scan_created_at" not in {column["name"] for column in inspect(engine).get_columns("findings")}
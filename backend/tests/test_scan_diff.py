@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.scan import Finding, ScanRun, ScanStatusEnum
+from app.services.archive import ScanArchivedError
+from app.services.scan_orchestrator import ScanOrchestrator
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _scan(db, keys, archive_path=None):
+    scan = ScanRun(status=ScanStatusEnum.completed.value, region_scope=["us-east-1"], archive_path=archive_path)
+    db.add(scan)
+    db.flush()
+    for rule_id, resource_hash in keys:
+        db.add(
+            Finding(
+                scan_id=scan.id,
+                service="ec2",
+                rule_id=rule_id,
+                severity="HIGH",
+                status="FAIL",
+                evidence={"resource": resource_hash},
+                region="us-east-1",
+                resource_hash=resource_hash,
+            )
+        )
+    db.commit()
+    return scan.id
+
+
+def _keys(response):
+    return [(item.rule_id, item.resource_hash) for item in response.items]
+
+
+def test_diff_classifies_findings_by_rule_and_resource():
+    db = _session()
+    base = _scan(db, [("A", "r1"), ("A", "r2"), ("B", "r1")])
+    target = _scan(db, [("A", "r1"), ("B", "r3"), ("C", "r1")])
+    orchestrator = ScanOrchestrator(db=db)
+
+    new = asyncio.run(orchestrator.diff_scans(base, target, kind="new"))
+    resolved = asyncio.run(orchestrator.diff_scans(base, target, kind="resolved"))
+    unchanged = asyncio.run(orchestrator.diff_scans(base, target, kind="unchanged"))
+
+    assert new.counts == {"new": 2, "resolved": 2, "unchanged": 1}
+    assert _keys(new) == [("B", "r3"), ("C", "r1")]
+    assert _keys(resolved) == [("A", "r2"), ("B", "r1")]
+    assert _keys(unchanged) == [("A", "r1")]
+    assert new.next_cursor is None
+
+
+def test_diff_matches_and_pages_findings_without_resource_hash():
+    db = _session()
+    base = _scan(db, [("A", None), ("B", None)])
+    target = _scan(db, [("A", None), ("A", "r1"), ("C", None), ("C", "r2")])
+    orchestrator = ScanOrchestrator(db=db)
+
+    unchanged = asyncio.run(orchestrator.diff_scans(base, target, kind="unchanged"))
+    assert unchanged.counts == {"new": 3, "resolved": 1, "unchanged": 1}
+    assert _keys(unchanged) == [("A", None)]
+
+    seen = []
+    cursor = None
+    while True:
+        page = asyncio.run(orchestrator.diff_scans(base, target, kind="new", cursor=cursor, limit=1))
+        seen.extend(_keys(page))
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert seen == [("A", "r1"), ("C", None), ("C", "r2")]
+
+
+def test_diff_paginates_with_keyset_cursor():
+    db = _session()
+    base = _scan(db, [])
+    target = _scan(db, [("A", f"r{index}") for index in range(5)])
+    orchestrator = ScanOrchestrator(db=db)
+
+    seen = []
+    cursor = None
+    while True:
+        page = asyncio.run(orchestrator.diff_scans(base, target, kind="new", cursor=cursor, limit=2))
+        seen.extend(_keys(page))
+        if cursor is not None:
+            assert page.counts is None
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert seen == [("A", f"r{index}") for index in range(5)]
+
+
+def test_diff_rejects_archived_scans_and_bad_cursor():
+    db = _session()
+    base = _scan(db, [("A", "r1")], archive_path="/tmp/archived.arrow")
+    target = _scan(db, [("A", "r1")])
+    orchestrator = ScanOrchestrator(db=db)
+    with pytest.raises(ScanArchivedError):
+        asyncio.run(orchestrator.diff_scans(base, target))
+    with pytest.raises(ValueError):
+        asyncio.run(orchestrator.diff_scans(target, target, cursor="not-a-cursor"))
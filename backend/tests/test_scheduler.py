@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+
+from app.services.scheduler import FairScheduler
+from app.services.schemas import BatchScanRequest
+
+
+def test_scheduler_round_robins_across_accounts():
+    scheduler = FairScheduler(global_limit=1, per_account_limit=1)
+    order = []
+
+    def job(account, region):
+        async def run():
+            order.append((account, region))
+
+        return run
+
+    for region in ["us-east-1", "us-west-2", "eu-west-1"]:
+        scheduler.submit("early", job("early", region))
+    scheduler.submit("late", job("late", "us-east-1"))
+
+    asyncio.run(scheduler.run())
+    assert order[:2] == [("early", "us-east-1"), ("late", "us-east-1")]
+    assert len(order) == 4
+
+
+def test_scheduler_enforces_global_and_account_limits():
+    scheduler = FairScheduler(global_limit=3, per_account_limit=2)
+    active = defaultdict(int)
+    peaks = {"global": 0, "account": 0}
+
+    def job(account):
+        async def run():
+            active[account] += 1
+            peaks["global"] = max(peaks["global"], sum(active.values()))
+            peaks["account"] = max(peaks["account"], active[account])
+            await asyncio.sleep(0.001)
+            active[account] -= 1
+
+        return run
+
+    for account in ["a", "b"]:
+        for _ in range(5):
+            scheduler.submit(account, job(account))
+
+    asyncio.run(scheduler.run())
+    assert peaks == {"global": 3, "account": 2}
+    assert scheduler.pending == 0
+
+
+def test_scheduler_continues_after_job_failure():
+    scheduler = FairScheduler(global_limit=2, per_account_limit=1)
+    completed = []
+
+    async def boom():
+        raise RuntimeError("throttled")
+
+    async def ok():
+        completed.append("ok")
+
+    scheduler.submit("a", boom)
+    scheduler.submit("a", ok)
+    asyncio.run(scheduler.run())
+    assert completed == ["ok"]
+
+
+def test_batch_request_expands_role_arns():
+    request = BatchScanRequest(
+        hub={"accessKeyId": "AKIA", "secretAccessKey": "secret"},
+        roleArns=["arn:aws:iam::111111111111:role/audit", "arn:aws:iam::222222222222:role/audit"],
+        externalId="ext",
+        regionScope="us-east-1",
+    )
+    scan_requests = request.scan_requests()
+    assert [r.role_arn for r in scan_requests] == request.role_arns
+    assert all(r.external_id == "ext" and r.region_scope == ["us-east-1"] for r in scan_requests)
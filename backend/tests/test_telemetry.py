@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import boto3
+from botocore.stub import Stubber
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.telemetry import Telemetry
+from app.models.base import Base
+from app.models.scan import ScanRun
+from app.services import policy_engine
+
+
+def test_disabled_telemetry_is_a_no_op():
+    telemetry = Telemetry(enabled=False)
+    session = boto3.Session(aws_access_key_id="a", aws_secret_access_key="b", region_name="us-east-1")
+    assert telemetry.instrument_session(session) is session
+    with telemetry.scan("scan") as rollup:
+        with telemetry.span("collector.collect", "EC2"):
+            pass
+    assert rollup is None
+    assert telemetry.rollup("scan") is None
+
+
+def test_spans_roll_up_per_scan_and_export_metrics():
+    telemetry = Telemetry(enabled=True)
+    with telemetry.scan("scan-1") as rollup:
+        for _ in range(3):
+            with telemetry.span("collector.collect", "EC2", region="us-east-1"):
+                pass
+    with telemetry.span("collector.collect", "EKS"):
+        pass
+
+    stats = rollup.snapshot()["collector.collect"]
+    assert list(stats) == ["EC2"]
+    assert stats["EC2"]["count"] == 3
+    body, content_type = telemetry.render_metrics()
+    assert content_type.startswith("text/plain")
+    assert b'securescope_operation_seconds_count{operation="collector.collect",target="EC2"}' in body
+    telemetry.release("scan-1")
+    assert telemetry.rollup("scan-1") is not rollup
+
+
+def test_aws_calls_record_duration_and_retries():
+    telemetry = Telemetry(enabled=True)
+    session = telemetry.instrument_session(
+        boto3.Session(aws_access_key_id="a", aws_secret_access_key="b", region_name="eu-west-1")
+    )
+    client = session.client("sts")
+    with Stubber(client) as stubber, telemetry.scan("scan-2") as rollup:
+        stubber.add_response(
+            "get_caller_identity",
+            {"Account": "123456789012", "ResponseMetadata": {"RetryAttempts": 2}},
+        )
+        client.get_caller_identity()
+
+    call = rollup.snapshot()["aws.call"]["sts.GetCallerIdentity"]
+    assert call["count"] == 1
+    assert call["retries"] == 2
+    body, _ = telemetry.render_metrics()
+    assert (
+        b'securescope_aws_retries_total{operation="GetCallerIdentity",region="eu-west-1",service="sts"} 2.0' in body
+    )
+
+
+def test_throttled_responses_are_counted():
+    telemetry = Telemetry(enabled=True)
+    call = {"throttles": 0}
+    context = {"securescope_telemetry": call}
+    throttled = (None, {"Error": {"Code": "ThrottlingException"}})
+    telemetry._on_aws_retry(request_dict={"context": context}, response=throttled)
+    telemetry._on_aws_retry(request_dict={"context": context}, response=(None, {"Error": {"Code": "AccessDenied"}}))
+    assert call["throttles"] == 1
+
+
+def test_flush_and_commit_batches_are_timed():
+    telemetry = Telemetry(enabled=True)
+    telemetry.instrument_sqlalchemy()
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db, telemetry.scan("scan-3") as rollup:
+        db.add_all([ScanRun(status="COMPLETED", region_scope=[]) for _ in range(4)])
+        db.commit()
+
+    snapshot = rollup.snapshot()
+    assert snapshot["db.flush"][""]["rows"] == 4
+    assert snapshot["db.commit"][""]["count"] == 1
+
+
+def test_each_rule_evaluator_is_timed(monkeypatch):
+    telemetry = Telemetry(enabled=True)
+    monkeypatch.setattr(policy_engine, "get_telemetry", lambda: telemetry)
+    engine = policy_engine.PolicyEngine(vectorized=False)
+    rules = [rule for rule in engine.load_rules("ec2") if rule.evaluation.get("evaluator") or rule.predicate]
+    resources = [
+        {"id": f"i-{index}", "type": "instance", "region": "us-east-1", "age_days": 400, "state": "running"}
+        for index in range(20)
+    ]
+    resources.append({"id": "vol-1", "type": "ebs_volume", "region": "us-east-1", "encrypted": False})
+    with telemetry.scan("scan-4") as rollup:
+        findings = engine.evaluate("ec2", resources)
+    snapshot = rollup.snapshot()
+    assert snapshot["rule.fused"]["ec2"]["count"] == 1
+    timed = snapshot["rule.evaluate"]
+    assert set(timed) == {rule.id for rule in rules}
+    assert {finding["rule_id"] for finding in findings} & {rule.id for rule in rules if rule.predicate}
+    assert all(stats["count"] == 1 for stats in timed.values())
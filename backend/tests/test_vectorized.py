@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import random
+
+from app.services import policy_engine
+from app.services.policy_engine import PolicyEngine
+from app.services.vectorized import ColumnarResources
+
+
+def _inventory(count: int):
+    rng = random.Random(7)
+    resources = []
+    for index in range(count):
+        resources.append(
+            {
+                "id": f"i-{index}",
+                "type": "instance",
+                "region": "us-east-1",
+                "metadata_options": rng.choice([{"HttpTokens": "required"}, {"HttpTokens": "optional"}, {}]),
+                "age_days": rng.choice([None, 0, 90, 400]),
+                "termination_protection": rng.choice([True, False, None]),
+            }
+        )
+        resources.append(
+            {"id": f"vol-{index}", "type": "ebs_volume", "region": "us-east-1", "encrypted": rng.choice([True, False, None])}
+        )
+        resources.append(
+            {"id": f"snap-{index}", "type": "snapshot", "region": "us-east-1", "shared_accounts": rng.choice([[], ["all"]])}
+        )
+        resources.append(
+            {"id": f"bucket-{index}", "type": "s3_bucket", "region": "us-east-1", "encryption_enabled": rng.random() < 0.5}
+        )
+    return resources
+
+
+def test_vectorized_backend_matches_python_evaluators():
+    resources = _inventory(200)
+    for service in ("ec2", "common"):
+        fast = PolicyEngine(vectorized=True, compact=True)
+        slow = PolicyEngine(vectorized=False, compact=True)
+        compacted = fast.compact(service, resources)
+        assert fast.evaluate(service, compacted) == slow.evaluate(service, compacted)
+        assert PolicyEngine(vectorized=True, compact=False).evaluate(service, resources) == slow.evaluate(
+            service, resources
+        )
+
+
+def test_evaluators_only_see_matching_rows(monkeypatch):
+    seen = {}
+    evaluator_for = policy_engine._rule_evaluator
+
+    def spy(rule):
+        func = evaluator_for(rule)
+        if func is None:
+            return None
+
+        def wrapper(rule, resources, **extra):
+            resources = list(resources)
+            seen[rule.id] = len(resources)
+            return func(rule=rule, resources=resources, **extra)
+
+        wrapper.fields = func.fields
+        wrapper.uses_graph = func.uses_graph
+        return wrapper
+
+    monkeypatch.setattr(policy_engine, "_rule_evaluator", spy)
+    resources = _inventory(100)
+    findings = PolicyEngine(vectorized=True, compact=False).evaluate("ec2", resources)
+    counts = {rule_id: sum(1 for finding in findings if finding["rule_id"] == rule_id) for rule_id in seen}
+    for rule_id in ("EC2_IMDSV2_ENFORCED", "EC2_EBS_ENCRYPTION", "EC2_INSTANCE_AGE", "EC2_TERMINATION_PROTECTION"):
+        assert seen[rule_id] == counts[rule_id]
+    assert seen["EC2_SG_SSH_OPEN"] == len(resources)
+
+
+def test_unsupported_predicates_fall_back_to_python():
+    specs = [
+        {"type": "instance", "field": "age_days", "op": "gt", "value": 180},
+        {"type": "instance", "field": "id", "op": "eq", "param": "target"},
+    ]
+    columns = ColumnarResources(
+        [{"id": "a", "type": "instance", "age_days": "old"}, {"id": "b", "type": "instance", "age_days": 400}], specs
+    )
+    assert columns.select({"type": "instance", "field": "age_days", "op": "gt", "value": 180}, {}) is None
+    assert columns.select({"type": "instance", "field": "age_days", "op": "between"}, {}) is None
+    assert columns.select({"type": "instance", "field": "state", "op": "truthy"}, {}) is None
+    selected = columns.select({"type": "instance", "field": "age_days", "op": "truthy"}, {})
+    assert [resource["id"] for resource in selected] == ["a", "b"]
+    assert columns.select({"type": "instance", "field": "id", "op": "eq", "param": "target"}, {"target": "b"}) == [
+        {"id": "b", "type": "instance", "age_days": 400}
+    ]